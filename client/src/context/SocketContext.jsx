@@ -14,8 +14,10 @@ export const SocketProvider = ({ children }) => {
 
   useEffect(() => {
     if (isAuthenticated()) {
-      // Connect to Flight Service WebSocket
+      // Connect to Flight Service WebSocket; the token joins this user's room
+      // so booking_completed / booking_cancelled events reach only them
       const newSocket = io(FLIGHT_SERVICE_URL, {
+        auth: (cb) => cb({ token: localStorage.getItem('token') }),
         transports: ['websocket'],
         reconnection: true,
         reconnectionAttempts: 5,
@@ -43,6 +45,24 @@ export const SocketProvider = ({ children }) => {
         });
       });
 
+      newSocket.on('booking_completed', ({ booking }) => {
+        addNotification({
+          type: 'booking_completed',
+          message: `Booking #${booking.id} confirmed`,
+          data: booking,
+          timestamp: new Date().toISOString()
+        });
+      });
+
+      newSocket.on('booking_cancelled', ({ booking }) => {
+        addNotification({
+          type: 'booking_cancelled',
+          message: `Booking #${booking.id} was cancelled and refunded`,
+          data: booking,
+          timestamp: new Date().toISOString()
+        });
+      });
+
       setSocket(newSocket);
 
       return () => {
@@ -1,5 +1,6 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
+import { useSocket } from '../context/SocketContext';
 import { flightAPI, bookingAPI, ratingAPI, airlineAPI } from '../services/api';
 import { useFlightTimer } from '../hooks/useFlightTimer';
 import {
@@ -24,21 +25,37 @@ const Flights = () => {
   const [searchName, setSearchName] = useState('');
   const [selectedAirline, setSelectedAirline] = useState('');
   const [bookingLoading, setBookingLoading] = useState({});
+  // Idempotency key per flight, kept until the server answers
+  const bookingKeys = useRef({});
   const [showRatingModal, setShowRatingModal] = useState(false);
   const [selectedFlight, setSelectedFlight] = useState(null);
   const [ratingData, setRatingData] = useState({ rating: 5, comment: '' });
   const [reportLoading, setReportLoading] = useState(false);
 
   const { user, isAdmin } = useAuth();
+  const { socket } = useSocket();
 
   useEffect(() => {
     loadFlights();
     loadAirlines();
-    // Refresh flights every 30 seconds
-    const interval = setInterval(loadFlights, 30000);
-    return () => clearInterval(interval);
   }, []);
 
+  // Refresh on flight events pushed by Flight Service (and after reconnect);
+  // fall back to polling every 30 seconds only without a socket
+  useEffect(() => {
+    if (!socket) {
+      const interval = setInterval(loadFlights, 30000);
+      return () => clearInterval(interval);
+    }
+
+    const events = [
+      'flight_status_changed', 'flight_cancelled', 'flight_updated', 'connect',
+      'booking_completed', 'booking_cancelled'
+    ];
+    events.forEach((event) => socket.on(event, loadFlights));
+    return () => events.forEach((event) => socket.off(event, loadFlights));
+  }, [socket]);
+
   const dedupeById = (list = []) => {
     const seen = new Set();
     return list.filter((flight) => {
@@ -83,15 +100,26 @@ const Flights = () => {
     setError('');
     setSuccessMessage('');
 
+    if (!bookingKeys.current[flightId]) {
+      bookingKeys.current[flightId] = crypto.randomUUID();
+    }
+
     try {
-      const response = await bookingAPI.create(flightId, user.id);
+      const response = await bookingAPI.create(flightId, user.id, bookingKeys.current[flightId]);
+      delete bookingKeys.current[flightId];
       setSuccessMessage('Booking is being processed! Check back in a few moments.');
       
-      // Refresh flights after 6 seconds (after async processing)
-      setTimeout(() => {
-        loadFlights();
-      }, 6000);
+      // Without a socket there is no booking_completed event: refresh after processing
+      if (!socket) {
+        setTimeout(() => {
+          loadFlights();
+        }, 6000);
+      }
     } catch (err) {
+      // Without a response the booking may have gone through, so a retry reuses the key
+      if (err.response) {
+        delete bookingKeys.current[flightId];
+      }
       const errorMsg = err.response?.data?.error || 'Failed to book flight';
       setError(errorMsg);
     } finally {
@@ -185,6 +213,10 @@ const Flights = () => {
               <span className="info-label">Price</span>
               <span className="info-value price">${formatCurrency(flight.ticket_price)}</span>
             </div>
+            <div className="info-item">
+              <span className="info-label">Seats</span>
+              <span className="info-value">{flight.seats_available} / {flight.capacity}</span>
+            </div>
           </div>
 
           {isOngoing && (
@@ -32,7 +32,8 @@ const ManagerDashboard = () => {
     departure_time: '',
     departure_airport: '',
     arrival_airport: '',
-    ticket_price: ''
+    ticket_price: '',
+    capacity: ''
   });
   const [formErrors, setFormErrors] = useState({});
   const [airlineFormData, setAirlineFormData] = useState({
@@ -83,7 +84,8 @@ const ManagerDashboard = () => {
       departure_time: '',
       departure_airport: '',
       arrival_airport: '',
-      ticket_price: ''
+      ticket_price: '',
+      capacity: ''
     });
     setFormErrors({});
   };
@@ -163,6 +165,7 @@ const ManagerDashboard = () => {
         distance_km: parseInt(formData.distance_km),
         duration_minutes: parseInt(formData.duration_minutes),
         ticket_price: parseFloat(formData.ticket_price),
+        capacity: formData.capacity ? parseInt(formData.capacity) : null,
         departure_time: departureISO,
         created_by: user.id
       };
@@ -225,7 +228,8 @@ const ManagerDashboard = () => {
         departure_time: departureISO,
         departure_airport: formData.departure_airport,
         arrival_airport: formData.arrival_airport,
-        ticket_price: parseFloat(formData.ticket_price)
+        ticket_price: parseFloat(formData.ticket_price),
+        capacity: formData.capacity ? parseInt(formData.capacity) : null
       };
 
       await flightAPI.update(selectedFlight.id, updateData);
@@ -255,7 +259,8 @@ const ManagerDashboard = () => {
       departure_time: toLocalInputValue(flight.departure_time),
       departure_airport: flight.departure_airport,
       arrival_airport: flight.arrival_airport,
-      ticket_price: flight.ticket_price
+      ticket_price: flight.ticket_price,
+      capacity: flight.capacity
     });
     setShowEditModal(true);
   };
@@ -498,6 +503,20 @@ const ManagerDashboard = () => {
                     />
                     {formErrors.ticket_price && <div className="form-error">{formErrors.ticket_price}</div>}
                   </div>
+
+                  <div className="form-group">
+                    <label className="form-label">Seats</label>
+                    <input
+                      type="number"
+                      name="capacity"
+                      className="form-input"
+                      value={formData.capacity}
+                      onChange={handleChange}
+                      min="1"
+                      step="1"
+                      placeholder="180"
+                    />
+                  </div>
                 </div>
               </div>
 
@@ -737,6 +756,20 @@ const ManagerDashboard = () => {
                     />
                     {formErrors.ticket_price && <div className="form-error">{formErrors.ticket_price}</div>}
                   </div>
+
+                  <div className="form-group">
+                    <label className="form-label">Seats</label>
+                    <input
+                      type="number"
+                      name="capacity"
+                      className="form-input"
+                      value={formData.capacity}
+                      onChange={handleChange}
+                      min="1"
+                      step="1"
+                      placeholder="180"
+                    />
+                  </div>
                 </div>
               </div>
 
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
+import { useSocket } from '../context/SocketContext';
 import { userAPI, bookingAPI } from '../services/api';
 import { formatDate, formatCurrency, formatDateTime, getStatusBadgeClass, formatBookingStatus } from '../utils/formatters';
 import { validatePositiveNumber, validateRequired, validateEmail, validateDateOfBirth } from '../utils/validators';
@@ -8,6 +9,7 @@ import './Profile.css';
 
 const Profile = () => {
   const { user, refreshUser } = useAuth();
+  const { socket } = useSocket();
   const [bookings, setBookings] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
@@ -31,6 +33,21 @@ const Profile = () => {
     loadUserBookings();
   }, [user]);
 
+  // Booking outcomes are pushed to this user's room; update the list in place
+  useEffect(() => {
+    if (!socket) return;
+
+    const updateBooking = ({ booking }) => {
+      setBookings((prev) => prev.map((item) => (
+        item.id === booking.id ? { ...item, ...booking, flight: item.flight } : item
+      )));
+    };
+
+    const events = ['booking_completed', 'booking_cancelled'];
+    events.forEach((event) => socket.on(event, updateBooking));
+    return () => events.forEach((event) => socket.off(event, updateBooking));
+  }, [socket]);
+
   const loadUserBookings = async () => {
     try {
       setLoading(true);
@@ -126,14 +126,37 @@ export const flightAPI = {
     if (filters.name) params.append('name', filters.name);
     if (filters.airline_id) params.append('airline_id', filters.airline_id);
     if (filters.status) params.append('status', filters.status);
+    if (filters.limit) params.append('limit', filters.limit);
+    if (filters.cursor) params.append('cursor', filters.cursor);
+    if (filters.fields) params.append('fields', filters.fields);
+    if (filters.sort) params.append('sort', filters.sort);
     return flightServiceAPI.get(`/api/flights?${params.toString()}`);
   },
   
+  search: (criteria = {}) => {
+    const params = new URLSearchParams();
+    Object.entries(criteria).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') params.append(key, value);
+    });
+    return flightServiceAPI.get(`/api/flights/search?${params.toString()}`);
+  },
+  
+  getChanges: (since = null, limit = null) => {
+    const params = new URLSearchParams();
+    if (since) params.append('since', since);
+    if (limit) params.append('limit', limit);
+    return flightServiceAPI.get(`/api/flights/changes?${params.toString()}`);
+  },
+  
   getByTabs: () =>
     flightServiceAPI.get('/api/flights/tabs'),
   
-  getPending: () =>
-    flightServiceAPI.get('/api/flights/pending'),
+  getPending: (page = {}) => {
+    const params = new URLSearchParams();
+    if (page.limit) params.append('limit', page.limit);
+    if (page.cursor) params.append('cursor', page.cursor);
+    return flightServiceAPI.get(`/api/flights/pending?${params.toString()}`);
+  },
   
   getById: (flightId) =>
     flightServiceAPI.get(`/api/flights/${flightId}`),
@@ -165,20 +188,32 @@ export const flightAPI = {
 
 // ==================== BOOKING API ====================
 export const bookingAPI = {
-  create: (flightId, userId) =>
+  // Reuse the same idempotencyKey when retrying, so the user is charged once
+  create: (flightId, userId, idempotencyKey) =>
     flightServiceAPI.post('/api/bookings', {
       flight_id: flightId,
       user_id: userId
+    }, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}
     }),
   
+  // items: [{ flight_id, user_id }, ...]; the response has a result per item
+  createBatch: (items) =>
+    flightServiceAPI.post('/api/bookings/batch', { items }),
+  
   getById: (bookingId) =>
     flightServiceAPI.get(`/api/bookings/${bookingId}`),
   
-  getUserBookings: (userId) =>
-    flightServiceAPI.get(`/api/bookings/user/${userId}`),
+  getUserBookings: (userId, { fields, sort, status, limit, cursor, dedupe } = {}) =>
+    flightServiceAPI.get(`/api/bookings/user/${userId}`, {
+      params: { fields, sort, status, limit, cursor, dedupe: dedupe ? 'true' : undefined }
+    }),
+  
+  getFlightBookings: (flightId, { limit, cursor } = {}) =>
+    flightServiceAPI.get(`/api/bookings/flight/${flightId}`, { params: { limit, cursor } }),
   
-  getFlightBookings: (flightId) =>
-    flightServiceAPI.get(`/api/bookings/flight/${flightId}`)
+  getFlightBookingSummary: (flightId) =>
+    flightServiceAPI.get(`/api/bookings/flight/${flightId}/summary`)
 };
 
 // ==================== RATING API ====================
@@ -197,8 +232,8 @@ export const ratingAPI = {
   getFlightRatings: (flightId) =>
     flightServiceAPI.get(`/api/ratings/flight/${flightId}`),
   
-  getAll: () =>
-    flightServiceAPI.get('/api/ratings')
+  getAll: ({ fields, sort } = {}) =>
+    flightServiceAPI.get('/api/ratings', { params: { fields, sort } })
 };
 
 export default {
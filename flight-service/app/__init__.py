@@ -5,11 +5,13 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_socketio import SocketIO
+from flask_compress import Compress
 import os
 
 # Initialize extensions
 db = SQLAlchemy()
 socketio = SocketIO()
+compress = Compress()
 
 
 def create_app(config_name='default'):
@@ -27,16 +29,19 @@ def create_app(config_name='default'):
     # Load configuration
     from config import config
     app.config.from_object(config[config_name])
+    app.config['CONFIG_NAME'] = config_name
     
     # Initialize extensions with app
     db.init_app(app)
+    compress.init_app(app)
     
     # CORS configuration
     CORS(app, resources={
         r"/api/*": {
             "origins": "*",
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+            "expose_headers": ["Idempotent-Replayed"],
             "supports_credentials": True
         }
     })
@@ -65,6 +70,23 @@ def create_app(config_name='default'):
             'database': 'connected' if db.engine else 'disconnected'
         }, 200
     
+    # Runtime metrics endpoint
+    @app.route('/metrics')
+    def metrics():
+        """Runtime metrics endpoint."""
+        from app.utils import (
+            flight_tab_cache, booking_worker_pool, booking_job_counts, outbox_counts, booking_metrics,
+            server_client
+        )
+        return {
+            'flight_tab_cache': flight_tab_cache.stats(),
+            'booking_workers': booking_worker_pool.stats(),
+            'booking_pipeline': booking_metrics.snapshot(),
+            'booking_jobs': booking_job_counts(),
+            'outbox': outbox_counts(),
+            'server_client': server_client.stats()
+        }, 200
+    
     # Create database tables
     with app.app_context():
         db.create_all()
@@ -2,7 +2,7 @@
 DTO module initialization.
 """
 from .flight_dto import FlightCreateDTO, FlightUpdateDTO, FlightApprovalDTO, FlightSearchDTO
-from .booking_dto import BookingCreateDTO
+from .booking_dto import BookingCreateDTO, BookingBatchCreateDTO
 from .rating_dto import RatingCreateDTO
 
 __all__ = [
@@ -11,5 +11,6 @@ __all__ = [
     'FlightApprovalDTO',
     'FlightSearchDTO',
     'BookingCreateDTO',
+    'BookingBatchCreateDTO',
     'RatingCreateDTO'
 ]
\ No newline at end of file
@@ -28,4 +28,44 @@ class BookingCreateDTO:
         if not self.user_id:
             errors.append("User ID is required")
         
-        return errors
\ No newline at end of file
+        return errors
+
+
+class BookingBatchCreateDTO:
+    """DTO for creating several bookings in one request."""
+    
+    def __init__(self, items, max_items):
+        self.items = items
+        self.max_items = max_items
+    
+    @staticmethod
+    def from_dict(data, max_items):
+        """Create DTO from dictionary."""
+        items = data.get('items')
+        if not isinstance(items, list):
+            items = None
+        else:
+            items = [BookingCreateDTO.from_dict(item if isinstance(item, dict) else {}) for item in items]
+        return BookingBatchCreateDTO(items=items, max_items=max_items)
+    
+    def validate(self):
+        """Validate DTO data."""
+        errors = []
+        
+        if not self.items:
+            errors.append("Items are required")
+            return errors
+        
+        if len(self.items) > self.max_items:
+            errors.append(f"At most {self.max_items} items per batch")
+        
+        seen = set()
+        for index, item in enumerate(self.items):
+            errors.extend(f"Item {index}: {error}" for error in item.validate())
+            
+            pair = (item.flight_id, item.user_id)
+            if pair in seen:
+                errors.append(f"Item {index}: Duplicate flight and user")
+            seen.add(pair)
+        
+        return errors
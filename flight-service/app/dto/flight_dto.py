@@ -1,7 +1,7 @@
 """
 Data Transfer Objects (DTOs) for Flight operations.
 """
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 
 
 def _to_naive_utc(value):
@@ -12,11 +12,25 @@ def _to_naive_utc(value):
     return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
+def _parse_search_time(value, end_of_day=False):
+    """Parse an ISO date/datetime query value, returning the raw value if invalid."""
+    if not value or not isinstance(value, str):
+        return value
+    try:
+        parsed = _to_naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    except ValueError:
+        return value
+    # A bare date used as an upper bound covers the whole day
+    if end_of_day and len(value) == 10:
+        parsed = parsed + timedelta(days=1) - timedelta(microseconds=1)
+    return parsed
+
+
 class FlightCreateDTO:
     """DTO for creating a new flight."""
     
     def __init__(self, name, airline_id, distance_km, duration_minutes,
-                 departure_time, departure_airport, arrival_airport, ticket_price):
+                 departure_time, departure_airport, arrival_airport, ticket_price, capacity=None):
         self.name = name
         self.airline_id = airline_id
         self.distance_km = distance_km
@@ -25,6 +39,7 @@ class FlightCreateDTO:
         self.departure_airport = departure_airport
         self.arrival_airport = arrival_airport
         self.ticket_price = ticket_price
+        self.capacity = capacity
     
     @staticmethod
     def from_dict(data):
@@ -43,7 +58,8 @@ class FlightCreateDTO:
             departure_time=departure_time,
             departure_airport=data.get('departure_airport'),
             arrival_airport=data.get('arrival_airport'),
-            ticket_price=data.get('ticket_price')
+            ticket_price=data.get('ticket_price'),
+            capacity=data.get('capacity')
         )
     
     def validate(self):
@@ -76,6 +92,9 @@ class FlightCreateDTO:
         if not self.ticket_price or self.ticket_price <= 0:
             errors.append("Ticket price must be greater than 0")
         
+        if self.capacity is not None and (not isinstance(self.capacity, int) or self.capacity <= 0):
+            errors.append("Capacity must be a positive whole number")
+        
         return errors
 
 
@@ -84,7 +103,7 @@ class FlightUpdateDTO:
     
     def __init__(self, name=None, distance_km=None, duration_minutes=None,
                  departure_time=None, departure_airport=None, 
-                 arrival_airport=None, ticket_price=None):
+                 arrival_airport=None, ticket_price=None, capacity=None):
         self.name = name
         self.distance_km = distance_km
         self.duration_minutes = duration_minutes
@@ -92,6 +111,7 @@ class FlightUpdateDTO:
         self.departure_airport = departure_airport
         self.arrival_airport = arrival_airport
         self.ticket_price = ticket_price
+        self.capacity = capacity
     
     @staticmethod
     def from_dict(data):
@@ -108,7 +128,8 @@ class FlightUpdateDTO:
             departure_time=departure_time,
             departure_airport=data.get('departure_airport'),
             arrival_airport=data.get('arrival_airport'),
-            ticket_price=data.get('ticket_price')
+            ticket_price=data.get('ticket_price'),
+            capacity=data.get('capacity')
         )
     
     def validate(self):
@@ -127,6 +148,9 @@ class FlightUpdateDTO:
         if self.ticket_price and self.ticket_price <= 0:
             errors.append("Ticket price must be greater than 0")
         
+        if self.capacity is not None and (not isinstance(self.capacity, int) or self.capacity <= 0):
+            errors.append("Capacity must be a positive whole number")
+        
         return errors
 
 
@@ -161,10 +185,22 @@ class FlightApprovalDTO:
 class FlightSearchDTO:
     """DTO for searching flights."""
     
-    def __init__(self, name=None, airline_id=None, status=None):
+    def __init__(self, name=None, airline_id=None, status=None, limit=None, cursor=None,
+                 departure_airport=None, arrival_airport=None, date_from=None,
+                 date_to=None, min_price=None, max_price=None, fields=None, sort=None):
         self.name = name
         self.airline_id = airline_id
         self.status = status
+        self.limit = limit
+        self.cursor = cursor
+        self.departure_airport = departure_airport
+        self.arrival_airport = arrival_airport
+        self.date_from = date_from
+        self.date_to = date_to
+        self.min_price = min_price
+        self.max_price = max_price
+        self.fields = fields  # comma-separated sparse fieldset
+        self.sort = sort  # field name, '-' prefix for descending
     
     @staticmethod
     def from_dict(data):
@@ -172,5 +208,56 @@ class FlightSearchDTO:
         return FlightSearchDTO(
             name=data.get('name'),
             airline_id=data.get('airline_id'),
-            status=data.get('status')
+            status=data.get('status'),
+            limit=data.get('limit'),
+            cursor=data.get('cursor'),
+            departure_airport=(data.get('departure_airport') or '').strip() or None,
+            arrival_airport=(data.get('arrival_airport') or '').strip() or None,
+            date_from=_parse_search_time(data.get('date_from')),
+            date_to=_parse_search_time(data.get('date_to'), end_of_day=True),
+            min_price=data.get('min_price'),
+            max_price=data.get('max_price'),
+            fields=data.get('fields'),
+            sort=data.get('sort')
         )
+    
+    def is_paginated(self):
+        """Check if a page (limit/cursor) was requested."""
+        return bool(self.limit or self.cursor)
+    
+    def validate(self):
+        """Validate DTO data."""
+        errors = []
+        
+        if self.date_from is not None and not isinstance(self.date_from, datetime):
+            errors.append("date_from must be an ISO date or datetime")
+        
+        if self.date_to is not None and not isinstance(self.date_to, datetime):
+            errors.append("date_to must be an ISO date or datetime")
+        
+        if (isinstance(self.date_from, datetime) and isinstance(self.date_to, datetime)
+                and self.date_from > self.date_to):
+            errors.append("date_from must be before date_to")
+        
+        if self.min_price is not None and self.min_price < 0:
+            errors.append("min_price cannot be negative")
+        
+        if (self.min_price is not None and self.max_price is not None
+                and self.min_price > self.max_price):
+            errors.append("min_price must not exceed max_price")
+        
+        # Imported here to avoid circular imports
+        from app.models import Flight
+        from app.utils.projection import parse_fields, parse_sort
+        
+        try:
+            parse_fields(self.fields, Flight.FIELDS)
+        except ValueError as e:
+            errors.append(str(e))
+        
+        try:
+            parse_sort(self.sort, Flight.SORT_COLUMNS, 'departure_time')
+        except ValueError as e:
+            errors.append(str(e))
+        
+        return errors
@@ -4,5 +4,9 @@ Models module initialization.
 from .flight import Flight
 from .booking import Booking
 from .rating import Rating
+from .flight_tombstone import FlightTombstone
+from .booking_job import BookingJob
+from .idempotency_key import IdempotencyKey
+from .outbox_message import OutboxMessage
 
-__all__ = ['Flight', 'Booking', 'Rating']
\ No newline at end of file
+__all__ = ['Flight', 'Booking', 'Rating', 'FlightTombstone', 'BookingJob', 'IdempotencyKey', 'OutboxMessage']
\ No newline at end of file
@@ -1,8 +1,9 @@
 """
 Booking model for managing flight bookings.
 """
-from datetime import datetime, timezone
+from datetime import datetime
 from app import db
+from app.utils import format_utc
 
 
 class Booking(db.Model):
@@ -29,6 +30,9 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Relationships (jobs are deleted with the booking, e.g. when its flight is deleted)
+    jobs = db.relationship('BookingJob', backref='booking', lazy='dynamic', cascade='all, delete-orphan')
+    
     def __init__(self, flight_id, user_id, ticket_price):
         """Initialize a new booking."""
         self.flight_id = flight_id
@@ -54,21 +58,38 @@ class Booking(db.Model):
     
     def to_dict(self):
         """Convert booking object to dictionary."""
-        def _format_utc(value):
-            if not value:
-                return None
-            return value.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
-
         return {
             'id': self.id,
             'flight_id': self.flight_id,
             'user_id': self.user_id,
             'ticket_price': float(self.ticket_price),
             'status': self.status,
-            'created_at': _format_utc(self.created_at),
-            'updated_at': _format_utc(self.updated_at)
+            'created_at': format_utc(self.created_at),
+            'updated_at': format_utc(self.updated_at)
         }
     
     def __repr__(self):
         """String representation of Booking."""
         return f'<Booking User:{self.user_id} Flight:{self.flight_id} - {self.status}>'
+
+
+# Sparse fieldsets: field name -> (columns to select, getter(row, now)),
+# matching the keys and values of Booking.to_dict
+Booking.FIELDS = {
+    'id': ((Booking.id,), lambda row, now: row.id),
+    'flight_id': ((Booking.flight_id,), lambda row, now: row.flight_id),
+    'user_id': ((Booking.user_id,), lambda row, now: row.user_id),
+    'ticket_price': ((Booking.ticket_price,), lambda row, now: float(row.ticket_price)),
+    'status': ((Booking.status,), lambda row, now: row.status),
+    'created_at': ((Booking.created_at,), lambda row, now: format_utc(row.created_at)),
+    'updated_at': ((Booking.updated_at,), lambda row, now: format_utc(row.updated_at)),
+}
+
+# Columns usable for sort=
+Booking.SORT_COLUMNS = {
+    'id': Booking.id,
+    'ticket_price': Booking.ticket_price,
+    'status': Booking.status,
+    'created_at': Booking.created_at,
+    'updated_at': Booking.updated_at,
+}
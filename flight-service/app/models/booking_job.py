@@ -0,0 +1,80 @@
+"""
+Booking job model (durable queue for booking processing).
+"""
+import json
+from datetime import datetime
+from app import db
+from app.utils import format_utc
+
+
+class BookingJob(db.Model):
+    """Queued processing of a booking, claimed by booking workers."""
+    
+    __tablename__ = 'booking_jobs'
+    
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Booking Reference (first booking of a batch job)
+    booking_id = db.Column(
+        db.Integer, db.ForeignKey('bookings.id', ondelete='CASCADE'), nullable=False, index=True
+    )
+    
+    # All bookings of a batch job as a JSON list (NULL for a single booking)
+    booking_ids = db.Column(db.Text, nullable=True)
+    
+    # Status: QUEUED, RUNNING, DONE, DEAD
+    status = db.Column(db.String(20), default='QUEUED', nullable=False)
+    
+    # Number of times the job was claimed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    
+    # QUEUED: earliest time the job may run (retry backoff);
+    # RUNNING: end of the visibility timeout, after which it may be claimed again
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Worker holding the job and last failure
+    locked_by = db.Column(db.String(100), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Workers claim jobs by (status, available_at)
+    __table_args__ = (
+        db.Index('ix_booking_jobs_status_available_at', 'status', 'available_at'),
+    )
+    
+    def __init__(self, booking_id, booking_ids=None):
+        """Initialize a new queued job."""
+        now = datetime.utcnow()
+        self.booking_id = booking_id
+        self.booking_ids = json.dumps(booking_ids) if booking_ids and len(booking_ids) > 1 else None
+        self.status = 'QUEUED'
+        self.attempts = 0
+        self.available_at = now
+        self.created_at = now
+    
+    def booking_id_list(self):
+        """Get the IDs of all bookings processed by this job."""
+        return json.loads(self.booking_ids) if self.booking_ids else [self.booking_id]
+    
+    def to_dict(self):
+        """Convert job object to dictionary."""
+        return {
+            'id': self.id,
+            'booking_id': self.booking_id,
+            'booking_ids': self.booking_id_list(),
+            'status': self.status,
+            'attempts': self.attempts,
+            'available_at': format_utc(self.available_at),
+            'locked_by': self.locked_by,
+            'last_error': self.last_error,
+            'created_at': format_utc(self.created_at),
+            'updated_at': format_utc(self.updated_at)
+        }
+    
+    def __repr__(self):
+        """String representation of BookingJob."""
+        return f'<BookingJob Booking:{self.booking_id} - {self.status}>'
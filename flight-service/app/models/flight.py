@@ -1,8 +1,9 @@
 """
 Flight model for managing flights.
 """
-from datetime import datetime, timezone
+from datetime import datetime, timedelta
 from app import db
+from app.utils import format_utc
 
 
 class Flight(db.Model):
@@ -21,12 +22,17 @@ class Flight(db.Model):
     
     # Departure & Arrival
     departure_time = db.Column(db.DateTime, nullable=False, index=True)
+    arrival_time = db.Column(db.DateTime, nullable=True, index=True)  # departure_time + duration
     departure_airport = db.Column(db.String(200), nullable=False)
     arrival_airport = db.Column(db.String(200), nullable=False)
     
     # Pricing
     ticket_price = db.Column(db.Numeric(10, 2), nullable=False)
     
+    # Seat inventory (seats_sold only changes through reserve_seat/release_seat)
+    capacity = db.Column(db.Integer, nullable=False, default=180)
+    seats_sold = db.Column(db.Integer, nullable=False, default=0)
+    
     # Creator
     created_by = db.Column(db.Integer, nullable=False)  # Manager user ID from Server DB
     
@@ -40,13 +46,28 @@ class Flight(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Tab queries filter on status and a time range; search filters on route,
+    # airline and price within a departure window; FULLTEXT (ngram) for name;
+    # the changes feed reads in (updated_at, id) order
+    __table_args__ = (
+        db.Index('ix_flights_status_departure_time', 'status', 'departure_time'),
+        db.Index('ix_flights_status_arrival_time', 'status', 'arrival_time'),
+        db.Index('ix_flights_route_departure_time',
+                 'departure_airport', 'arrival_airport', 'departure_time'),
+        db.Index('ix_flights_airline_departure_time', 'airline_id', 'departure_time'),
+        db.Index('ix_flights_ticket_price', 'ticket_price'),
+        db.Index('ft_flights_name', 'name', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        db.Index('ix_flights_updated_at_id', 'updated_at', 'id'),
+        db.CheckConstraint('seats_sold >= 0 AND seats_sold <= capacity', name='ck_flights_seats_sold'),
+    )
+    
     # Relationships
     bookings = db.relationship('Booking', backref='flight', lazy='dynamic', cascade='all, delete-orphan')
     ratings = db.relationship('Rating', backref='flight', lazy='dynamic', cascade='all, delete-orphan')
     
     def __init__(self, name, airline_id, distance_km, duration_minutes, 
                  departure_time, departure_airport, arrival_airport, 
-                 ticket_price, created_by):
+                 ticket_price, created_by, capacity=180):
         """Initialize a new flight."""
         self.name = name
         self.airline_id = airline_id
@@ -57,7 +78,15 @@ class Flight(db.Model):
         self.arrival_airport = arrival_airport
         self.ticket_price = ticket_price
         self.created_by = created_by
+        self.capacity = capacity
+        self.seats_sold = 0
         self.status = 'PENDING'
+        self.refresh_arrival_time()
+    
+    def refresh_arrival_time(self):
+        """Recompute stored arrival time from departure time and duration."""
+        if self.departure_time and self.duration_minutes:
+            self.arrival_time = self.departure_time + timedelta(minutes=self.duration_minutes)
     
     def approve(self):
         """Approve the flight."""
@@ -80,72 +109,238 @@ class Flight(db.Model):
         """Mark flight as completed."""
         self.status = 'COMPLETED'
     
-    def is_upcoming(self):
+    @staticmethod
+    def reserve_seat(flight_id, now=None):
+        """
+        Take one seat with a single conditional UPDATE (no read-check-write).
+        
+        The row lock is held only for this statement until the caller
+        commits, and the condition is re-evaluated under that lock, so
+        concurrent bookings can never oversell.
+        
+        Args:
+            flight_id: Flight ID
+            now: Reference time (naive UTC), defaults to utcnow
+        
+        Returns:
+            bool: True if a seat was reserved
+        """
+        now = now or datetime.utcnow()
+        reserved = Flight.query.filter(
+            Flight.id == flight_id,
+            Flight.status == 'APPROVED',
+            Flight.departure_time > now,
+            Flight.seats_sold < Flight.capacity
+        ).update({
+            Flight.seats_sold: Flight.seats_sold + 1
+        }, synchronize_session=False)
+        return reserved == 1
+    
+    @staticmethod
+    def release_seat(flight_id):
+        """
+        Give back one seat (booking failed, cancelled or refunded).
+        
+        Args:
+            flight_id: Flight ID
+        
+        Returns:
+            bool: True if a seat was released
+        """
+        released = Flight.query.filter(
+            Flight.id == flight_id,
+            Flight.seats_sold > 0
+        ).update({
+            Flight.seats_sold: Flight.seats_sold - 1
+        }, synchronize_session=False)
+        return released == 1
+    
+    def get_end_time(self):
+        """Get scheduled arrival time (stored, or computed from duration)."""
+        if self.arrival_time:
+            return self.arrival_time
+        return self.departure_time + timedelta(minutes=self.duration_minutes)
+    
+    def is_upcoming(self, now=None):
         """Check if flight is upcoming (approved and not started)."""
-        return self.status == 'APPROVED' and datetime.utcnow() < self.departure_time
+        now = now or datetime.utcnow()
+        return self.status == 'APPROVED' and now < self.departure_time
     
-    def is_ongoing(self):
+    def is_ongoing(self, now=None):
         """Check if flight is currently ongoing."""
         if self.status != 'APPROVED' and self.status != 'ONGOING':
             return False
         
-        now = datetime.utcnow()
-        from datetime import timedelta
-        end_time = self.departure_time + timedelta(minutes=self.duration_minutes)
-        
-        return self.departure_time <= now < end_time
+        now = now or datetime.utcnow()
+        return self.departure_time <= now < self.get_end_time()
     
-    def is_completed(self):
+    def is_completed(self, now=None):
         """Check if flight is completed."""
         if self.status == 'COMPLETED':
             return True
         
-        now = datetime.utcnow()
-        from datetime import timedelta
-        end_time = self.departure_time + timedelta(minutes=self.duration_minutes)
-        
-        return now >= end_time
+        now = now or datetime.utcnow()
+        return now >= self.get_end_time()
     
-    def get_remaining_time(self):
+    def get_remaining_time(self, now=None):
         """Get remaining time in minutes for ongoing flight."""
-        if not self.is_ongoing():
+        now = now or datetime.utcnow()
+        if not self.is_ongoing(now):
             return 0
         
-        from datetime import timedelta
-        now = datetime.utcnow()
-        end_time = self.departure_time + timedelta(minutes=self.duration_minutes)
-        remaining = end_time - now
+        remaining = self.get_end_time() - now
         
         return max(0, int(remaining.total_seconds() / 60))
     
-    def to_dict(self):
+    def to_dict(self, now=None):
         """Convert flight object to dictionary."""
-        def _format_utc(value):
-            if not value:
-                return None
-            return value.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
-
+        return Flight.serialize(self, now or datetime.utcnow())
+    
+    @staticmethod
+    def serialize(row, now):
+        """
+        Convert a flight (model instance or row of SERIALIZED_COLUMNS) to dictionary.
+        
+        Computed flags are evaluated against the given 'now' so a whole list
+        shares one clock reading.
+        
+        Args:
+            row: Flight instance or row with the SERIALIZED_COLUMNS attributes
+            now: Reference time (naive UTC)
+        
+        Returns:
+            dict: Serialized flight
+        """
+        status = row.status
+        departure_time = row.departure_time
+        end_time = row.arrival_time or departure_time + timedelta(minutes=row.duration_minutes)
+        
+        is_ongoing = status in ('APPROVED', 'ONGOING') and departure_time <= now < end_time
+        
         return {
-            'id': self.id,
-            'name': self.name,
-            'airline_id': self.airline_id,
-            'distance_km': self.distance_km,
-            'duration_minutes': self.duration_minutes,
-            'departure_time': _format_utc(self.departure_time),
-            'departure_airport': self.departure_airport,
-            'arrival_airport': self.arrival_airport,
-            'ticket_price': float(self.ticket_price),
-            'created_by': self.created_by,
-            'status': self.status,
-            'rejection_reason': self.rejection_reason,
-            'is_upcoming': self.is_upcoming(),
-            'is_ongoing': self.is_ongoing(),
-            'is_completed': self.is_completed(),
-            'remaining_time': self.get_remaining_time() if self.is_ongoing() else None,
-            'created_at': _format_utc(self.created_at),
-            'updated_at': _format_utc(self.updated_at)
+            'id': row.id,
+            'name': row.name,
+            'airline_id': row.airline_id,
+            'distance_km': row.distance_km,
+            'duration_minutes': row.duration_minutes,
+            'departure_time': format_utc(departure_time),
+            'arrival_time': format_utc(row.arrival_time),
+            'departure_airport': row.departure_airport,
+            'arrival_airport': row.arrival_airport,
+            'ticket_price': float(row.ticket_price),
+            'capacity': row.capacity,
+            'seats_sold': row.seats_sold,
+            'seats_available': row.capacity - row.seats_sold,
+            'created_by': row.created_by,
+            'status': status,
+            'rejection_reason': row.rejection_reason,
+            'is_upcoming': status == 'APPROVED' and now < departure_time,
+            'is_ongoing': is_ongoing,
+            'is_completed': status == 'COMPLETED' or now >= end_time,
+            'remaining_time': max(0, int((end_time - now).total_seconds() / 60)) if is_ongoing else None,
+            'created_at': format_utc(row.created_at),
+            'updated_at': format_utc(row.updated_at)
         }
     
+    @staticmethod
+    def serialize_many(rows, now=None):
+        """
+        Serialize a list of flights with a single clock reading.
+        
+        Args:
+            rows: Flight instances or rows of SERIALIZED_COLUMNS
+            now: Reference time (naive UTC), defaults to utcnow
+        
+        Returns:
+            list: Serialized flights
+        """
+        now = now or datetime.utcnow()
+        serialize = Flight.serialize
+        return [serialize(row, now) for row in rows]
+    
     def __repr__(self):
         """String representation of Flight."""
         return f'<Flight {self.name} - {self.status}>'
+
+
+# Columns needed by Flight.serialize; list endpoints select only these so
+# rows are plain tuples without ORM identity-map overhead
+Flight.SERIALIZED_COLUMNS = (
+    Flight.id, Flight.name, Flight.airline_id, Flight.distance_km,
+    Flight.duration_minutes, Flight.departure_time, Flight.arrival_time,
+    Flight.departure_airport, Flight.arrival_airport, Flight.ticket_price,
+    Flight.capacity, Flight.seats_sold, Flight.created_by, Flight.status, Flight.rejection_reason,
+    Flight.created_at, Flight.updated_at
+)
+
+
+def _end_time(row):
+    return row.arrival_time or row.departure_time + timedelta(minutes=row.duration_minutes)
+
+
+def _is_ongoing(row, now):
+    return row.status in ('APPROVED', 'ONGOING') and row.departure_time <= now < _end_time(row)
+
+
+def _remaining_time(row, now):
+    if not _is_ongoing(row, now):
+        return None
+    return max(0, int((_end_time(row) - now).total_seconds() / 60))
+
+
+# Columns read by the computed lifecycle flags
+_LIFECYCLE_COLUMNS = (
+    Flight.status, Flight.departure_time, Flight.arrival_time, Flight.duration_minutes
+)
+
+# Sparse fieldsets: field name -> (columns to select, getter(row, now)),
+# matching the keys and values of Flight.serialize
+Flight.FIELDS = {
+    'id': ((Flight.id,), lambda row, now: row.id),
+    'name': ((Flight.name,), lambda row, now: row.name),
+    'airline_id': ((Flight.airline_id,), lambda row, now: row.airline_id),
+    'distance_km': ((Flight.distance_km,), lambda row, now: row.distance_km),
+    'duration_minutes': ((Flight.duration_minutes,), lambda row, now: row.duration_minutes),
+    'departure_time': ((Flight.departure_time,), lambda row, now: format_utc(row.departure_time)),
+    'arrival_time': ((Flight.arrival_time,), lambda row, now: format_utc(row.arrival_time)),
+    'departure_airport': ((Flight.departure_airport,), lambda row, now: row.departure_airport),
+    'arrival_airport': ((Flight.arrival_airport,), lambda row, now: row.arrival_airport),
+    'ticket_price': ((Flight.ticket_price,), lambda row, now: float(row.ticket_price)),
+    'capacity': ((Flight.capacity,), lambda row, now: row.capacity),
+    'seats_sold': ((Flight.seats_sold,), lambda row, now: row.seats_sold),
+    'seats_available': (
+        (Flight.capacity, Flight.seats_sold),
+        lambda row, now: row.capacity - row.seats_sold
+    ),
+    'created_by': ((Flight.created_by,), lambda row, now: row.created_by),
+    'status': ((Flight.status,), lambda row, now: row.status),
+    'rejection_reason': ((Flight.rejection_reason,), lambda row, now: row.rejection_reason),
+    'is_upcoming': (
+        (Flight.status, Flight.departure_time),
+        lambda row, now: row.status == 'APPROVED' and now < row.departure_time
+    ),
+    'is_ongoing': (_LIFECYCLE_COLUMNS, _is_ongoing),
+    'is_completed': (
+        _LIFECYCLE_COLUMNS,
+        lambda row, now: row.status == 'COMPLETED' or now >= _end_time(row)
+    ),
+    'remaining_time': (_LIFECYCLE_COLUMNS, _remaining_time),
+    'created_at': ((Flight.created_at,), lambda row, now: format_utc(row.created_at)),
+    'updated_at': ((Flight.updated_at,), lambda row, now: format_utc(row.updated_at)),
+}
+
+# Non-nullable columns usable for sort= (keyset pagination needs non-null keys)
+Flight.SORT_COLUMNS = {
+    'id': Flight.id,
+    'name': Flight.name,
+    'airline_id': Flight.airline_id,
+    'distance_km': Flight.distance_km,
+    'duration_minutes': Flight.duration_minutes,
+    'departure_time': Flight.departure_time,
+    'ticket_price': Flight.ticket_price,
+    'capacity': Flight.capacity,
+    'seats_sold': Flight.seats_sold,
+    'status': Flight.status,
+    'created_at': Flight.created_at,
+    'updated_at': Flight.updated_at,
+}
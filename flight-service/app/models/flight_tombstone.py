@@ -0,0 +1,42 @@
+"""
+Flight tombstone model for delta synchronization.
+"""
+from datetime import datetime
+from app import db
+from app.utils import format_utc
+
+
+class FlightTombstone(db.Model):
+    """Record of a deleted flight, so sync clients can drop it."""
+    
+    __tablename__ = 'flight_tombstones'
+    
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Deleted flight ID (row no longer exists in flights)
+    flight_id = db.Column(db.Integer, nullable=False)
+    
+    # Timestamp
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Changes feed reads tombstones in (deleted_at, id) order
+    __table_args__ = (
+        db.Index('ix_flight_tombstones_deleted_at_id', 'deleted_at', 'id'),
+    )
+    
+    def __init__(self, flight_id):
+        """Initialize a new tombstone."""
+        self.flight_id = flight_id
+        self.deleted_at = datetime.utcnow()
+    
+    def to_dict(self):
+        """Convert tombstone object to dictionary."""
+        return {
+            'flight_id': self.flight_id,
+            'deleted_at': format_utc(self.deleted_at)
+        }
+    
+    def __repr__(self):
+        """String representation of FlightTombstone."""
+        return f'<FlightTombstone Flight:{self.flight_id}>'
@@ -0,0 +1,64 @@
+"""
+Idempotency key model (replay of POST /api/bookings responses).
+"""
+import json
+from datetime import datetime
+from app import db
+
+
+class IdempotencyKey(db.Model):
+    """Idempotency-Key sent by a user, with the response it produced."""
+    
+    __tablename__ = 'idempotency_keys'
+    
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Keys are scoped per user
+    user_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    
+    # Hash of the request the key was first used with
+    fingerprint = db.Column(db.String(64), nullable=False)
+    
+    # Status: IN_PROGRESS, DONE
+    status = db.Column(db.String(20), default='IN_PROGRESS', nullable=False)
+    
+    # Stored response (set when DONE)
+    response_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    
+    # IN_PROGRESS: end of the lease; after it a retry may take the key over
+    locked_until = db.Column(db.DateTime, nullable=True)
+    
+    # Timestamps (expires_at: end of the replay window once DONE)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    # One row per (user, key); the unique index is what serializes retries
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),
+    )
+    
+    def __init__(self, user_id, key, fingerprint, expires_at, locked_until):
+        """Initialize a new in-progress key."""
+        self.user_id = user_id
+        self.key = key
+        self.fingerprint = fingerprint
+        self.status = 'IN_PROGRESS'
+        self.created_at = datetime.utcnow()
+        self.expires_at = expires_at
+        self.locked_until = locked_until
+    
+    def response(self):
+        """
+        Get the stored response.
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        return json.loads(self.response_body), self.response_code
+    
+    def __repr__(self):
+        """String representation of IdempotencyKey."""
+        return f'<IdempotencyKey User:{self.user_id} - {self.status}>'
@@ -0,0 +1,81 @@
+"""
+Outbox message model (commands for the Server, sent by the outbox relay).
+"""
+import json
+from datetime import datetime
+from app import db
+from app.utils import format_utc
+
+
+class OutboxMessage(db.Model):
+    """Command written in the same transaction as the change that caused it."""
+    
+    __tablename__ = 'outbox_messages'
+    
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Kind: REFUND, FLIGHT_CANCELLED_EMAIL
+    kind = db.Column(db.String(50), nullable=False)
+    
+    # JSON payload sent to the Server
+    payload = db.Column(db.Text, nullable=False)
+    
+    # Identifies the command; the Server applies a refund once per key
+    dedup_key = db.Column(db.String(255), nullable=False, unique=True)
+    
+    # Status: PENDING, SENT, DEAD
+    status = db.Column(db.String(20), default='PENDING', nullable=False)
+    
+    # Delivery attempts and last failure
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    
+    # PENDING: earliest next attempt (retry backoff), extended by a relay's lease
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Claim token of the relay batch currently delivering the message
+    locked_by = db.Column(db.String(100), nullable=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    # The relay reads due messages by (status, available_at)
+    __table_args__ = (
+        db.Index('ix_outbox_messages_status_available_at', 'status', 'available_at'),
+    )
+    
+    def __init__(self, kind, payload, dedup_key):
+        """Initialize a new pending message."""
+        now = datetime.utcnow()
+        self.kind = kind
+        self.payload = json.dumps(payload, default=str)
+        self.dedup_key = dedup_key
+        self.status = 'PENDING'
+        self.attempts = 0
+        self.available_at = now
+        self.created_at = now
+    
+    def data(self):
+        """Get the decoded payload."""
+        return json.loads(self.payload)
+    
+    def to_dict(self):
+        """Convert outbox message object to dictionary."""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': self.data(),
+            'dedup_key': self.dedup_key,
+            'status': self.status,
+            'attempts': self.attempts,
+            'available_at': format_utc(self.available_at),
+            'last_error': self.last_error,
+            'created_at': format_utc(self.created_at),
+            'sent_at': format_utc(self.sent_at)
+        }
+    
+    def __repr__(self):
+        """String representation of OutboxMessage."""
+        return f'<OutboxMessage {self.kind} {self.dedup_key} - {self.status}>'
@@ -1,8 +1,9 @@
 """
 Rating model for flight reviews.
 """
-from datetime import datetime, timezone
+from datetime import datetime
 from app import db
+from app.utils import format_utc
 
 
 class Rating(db.Model):
@@ -42,18 +43,13 @@ class Rating(db.Model):
     
     def to_dict(self):
         """Convert rating object to dictionary."""
-        def _format_utc(value):
-            if not value:
-                return None
-            return value.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
-
         return {
             'id': self.id,
             'flight_id': self.flight_id,
             'user_id': self.user_id,
             'rating': self.rating,
             'comment': self.comment,
-            'created_at': _format_utc(self.created_at)
+            'created_at': format_utc(self.created_at)
         }
     
     @staticmethod
@@ -66,3 +62,22 @@ class Rating(db.Model):
     def __repr__(self):
         """String representation of Rating."""
         return f'<Rating Flight:{self.flight_id} User:{self.user_id} - {self.rating}/5>'
+
+
+# Sparse fieldsets: field name -> (columns to select, getter(row, now)),
+# matching the keys and values of Rating.to_dict
+Rating.FIELDS = {
+    'id': ((Rating.id,), lambda row, now: row.id),
+    'flight_id': ((Rating.flight_id,), lambda row, now: row.flight_id),
+    'user_id': ((Rating.user_id,), lambda row, now: row.user_id),
+    'rating': ((Rating.rating,), lambda row, now: row.rating),
+    'comment': ((Rating.comment,), lambda row, now: row.comment),
+    'created_at': ((Rating.created_at,), lambda row, now: format_utc(row.created_at)),
+}
+
+# Columns usable for sort=
+Rating.SORT_COLUMNS = {
+    'id': Rating.id,
+    'rating': Rating.rating,
+    'created_at': Rating.created_at,
+}
@@ -2,9 +2,10 @@
 """
 Booking management routes.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.services import BookingService
-from app.dto import BookingCreateDTO
+from app.dto import BookingCreateDTO, BookingBatchCreateDTO
+from app.utils import is_not_modified, not_modified, json_with_etag, wants_stream, stream_json_list
 
 bookings_bp = Blueprint('bookings', __name__)
 
@@ -15,6 +16,7 @@ def create_booking():
     Create a new booking (buy ticket).
     
     POST /api/bookings
+    Headers: Idempotency-Key: <unique key> (optional, makes retries safe)
     Body: {
         "flight_id": 1,
         "user_id": 3
@@ -29,15 +31,59 @@ def create_booking():
         # Create DTO
         booking_dto = BookingCreateDTO.from_dict(data)
         
-        # Create booking (async processing)
-        response, status_code = BookingService.create_booking(booking_dto)
+        idempotency_key = request.headers.get('Idempotency-Key')
         
-        return jsonify(response), status_code
+        if idempotency_key is None:
+            # Create booking (async processing)
+            response, status_code = BookingService.create_booking(booking_dto)
+            
+            return jsonify(response), status_code
+        
+        if not idempotency_key.strip() or len(idempotency_key) > 255:
+            return jsonify({'error': 'Idempotency-Key must be 1-255 characters'}), 400
+        
+        response, status_code, replayed = BookingService.create_booking_idempotent(
+            booking_dto, idempotency_key
+        )
+        
+        result = jsonify(response)
+        if replayed:
+            result.headers['Idempotent-Replayed'] = 'true'
+        
+        return result, status_code
     
     except Exception as e:
         return jsonify({'error': f'Failed to create booking: {str(e)}'}), 500
 
 
+@bookings_bp.route('/batch', methods=['POST'])
+def create_bookings():
+    """
+    Create several bookings in one request (per-item outcomes).
+    
+    POST /api/bookings/batch
+    Body: {
+        "items": [
+            {"flight_id": 1, "user_id": 3},
+            {"flight_id": 2, "user_id": 3}
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        batch_dto = BookingBatchCreateDTO.from_dict(data, current_app.config['BOOKING_BATCH_MAX_ITEMS'])
+        response, status_code = BookingService.create_bookings(batch_dto)
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to create bookings: {str(e)}'}), 500
+
+
 @bookings_bp.route('/<int:booking_id>', methods=['GET'])
 def get_booking(booking_id):
     """
@@ -60,11 +106,30 @@ def get_user_bookings(user_id):
     Get all bookings for a user.
     
     GET /api/bookings/user/{user_id}
+    GET /api/bookings/user/{user_id}?fields=id,status,flight.name,flight.departure_time&sort=-created_at
+    GET /api/bookings/user/{user_id}?status=upcoming&limit=20&cursor=<next_cursor>
+        (status: upcoming, past or cancelled; keyset pagination)
+    GET /api/bookings/user/{user_id}?dedupe=true  (flights once, in a 'flights' map by ID)
     """
     try:
-        response, status_code = BookingService.get_user_bookings(user_id)
+        fields = request.args.get('fields')
+        sort = request.args.get('sort')
+        status = request.args.get('status')
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        dedupe_flights = request.args.get('dedupe', '').lower() in ('1', 'true')
         
-        return jsonify(response), status_code
+        etag = BookingService.get_user_bookings_etag(
+            user_id, fields, sort, status, limit, cursor, dedupe_flights
+        )
+        if is_not_modified(etag):
+            return not_modified(etag)
+        
+        response, status_code = BookingService.get_user_bookings(
+            user_id, fields, sort, status, limit, cursor, dedupe_flights
+        )
+        
+        return json_with_etag(response, status_code, etag)
     
     except Exception as e:
         return jsonify({'error': f'Failed to fetch user bookings: {str(e)}'}), 500
@@ -73,14 +138,58 @@ def get_user_bookings(user_id):
 @bookings_bp.route('/flight/<int:flight_id>', methods=['GET'])
 def get_flight_bookings(flight_id):
     """
-    Get all bookings for a flight.
+    Get the bookings of a flight (manifest), ordered by booking ID.
     
     GET /api/bookings/flight/{flight_id}
+    GET /api/bookings/flight/{flight_id}?limit=100&cursor=<next_cursor>  (keyset pagination)
+    GET /api/bookings/flight/{flight_id}?stream=true[&cursor=<next_cursor>]  (streamed JSON or NDJSON)
+    """
+    try:
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        
+        if wants_stream():
+            try:
+                bookings = BookingService.iter_flight_bookings(flight_id, cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return stream_json_list('bookings', bookings)
+        
+        response, status_code = BookingService.get_flight_bookings(flight_id, limit, cursor)
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch flight bookings: {str(e)}'}), 500
+
+
+@bookings_bp.route('/flight/<int:flight_id>/summary', methods=['GET'])
+def get_flight_booking_summary(flight_id):
+    """
+    Get booking counts per status, revenue and latest booking time of a flight.
+    
+    GET /api/bookings/flight/{flight_id}/summary
+    """
+    try:
+        response, status_code = BookingService.get_flight_booking_summary(flight_id)
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch flight booking summary: {str(e)}'}), 500
+
+
+@bookings_bp.route('/jobs/dead', methods=['GET'])
+def get_dead_booking_jobs():
+    """
+    Get booking jobs that exhausted their retries (dead-letter list).
+    
+    GET /api/bookings/jobs/dead
     """
     try:
-        response, status_code = BookingService.get_flight_bookings(flight_id)
+        response, status_code = BookingService.get_dead_booking_jobs()
         
         return jsonify(response), status_code
     
     except Exception as e:
-        return jsonify({'error': f'Failed to fetch flight bookings: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Failed to fetch booking jobs: {str(e)}'}), 500
\ No newline at end of file
@@ -2,11 +2,15 @@
 Flight management routes.
 """
 from flask import Blueprint, request, jsonify, current_app
-from flask_socketio import emit
+from flask_socketio import emit, join_room
 from app.services import FlightService
 from app.dto import FlightCreateDTO, FlightUpdateDTO, FlightApprovalDTO, FlightSearchDTO
+from app.utils import (
+    is_not_modified, not_modified, json_with_etag, wants_stream, stream_json_list,
+    emit_flight_status_changed, emit_flight_cancelled, emit_flight_updated, current_seq,
+    outbox_relay, user_room, authenticate_socket, server_client
+)
 from app import socketio
-import requests
 
 flights_bp = Blueprint('flights', __name__)
 
@@ -63,23 +67,96 @@ def get_all_flights():
     Get all flights with optional filters.
     
     GET /api/flights?name=BEG&airline_id=1&status=APPROVED
+    GET /api/flights?limit=50&cursor=<next_cursor>  (keyset pagination)
+    GET /api/flights?stream=true  (streamed JSON; NDJSON with Accept: application/x-ndjson)
+    GET /api/flights?fields=id,name,departure_time&sort=-ticket_price  (projection, order)
     """
     try:
         # Get query parameters
         search_dto = FlightSearchDTO.from_dict({
             'name': request.args.get('name'),
             'airline_id': request.args.get('airline_id', type=int),
-            'status': request.args.get('status')
+            'status': request.args.get('status'),
+            'limit': request.args.get('limit', type=int),
+            'cursor': request.args.get('cursor'),
+            'fields': request.args.get('fields'),
+            'sort': request.args.get('sort')
         })
         
+        if wants_stream() and not search_dto.is_paginated():
+            errors = search_dto.validate()
+            if errors:
+                return jsonify({'errors': errors}), 400
+            return stream_json_list('flights', FlightService.iter_flights(search_dto))
+        
+        etag = FlightService.get_all_flights_etag(search_dto)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        
         response, status_code = FlightService.get_all_flights(search_dto)
         
-        return jsonify(response), status_code
+        return json_with_etag(response, status_code, etag)
     
     except Exception as e:
         return jsonify({'error': f'Failed to fetch flights: {str(e)}'}), 500
 
 
+@flights_bp.route('/search', methods=['GET'])
+def search_flights():
+    """
+    Search flights by route, departure window, price range and airline.
+    
+    GET /api/flights/search?departure_airport=BEG&arrival_airport=JFK
+        &date_from=2025-01-15&date_to=2025-01-20&min_price=100&max_price=800
+        &airline_id=1&name=BEG&limit=50&cursor=<next_cursor>
+        &fields=id,name,departure_time,ticket_price&sort=ticket_price
+    """
+    try:
+        search_dto = FlightSearchDTO.from_dict({
+            'name': request.args.get('name'),
+            'airline_id': request.args.get('airline_id', type=int),
+            'status': request.args.get('status'),
+            'limit': request.args.get('limit', type=int),
+            'cursor': request.args.get('cursor'),
+            'departure_airport': request.args.get('departure_airport'),
+            'arrival_airport': request.args.get('arrival_airport'),
+            'date_from': request.args.get('date_from'),
+            'date_to': request.args.get('date_to'),
+            'min_price': request.args.get('min_price', type=float),
+            'max_price': request.args.get('max_price', type=float),
+            'fields': request.args.get('fields'),
+            'sort': request.args.get('sort')
+        })
+        
+        response, status_code = FlightService.search_flights(search_dto)
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to search flights: {str(e)}'}), 500
+
+
+@flights_bp.route('/changes', methods=['GET'])
+def get_flight_changes():
+    """
+    Get flights created, updated or deleted since a cursor (delta sync).
+    
+    GET /api/flights/changes?since=<next_cursor>&limit=200
+    Response: {"changed": [...], "deleted": [flight_id, ...],
+               "next_cursor": "...", "has_more": false}
+    """
+    try:
+        response, status_code = FlightService.get_flight_changes(
+            since=request.args.get('since'),
+            limit=request.args.get('limit', type=int)
+        )
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch flight changes: {str(e)}'}), 500
+
+
 @flights_bp.route('/tabs', methods=['GET'])
 def get_flights_by_tab():
     """
@@ -88,9 +165,12 @@ def get_flights_by_tab():
     GET /api/flights/tabs
     """
     try:
-        response, status_code = FlightService.get_flights_by_tab()
+        # Body and ETag come from one snapshot read
+        response, status_code, etag = FlightService.get_flights_by_tab_with_etag()
+        if etag is not None and is_not_modified(etag):
+            return not_modified(etag)
         
-        return jsonify(response), status_code
+        return json_with_etag(response, status_code, etag)
     
     except Exception as e:
         return jsonify({'error': f'Failed to fetch flights by tab: {str(e)}'}), 500
@@ -128,19 +208,22 @@ def generate_report():
         normalized_type = response.get('report_type')
         
         try:
-            server_url = current_app.config['SERVER_URL']
             with open(pdf_path, 'rb') as pdf_file:
-                notify_response = requests.post(
-                    f"{server_url}/api/notifications/flight-report",
-                    data={
-                        'user_id': admin_id,
-                        'report_type': normalized_type
-                    },
-                    files={
-                        'file': ('flight_report.pdf', pdf_file, 'application/pdf')
-                    },
-                    timeout=10
-                )
+                pdf_data = pdf_file.read()
+            
+            # Sends an email: only retried if the request never reached the Server
+            notify_response = server_client.post(
+                'flight_report_email', '/api/notifications/flight-report',
+                data={
+                    'user_id': admin_id,
+                    'report_type': normalized_type
+                },
+                files={
+                    'file': ('flight_report.pdf', pdf_data, 'application/pdf')
+                },
+                timeout=10,
+                idempotent=False
+            )
             
             if notify_response.status_code != 200:
                 current_app.logger.error(
@@ -167,9 +250,17 @@ def get_pending_flights():
     Get all pending flights (for admin approval).
     
     GET /api/flights/pending
+    GET /api/flights/pending?limit=50&cursor=<next_cursor>  (keyset pagination)
+    GET /api/flights/pending?stream=true  (streamed JSON or NDJSON)
     """
     try:
-        response, status_code = FlightService.get_pending_flights()
+        if wants_stream():
+            return stream_json_list('flights', FlightService.iter_pending_flights())
+        
+        response, status_code = FlightService.get_pending_flights(
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor')
+        )
         
         return jsonify(response), status_code
     
@@ -185,9 +276,13 @@ def get_flight(flight_id):
     GET /api/flights/{flight_id}
     """
     try:
+        etag = FlightService.get_flight_etag(flight_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        
         response, status_code = FlightService.get_flight_by_id(flight_id)
         
-        return jsonify(response), status_code
+        return json_with_etag(response, status_code, etag)
     
     except Exception as e:
         return jsonify({'error': f'Failed to fetch flight: {str(e)}'}), 500
@@ -216,6 +311,9 @@ def approve_reject_flight(flight_id):
         # Approve/reject flight
         response, status_code = FlightService.approve_reject_flight(flight_id, approval_dto)
         
+        if status_code == 200:
+            emit_flight_status_changed(response['flight']['status'], [flight_id])
+        
         return jsonify(response), status_code
     
     except Exception as e:
@@ -254,6 +352,7 @@ def update_flight(flight_id):
         if status_code == 200:
             flight_data = response.get('flight')
             socketio.emit('new_flight', flight_data, namespace='/')
+            emit_flight_updated(flight_id, status=flight_data.get('status'))
         
         return jsonify(response), status_code
     
@@ -271,38 +370,10 @@ def cancel_flight(flight_id):
     try:
         response, status_code = FlightService.cancel_flight(flight_id)
         
-        # If successful, send email notifications to all affected users
+        # Refunds and emails were queued with the cancellation; deliver them
         if status_code == 200:
-            affected_users = response.get('affected_users', [])
-            flight_data = response.get('flight')
-            
-            # Send email notifications via Server
-            try:
-                from flask import current_app
-                server_url = current_app.config['SERVER_URL']
-                
-                for user_id in affected_users:
-                    # Refund user for cancelled flight
-                    try:
-                        requests.post(
-                            f"{server_url}/api/users/{user_id}/refund",
-                            json={'amount': flight_data.get('ticket_price')},
-                            timeout=5
-                        )
-                    except Exception as e:
-                        current_app.logger.error(f"Failed to refund user {user_id}: {str(e)}")
-
-                    # Notify user about cancellation
-                    requests.post(
-                        f"{server_url}/api/notifications/flight-cancelled",
-                        json={
-                            'user_id': user_id,
-                            'flight': flight_data
-                        },
-                        timeout=5
-                    )
-            except Exception as e:
-                current_app.logger.error(f"Failed to send cancellation emails: {str(e)}")
+            emit_flight_cancelled(flight_id)
+            outbox_relay.notify(current_app._get_current_object())
         
         return jsonify(response), status_code
     
@@ -320,6 +391,9 @@ def delete_flight(flight_id):
     try:
         response, status_code = FlightService.delete_flight(flight_id)
         
+        if status_code == 200:
+            emit_flight_updated(flight_id, deleted=True)
+        
         return jsonify(response), status_code
     
     except Exception as e:
@@ -328,8 +402,16 @@ def delete_flight(flight_id):
 
 # WebSocket event handlers
 @socketio.on('connect', namespace='/')
-def handle_connect():
-    """Handle client connection."""
+def handle_connect(auth=None):
+    """
+    Handle client connection.
+    
+    Clients that send their access token (auth={"token": ...}) join their
+    user room and receive booking_completed / booking_cancelled events.
+    """
+    user_id = authenticate_socket(auth)
+    if user_id is not None:
+        join_room(user_room(user_id))
     print('Client connected to Flight Service WebSocket')
 
 
@@ -337,3 +419,17 @@ def handle_connect():
 def handle_disconnect():
     """Handle client disconnection."""
     print('Client disconnected from Flight Service WebSocket')
+
+
+@socketio.on('resync', namespace='/')
+def handle_resync(data=None):
+    """
+    Return flight changes since a sync cursor (socket acknowledgement).
+    
+    Emit: 'resync', {"since": "<next_cursor>"}
+    Ack: changes payload of GET /api/flights/changes plus the current 'seq'
+    """
+    since = (data or {}).get('since')
+    response, _ = FlightService.get_flight_changes(since=since)
+    response['seq'] = current_seq()
+    return response
@@ -4,6 +4,7 @@ Rating management routes.
 from flask import Blueprint, request, jsonify
 from app.services import RatingService
 from app.dto import RatingCreateDTO
+from app.utils import is_not_modified, not_modified, json_with_etag, wants_stream, stream_json_list
 
 ratings_bp = Blueprint('ratings', __name__)
 
@@ -63,9 +64,13 @@ def get_flight_ratings(flight_id):
     GET /api/ratings/flight/{flight_id}
     """
     try:
+        etag = RatingService.get_flight_ratings_etag(flight_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        
         response, status_code = RatingService.get_flight_ratings(flight_id)
         
-        return jsonify(response), status_code
+        return json_with_etag(response, status_code, etag)
     
     except Exception as e:
         return jsonify({'error': f'Failed to fetch flight ratings: {str(e)}'}), 500
@@ -77,9 +82,21 @@ def get_all_ratings():
     Get all ratings (admin only).
     
     GET /api/ratings
+    GET /api/ratings?stream=true  (streamed JSON or NDJSON)
+    GET /api/ratings?fields=id,rating,flight&sort=-rating
     """
     try:
-        response, status_code = RatingService.get_all_ratings()
+        fields = request.args.get('fields')
+        sort = request.args.get('sort')
+        
+        if wants_stream():
+            try:
+                ratings = RatingService.iter_all_ratings(fields, sort)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return stream_json_list('ratings', ratings)
+        
+        response, status_code = RatingService.get_all_ratings(fields, sort)
         
         return jsonify(response), status_code
     
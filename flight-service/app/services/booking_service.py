@@ -2,11 +2,21 @@
 Booking service for managing flight bookings.
 """
 from flask import current_app
+from datetime import datetime
+import uuid
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Bundle
 import requests
 from app import db
-from app.models import Flight, Booking
-from app.dto import BookingCreateDTO
-from app.utils import start_booking_process
+from app.models import Flight, Booking, BookingJob
+from app.dto import BookingCreateDTO, BookingBatchCreateDTO
+from app.utils import (
+    enqueue_booking_job, enqueue_booking_batch_job, booking_queue_full, booking_worker_pool,
+    request_fingerprint, claim_idempotency_key, save_idempotent_response, release_idempotency_key,
+    add_refund, add_reservation_release, outbox_relay, server_client, RETRY_STATUSES,
+    clamp_limit, keyset_order, paginate_keyset, decode_cursor, after_position, sort_key,
+    parse_fields, parse_sort, columns_for, make_serializer, flight_tab_cache, format_utc
+)
 
 
 class BookingService:
@@ -47,45 +57,32 @@ class BookingService:
         if existing_booking:
             return {'error': 'You have already booked this flight'}, 409
         
+        # Don't charge the user if the workers cannot take the booking
+        if booking_queue_full():
+            return {'error': 'Booking queue is full, please try again later'}, 503
+        
+        # Reserve a seat before charging (single conditional UPDATE)
+        if not Flight.reserve_seat(flight.id):
+            db.session.rollback()
+            return {'error': 'Flight is sold out'}, 409
+        db.session.commit()
+        
+        # Tab snapshots include seats_sold
+        flight_tab_cache.invalidate()
+        
+        # Charge the user; give the seat back if that fails
+        ticket_price = flight.ticket_price
+        failure = BookingService._charge_user(
+            booking_dto.user_id, float(ticket_price), f'reserve:{uuid.uuid4().hex}'
+        )
+        if failure:
+            Flight.release_seat(flight.id)
+            db.session.commit()
+            flight_tab_cache.invalidate()
+            outbox_relay.notify(current_app._get_current_object())
+            return failure
+        
         try:
-            # Check user balance (call Server API)
-            server_url = current_app.config['SERVER_URL']
-            
-            try:
-                user_response = requests.get(
-                    f"{server_url}/api/users/{booking_dto.user_id}/internal",
-                    timeout=5
-                )
-                
-                if user_response.status_code != 200:
-                    return {'error': 'Failed to verify user'}, 400
-                
-                user_data = user_response.json().get('user', {})
-                account_balance = float(user_data.get('account_balance', 0))
-                
-                # Check if user has sufficient balance
-                if account_balance < float(flight.ticket_price):
-                    return {'error': 'Insufficient balance'}, 400
-                
-            except requests.RequestException as e:
-                current_app.logger.error(f"Failed to verify user balance: {str(e)}")
-                return {'error': 'Failed to verify user balance'}, 500
-            
-            # Deduct balance from user (call Server API)
-            try:
-                deduct_response = requests.post(
-                    f"{server_url}/api/users/{booking_dto.user_id}/deduct",
-                    json={'amount': float(flight.ticket_price)},
-                    timeout=5
-                )
-                
-                if deduct_response.status_code != 200:
-                    return {'error': 'Failed to deduct balance'}, 500
-            
-            except requests.RequestException as e:
-                current_app.logger.error(f"Failed to deduct balance: {str(e)}")
-                return {'error': 'Failed to process payment'}, 500
-            
             # Create booking with PROCESSING status
             new_booking = Booking(
                 flight_id=booking_dto.flight_id,
@@ -95,15 +92,14 @@ class BookingService:
             new_booking.mark_processing()
             
             db.session.add(new_booking)
+            db.session.flush()
+            
+            # Queue async processing in the same transaction (durable job)
+            enqueue_booking_job(new_booking)
             db.session.commit()
             
-            # Start async processing (multiprocessing)
-            start_booking_process(
-                flight_id=booking_dto.flight_id,
-                user_id=booking_dto.user_id,
-                ticket_price=float(flight.ticket_price),
-                app_config=current_app.config
-            )
+            # Wake a booking worker
+            booking_worker_pool.notify(current_app._get_current_object())
             
             return {
                 'message': 'Booking is being processed asynchronously',
@@ -113,8 +109,311 @@ class BookingService:
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Error creating booking: {str(e)}")
+            
+            # The user was already charged: give the seat and the money back
+            Flight.release_seat(booking_dto.flight_id)
+            add_refund(booking_dto.user_id, ticket_price, f'refund:failed-booking:{uuid.uuid4().hex}',
+                       'Booking could not be created')
+            db.session.commit()
+            flight_tab_cache.invalidate()
+            outbox_relay.notify(current_app._get_current_object())
             return {'error': 'Failed to create booking'}, 500
     
+    @staticmethod
+    def create_booking_idempotent(booking_dto: BookingCreateDTO, idempotency_key):
+        """
+        Create a new booking at most once per Idempotency-Key.
+        
+        A repeated key replays the stored response without charging the
+        user or queueing a job again. Client errors (4xx) and a full queue
+        (503) happen before payment, and server errors (5xx) leave the seat
+        released and any charge refunded, so they are not stored and a
+        retry with the same key runs the request again.
+        
+        Args:
+            booking_dto: BookingCreateDTO with booking data
+            idempotency_key: Idempotency-Key header value
+        
+        Returns:
+            tuple: (dict, int, bool) - (response_data, status_code, replayed)
+        """
+        errors = booking_dto.validate()
+        if errors:
+            return {'errors': errors}, 400, False
+        
+        fingerprint = request_fingerprint({
+            'flight_id': booking_dto.flight_id,
+            'user_id': booking_dto.user_id
+        })
+        state, record = claim_idempotency_key(booking_dto.user_id, idempotency_key, fingerprint)
+        
+        if state == 'MISMATCH':
+            return {'error': 'Idempotency-Key was already used for a different request'}, 422, False
+        
+        if state == 'IN_PROGRESS':
+            return {'error': 'A request with this Idempotency-Key is still being processed'}, 409, False
+        
+        if state == 'DONE':
+            response, status_code = record.response()
+            return response, status_code, True
+        
+        try:
+            response, status_code = BookingService.create_booking(booking_dto)
+        except Exception:
+            release_idempotency_key(record)
+            raise
+        
+        if status_code >= 400:
+            release_idempotency_key(record)
+        else:
+            save_idempotent_response(record, response, status_code)
+        
+        return response, status_code, False
+    
+    @staticmethod
+    def create_bookings(batch_dto: BookingBatchCreateDTO):
+        """
+        Create several bookings in one request (async processing).
+        
+        Flights and existing bookings are checked with one query each,
+        seats are reserved in one transaction, all users are charged in
+        one Server call, and the accepted bookings are inserted together
+        with a single job. Items are accepted or rejected individually.
+        
+        Args:
+            batch_dto: BookingBatchCreateDTO with the items
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        # Validate DTO
+        errors = batch_dto.validate()
+        if errors:
+            return {'errors': errors}, 400
+        
+        items = batch_dto.items
+        results = [
+            {'index': index, 'flight_id': item.flight_id, 'user_id': item.user_id}
+            for index, item in enumerate(items)
+        ]
+        
+        def reject(index, error, code):
+            results[index].update({'status': 'rejected', 'error': error, 'code': code})
+        
+        flights = {
+            flight.id: flight
+            for flight in Flight.query.filter(Flight.id.in_({item.flight_id for item in items})).all()
+        }
+        already_booked = {
+            tuple(row) for row in Booking.query.with_entities(Booking.flight_id, Booking.user_id).filter(
+                Booking.flight_id.in_(list(flights)),
+                Booking.user_id.in_({item.user_id for item in items}),
+                Booking.status.in_(['PENDING', 'PROCESSING', 'COMPLETED'])
+            ).all()
+        }
+        
+        pending = []
+        for index, item in enumerate(items):
+            flight = flights.get(item.flight_id)
+            if not flight:
+                reject(index, 'Flight not found', 404)
+            elif not flight.is_upcoming():
+                reject(index, 'Flight is not available for booking', 400)
+            elif (item.flight_id, item.user_id) in already_booked:
+                reject(index, 'You have already booked this flight', 409)
+            else:
+                pending.append(index)
+        
+        # Don't charge anyone if the workers cannot take the bookings
+        if pending and booking_queue_full():
+            return {'error': 'Booking queue is full, please try again later'}, 503
+        
+        # Reserve seats in one transaction
+        reserved = []
+        for index in pending:
+            if Flight.reserve_seat(items[index].flight_id):
+                reserved.append(index)
+            else:
+                reject(index, 'Flight is sold out', 409)
+        db.session.commit()
+        if reserved:
+            # Tab snapshots include seats_sold
+            flight_tab_cache.invalidate()
+        
+        # Charge all users in one call; give back seats of rejected items
+        batch_key = uuid.uuid4().hex
+        reservation_keys = {index: f'reserve:{batch_key}:{index}' for index in reserved}
+        charge_errors = BookingService._charge_users([
+            (
+                reservation_keys[index],
+                items[index].user_id,
+                float(flights[items[index].flight_id].ticket_price)
+            )
+            for index in reserved
+        ])
+        charged = []
+        for index in reserved:
+            if reservation_keys[index] in charge_errors:
+                error, code = charge_errors[reservation_keys[index]]
+                reject(index, error, code)
+                Flight.release_seat(items[index].flight_id)
+            else:
+                charged.append(index)
+        db.session.commit()
+        if charge_errors:
+            flight_tab_cache.invalidate()
+            outbox_relay.notify(current_app._get_current_object())
+        
+        if charged:
+            try:
+                new_bookings = []
+                for index in charged:
+                    booking = Booking(
+                        flight_id=items[index].flight_id,
+                        user_id=items[index].user_id,
+                        ticket_price=flights[items[index].flight_id].ticket_price
+                    )
+                    booking.mark_processing()
+                    db.session.add(booking)
+                    new_bookings.append(booking)
+                db.session.flush()
+                
+                # One durable job processes the whole batch
+                enqueue_booking_batch_job(new_bookings)
+                db.session.commit()
+                
+                booking_worker_pool.notify(current_app._get_current_object())
+                
+                for index, booking in zip(charged, new_bookings):
+                    results[index].update({'status': 'accepted', 'booking': booking.to_dict()})
+            
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Error creating bookings: {str(e)}")
+                
+                # The users were already charged: give the seats and the money back
+                for index in charged:
+                    Flight.release_seat(items[index].flight_id)
+                    add_refund(items[index].user_id, flights[items[index].flight_id].ticket_price,
+                               f'refund:failed-booking:{uuid.uuid4().hex}', 'Booking could not be created')
+                    reject(index, 'Failed to create booking', 500)
+                db.session.commit()
+                flight_tab_cache.invalidate()
+                outbox_relay.notify(current_app._get_current_object())
+        
+        accepted = sum(1 for result in results if result.get('status') == 'accepted')
+        
+        return {
+            'message': 'Accepted bookings are being processed asynchronously',
+            'results': results,
+            'accepted': accepted,
+            'rejected': len(results) - accepted
+        }, 202 if accepted else 400
+    
+    @staticmethod
+    def _charge_users(charges):
+        """
+        Charge several users in one call (Server API).
+        
+        The Server debits at most once per reservation key, so the call is
+        retried like any idempotent call. If its outcome stays unknown, the
+        release of every reservation is queued in the outbox (the caller
+        commits).
+        
+        Args:
+            charges: List of (reservation_key, user_id, amount)
+        
+        Returns:
+            dict: reservation_key -> (error, status_code) for charges that failed
+        """
+        if not charges:
+            return {}
+        
+        def release_all():
+            for key, user_id, amount in charges:
+                add_reservation_release(user_id, amount, key, 'Payment outcome unknown')
+        
+        try:
+            reserve_response = server_client.post(
+                'reserve_funds_batch', '/api/users/internal/reserve-funds',
+                json={'reservations': [
+                    {'key': key, 'user_id': user_id, 'amount': amount}
+                    for key, user_id, amount in charges
+                ]},
+                idempotent=True
+            )
+        except requests.RequestException as e:
+            current_app.logger.error(f"Failed to reserve funds: {str(e)}")
+            release_all()
+            return {key: ('Failed to process payment', 500) for key, _, _ in charges}
+        
+        if reserve_response.status_code in RETRY_STATUSES:
+            release_all()
+            return {key: ('Failed to process payment', 500) for key, _, _ in charges}
+        
+        if reserve_response.status_code != 200:
+            return {key: ('Failed to deduct balance', 500) for key, _, _ in charges}
+        
+        results = {result.get('key'): result for result in reserve_response.json().get('results', [])}
+        errors = {}
+        for key, user_id, amount in charges:
+            if key not in results:
+                add_reservation_release(user_id, amount, key, 'Payment outcome unknown')
+            result = results.get(key, {})
+            if result.get('status') == 'reserved':
+                continue
+            if result.get('error') == 'Insufficient balance':
+                errors[key] = ('Insufficient balance', 400)
+            elif result.get('error') == 'User not found':
+                errors[key] = ('Failed to verify user', 400)
+            else:
+                errors[key] = ('Failed to deduct balance', 500)
+        return errors
+    
+    @staticmethod
+    def _charge_user(user_id, amount, reservation_key):
+        """
+        Deduct the ticket price if the user's balance covers it (Server API).
+        
+        One call: the server checks and debits the balance atomically, at
+        most once per reservation key, so the call is retried like any
+        idempotent call. If its outcome stays unknown, the release of the
+        reservation is queued in the outbox (the caller commits).
+        
+        Args:
+            user_id: User ID
+            amount: Amount to charge
+            reservation_key: Unique key of this charge
+        
+        Returns:
+            tuple: (dict, int) error response, or None if the user was charged
+        """
+        try:
+            reserve_response = server_client.post(
+                'reserve_funds', f"/api/users/{user_id}/reserve-funds",
+                json={'amount': amount, 'reservation_key': reservation_key},
+                idempotent=True
+            )
+        except requests.RequestException as e:
+            current_app.logger.error(f"Failed to reserve funds: {str(e)}")
+            add_reservation_release(user_id, amount, reservation_key, 'Payment outcome unknown')
+            return {'error': 'Failed to process payment'}, 500
+        
+        if reserve_response.status_code in RETRY_STATUSES:
+            add_reservation_release(user_id, amount, reservation_key, 'Payment outcome unknown')
+            return {'error': 'Failed to process payment'}, 500
+        
+        if reserve_response.status_code == 200:
+            return None
+        
+        if reserve_response.status_code == 404:
+            return {'error': 'Failed to verify user'}, 400
+        
+        if reserve_response.status_code == 400:
+            return {'error': 'Insufficient balance'}, 400
+        
+        return {'error': 'Failed to deduct balance'}, 500
+    
     @staticmethod
     def get_booking_by_id(booking_id):
         """
@@ -136,60 +435,353 @@ class BookingService:
         }, 200
     
     @staticmethod
-    def get_user_bookings(user_id):
+    def _user_bookings_projection(fields=None, sort=None):
         """
-        Get all bookings for a user.
+        Resolve the fields= and sort= parameters of the user bookings list.
+        
+        Booking fields are plain names; 'flight' adds the full flight and
+        'flight.<name>' adds only that flight field. The flight is joined
+        only when one of its fields is requested.
+        
+        Args:
+            fields: Comma-separated fields (None for all, including flight)
+            sort: Sort key, '-' prefix for descending (default: -created_at)
+        
+        Returns:
+            tuple: (entities, serialize_booking, serialize_flight, sort_column, descending)
+                serialize_flight is None when no flight field is requested
+        
+        Raises:
+            ValueError: If a field or the sort key is unknown
+        """
+        allowed = set(Booking.FIELDS) | {'flight'} | {f'flight.{name}' for name in Flight.FIELDS}
+        requested = parse_fields(fields, allowed)
+        sort_column, descending = parse_sort(sort, Booking.SORT_COLUMNS, '-created_at')
+        
+        if requested is None:
+            booking_fields = tuple(Booking.FIELDS)
+            flight_fields = None
+        else:
+            booking_fields = tuple(name for name in requested if name in Booking.FIELDS)
+            flight_fields = tuple(
+                name[len('flight.'):] for name in requested if name.startswith('flight.')
+            )
+            if 'flight' in requested:
+                flight_fields = None
+            elif not flight_fields:
+                flight_fields = ()
+        
+        entities = [Bundle('booking', *columns_for(
+            Booking.FIELDS, booking_fields, always=(Booking.id, Booking.flight_id, sort_column)
+        ))]
+        serialize_flight = None
+        
+        if flight_fields is None:
+            entities.append(Bundle('flight', *Flight.SERIALIZED_COLUMNS))
+            serialize_flight = Flight.serialize
+        elif flight_fields:
+            entities.append(Bundle('flight', *columns_for(
+                Flight.FIELDS, flight_fields, always=(Flight.id,)
+            )))
+            serialize_flight = make_serializer(Flight.FIELDS, flight_fields)
+        
+        return (entities, make_serializer(Booking.FIELDS, booking_fields),
+                serialize_flight, sort_column, descending)
+    
+    # status= filters of the user bookings list
+    USER_BOOKING_FILTERS = ('upcoming', 'past', 'cancelled')
+    
+    @staticmethod
+    def _user_bookings_filter(status, now):
+        """
+        Build the condition of a status= filter (requires the flight join).
+        
+        Args:
+            status: 'upcoming', 'past' or 'cancelled'
+            now: Reference time (naive UTC)
+        
+        Returns:
+            ClauseElement: Filter condition
+        """
+        active = Booking.status.in_(['PENDING', 'PROCESSING', 'COMPLETED'])
+        
+        if status == 'cancelled':
+            return or_(Booking.status == 'CANCELLED', Flight.status == 'CANCELLED')
+        
+        if status == 'upcoming':
+            return and_(active, Flight.status != 'CANCELLED', Flight.departure_time > now)
+        
+        return and_(active, Flight.status != 'CANCELLED', Flight.departure_time <= now)
+    
+    @staticmethod
+    def get_user_bookings(user_id, fields=None, sort=None, status=None, limit=None, cursor=None,
+                          dedupe_flights=False):
+        """
+        Get bookings for a user, joined with their flights in one query.
+        
+        When a limit or cursor is provided, results are paged with keyset
+        pagination on (sort key, id) and a next_cursor is returned.
         
         Args:
             user_id: User ID
+            fields: Optional comma-separated sparse fieldset (see _user_bookings_projection)
+            sort: Optional sort key, '-' prefix for descending (default: -created_at)
+            status: Optional filter: upcoming, past or cancelled
+            limit: Requested page size
+            cursor: Cursor returned by the previous page
+            dedupe_flights: Return each flight once in a 'flights' map keyed by
+                ID instead of inside every booking
         
         Returns:
             tuple: (dict, int) - (response_data, status_code)
         """
+        if status and status not in BookingService.USER_BOOKING_FILTERS:
+            return {'error': f"Invalid status filter: {status} "
+                             f"(use {', '.join(BookingService.USER_BOOKING_FILTERS)})"}, 400
+        
         try:
-            bookings = Booking.query.filter_by(user_id=user_id).order_by(Booking.created_at.desc()).all()
+            entities, serialize_booking, serialize_flight, sort_column, descending = (
+                BookingService._user_bookings_projection(fields, sort)
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        
+        now = datetime.utcnow()
+        
+        try:
+            # Top-level sort key and id let paginate_keyset build the cursor
+            query = db.session.query(*entities, sort_column, Booking.id).select_from(Booking)
+            
+            # Include flight details in the same query
+            if serialize_flight or status:
+                query = query.outerjoin(Flight, Booking.flight_id == Flight.id)
+            
+            query = query.filter(Booking.user_id == user_id)
+            if status:
+                query = query.filter(BookingService._user_bookings_filter(status, now))
+            
+            next_cursor = None
+            page_size = None
+            if limit or cursor:
+                page_size = clamp_limit(
+                    limit,
+                    current_app.config['PAGE_SIZE_DEFAULT'],
+                    current_app.config['PAGE_SIZE_MAX']
+                )
+                try:
+                    rows, next_cursor = paginate_keyset(
+                        query, sort_column, Booking.id, page_size, cursor, descending
+                    )
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+            else:
+                rows = query.order_by(*keyset_order(sort_column, Booking.id, descending)).all()
             
-            # Include flight details
             bookings_data = []
-            for booking in bookings:
-                booking_dict = booking.to_dict()
+            flights_data = {}
+            for row in rows:
+                booking_dict = serialize_booking(row.booking, now)
+                
+                if serialize_flight and row.flight.id is not None:
+                    if not dedupe_flights:
+                        booking_dict['flight'] = serialize_flight(row.flight, now)
+                    elif row.flight.id not in flights_data:
+                        # Each flight is serialized once per response
+                        flights_data[row.flight.id] = serialize_flight(row.flight, now)
                 
-                # Get flight details
-                flight = db.session.get(Flight, booking.flight_id)
-                if flight:
-                    booking_dict['flight'] = flight.to_dict()
+                if dedupe_flights:
+                    booking_dict['flight_id'] = row.booking.flight_id
                 
                 bookings_data.append(booking_dict)
             
-            return {
+            response = {
                 'bookings': bookings_data,
                 'total': len(bookings_data)
-            }, 200
+            }
+            if dedupe_flights:
+                response['flights'] = {str(flight_id): data for flight_id, data in flights_data.items()}
+            if page_size:
+                response['limit'] = page_size
+                response['next_cursor'] = next_cursor
+            
+            return response, 200
         
         except Exception as e:
             current_app.logger.error(f"Error fetching user bookings: {str(e)}")
             return {'error': 'Failed to fetch bookings'}, 500
     
     @staticmethod
-    def get_flight_bookings(flight_id):
+    def get_user_bookings_etag(user_id, fields=None, sort=None, *representation):
+        """
+        Get the ETag for a user's bookings (including their flights).
+        
+        Args:
+            user_id: User ID
+            fields: Requested sparse fieldset (part of the representation)
+            sort: Requested sort key (part of the representation)
+            *representation: Other parameters that change the response
+                (status filter, page, flight deduplication)
+        
+        Returns:
+            str: ETag value
+        """
+        from app.services.flight_service import FlightService
+        
+        now = datetime.utcnow()
+        row = db.session.query(
+            func.count(Booking.id),
+            func.max(Booking.updated_at),
+            *FlightService.version_columns(now)
+        ).select_from(Booking).join(Flight, Booking.flight_id == Flight.id).filter(
+            Booking.user_id == user_id
+        ).one()
+        return FlightService.version_etag(
+            f'user-bookings-{user_id}:{fields}:{sort}:{representation}', tuple(row), now
+        )
+    
+    @staticmethod
+    def iter_flight_bookings(flight_id, cursor=None):
         """
-        Get all bookings for a flight.
+        Iterate serialized bookings for a flight (for streaming).
         
         Args:
             flight_id: Flight ID
+            cursor: Optional manifest cursor; only bookings after it are returned
+        
+        Returns:
+            generator: Serialized bookings
+        
+        Raises:
+            ValueError: If the cursor is malformed or was not issued for the
+                manifest (raised before streaming starts)
+        """
+        query = Booking.query.filter_by(flight_id=flight_id)
+        if cursor:
+            query = query.filter(
+                after_position(Booking.id, Booking.id, decode_cursor(cursor, sort_key(Booking.id)))
+            )
+        query = query.order_by(Booking.id.asc())
+        
+        return (booking.to_dict() for booking in query.yield_per(current_app.config['STREAM_YIELD_PER']))
+    
+    @staticmethod
+    def get_flight_bookings(flight_id, limit=None, cursor=None):
+        """
+        Get bookings for a flight (the manifest), ordered by booking ID.
+        
+        When a limit or cursor is provided, results are paged with keyset
+        pagination on the booking ID and a next_cursor is returned.
+        
+        Args:
+            flight_id: Flight ID
+            limit: Requested page size
+            cursor: Cursor returned by the previous page
         
         Returns:
             tuple: (dict, int) - (response_data, status_code)
         """
         try:
-            bookings = Booking.query.filter_by(flight_id=flight_id).all()
+            query = Booking.query.filter_by(flight_id=flight_id)
+            
+            if not (limit or cursor):
+                bookings_data = [booking.to_dict() for booking in query.order_by(Booking.id.asc())]
+                return {
+                    'bookings': bookings_data,
+                    'total': len(bookings_data)
+                }, 200
+            
+            page_size = clamp_limit(
+                limit,
+                current_app.config['PAGE_SIZE_DEFAULT'],
+                current_app.config['PAGE_SIZE_MAX']
+            )
+            try:
+                bookings, next_cursor = paginate_keyset(query, Booking.id, Booking.id, page_size, cursor)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            
             bookings_data = [booking.to_dict() for booking in bookings]
             
             return {
                 'bookings': bookings_data,
-                'total': len(bookings_data)
+                'total': len(bookings_data),
+                'limit': page_size,
+                'next_cursor': next_cursor
             }, 200
         
         except Exception as e:
             current_app.logger.error(f"Error fetching flight bookings: {str(e)}")
             return {'error': 'Failed to fetch bookings'}, 500
+    
+    @staticmethod
+    def get_flight_booking_summary(flight_id):
+        """
+        Get booking counts, revenue and latest booking time for a flight.
+        
+        Computed with one GROUP BY over the flight's bookings, so no
+        booking rows are loaded.
+        
+        Args:
+            flight_id: Flight ID
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        try:
+            flight_status = db.session.query(Flight.status).filter(Flight.id == flight_id).scalar()
+            if flight_status is None:
+                return {'error': 'Flight not found'}, 404
+            
+            rows = db.session.query(
+                Booking.status,
+                func.count(Booking.id),
+                func.coalesce(func.sum(Booking.ticket_price), 0),
+                func.max(Booking.created_at)
+            ).filter(Booking.flight_id == flight_id).group_by(Booking.status).all()
+            
+            by_status = {
+                status: {'count': 0, 'amount': 0.0}
+                for status in ('PENDING', 'PROCESSING', 'COMPLETED', 'CANCELLED', 'REFUNDED')
+            }
+            latest = None
+            for status, count, amount, last_created in rows:
+                by_status[status] = {'count': count, 'amount': float(amount)}
+                if last_created and (latest is None or last_created > latest):
+                    latest = last_created
+            
+            return {
+                'flight_id': flight_id,
+                'total': sum(entry['count'] for entry in by_status.values()),
+                'by_status': by_status,
+                # Only completed bookings were charged and not refunded. Cancelling
+                # the flight refunds them all, even rows still left COMPLETED
+                'revenue': 0.0 if flight_status == 'CANCELLED' else by_status['COMPLETED']['amount'],
+                'latest_booking_at': format_utc(latest)
+            }, 200
+        
+        except Exception as e:
+            current_app.logger.error(f"Error fetching flight bookings: {str(e)}")
+            return {'error': 'Failed to fetch bookings'}, 500
+    
+    @staticmethod
+    def get_dead_booking_jobs():
+        """
+        Get booking jobs that exhausted their retries (dead-letter list).
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        try:
+            jobs = BookingJob.query.filter_by(status='DEAD').order_by(
+                BookingJob.updated_at.desc()
+            ).all()
+            jobs_data = [job.to_dict() for job in jobs]
+            
+            return {
+                'jobs': jobs_data,
+                'total': len(jobs_data)
+            }, 200
+        
+        except Exception as e:
+            current_app.logger.error(f"Error fetching dead booking jobs: {str(e)}")
+            return {'error': 'Failed to fetch booking jobs'}, 500
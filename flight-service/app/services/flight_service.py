@@ -2,13 +2,20 @@
 Flight service for managing flight operations.
 """
 from flask import current_app
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
+from sqlalchemy import and_, or_, func, case
+from sqlalchemy.dialects.mysql import match
 from app import db
-from app.models import Flight, Booking
+from app.models import Flight, Booking, FlightTombstone
 from app.dto import FlightCreateDTO, FlightUpdateDTO, FlightApprovalDTO, FlightSearchDTO
+from app.utils import (
+    clamp_limit, keyset_order, paginate_keyset, flight_scheduler, flight_tab_cache, make_etag,
+    encode_sync_cursor, decode_sync_cursor, after_position,
+    parse_fields, parse_sort, columns_for, make_serializer, add_refund, add_outbox_message
+)
 
 
 class FlightService:
@@ -98,11 +105,13 @@ class FlightService:
                 departure_airport=flight_dto.departure_airport,
                 arrival_airport=flight_dto.arrival_airport,
                 ticket_price=flight_dto.ticket_price,
-                created_by=created_by
+                created_by=created_by,
+                capacity=flight_dto.capacity or current_app.config['FLIGHT_DEFAULT_CAPACITY']
             )
             
             db.session.add(new_flight)
             db.session.commit()
+            flight_tab_cache.invalidate()
             
             # TODO: Send WebSocket notification to admin
             # This will be implemented in routes
@@ -137,33 +146,180 @@ class FlightService:
             'flight': flight.to_dict()
         }, 200
     
+    @staticmethod
+    def _filtered_flights_query(search_dto: FlightSearchDTO = None):
+        """
+        Build the Flight query for the list endpoint filters.
+        
+        Args:
+            search_dto: FlightSearchDTO with search parameters
+        
+        Returns:
+            Query: Filtered Flight query
+        """
+        query = Flight.query
+        
+        # Apply filters if search_dto is provided
+        if search_dto:
+            if search_dto.name:
+                query = query.filter(Flight.name.ilike(f"%{search_dto.name}%"))
+            
+            if search_dto.airline_id:
+                query = query.filter_by(airline_id=search_dto.airline_id)
+            
+            if search_dto.status:
+                query = query.filter_by(status=search_dto.status)
+        
+        return query
+    
+    @staticmethod
+    def _flight_projection(search_dto: FlightSearchDTO = None):
+        """
+        Resolve the fields= and sort= parameters of a flight list.
+        
+        Only the columns needed by the requested fields (plus id and the
+        sort key) are selected, and only those fields are serialized.
+        
+        Args:
+            search_dto: FlightSearchDTO with fields and sort (may be None)
+        
+        Returns:
+            tuple: (columns, serialize, sort_column, descending)
+        
+        Raises:
+            ValueError: If a field or the sort key is unknown
+        """
+        fields = parse_fields(search_dto and search_dto.fields, Flight.FIELDS)
+        sort_column, descending = parse_sort(
+            search_dto and search_dto.sort, Flight.SORT_COLUMNS, 'departure_time'
+        )
+        
+        if not fields:
+            return Flight.SERIALIZED_COLUMNS, Flight.serialize, sort_column, descending
+        
+        columns = columns_for(Flight.FIELDS, fields, always=(Flight.id, sort_column))
+        return columns, make_serializer(Flight.FIELDS, fields), sort_column, descending
+    
+    @staticmethod
+    def version_columns(now):
+        """
+        Aggregate columns identifying the version of a set of flights.
+        
+        Besides row count and last update, the number of departed, arrived
+        and ongoing flights is included because the computed flags in
+        Flight.to_dict() change at those boundaries.
+        
+        Args:
+            now: Reference time (naive UTC)
+        
+        Returns:
+            list: SQL aggregate expressions
+        """
+        return [
+            func.count(Flight.id),
+            func.max(Flight.updated_at),
+            func.sum(case((Flight.departure_time <= now, 1), else_=0)),
+            func.sum(case((Flight.arrival_time <= now, 1), else_=0)),
+            func.sum(case((and_(
+                Flight.status.in_(['APPROVED', 'ONGOING']),
+                Flight.departure_time <= now,
+                Flight.arrival_time > now
+            ), 1), else_=0))
+        ]
+    
+    @staticmethod
+    def version_etag(name, row, now):
+        """
+        Build an ETag from aggregate values ending with version_columns().
+        
+        Remaining time of ongoing flights changes every minute, so the
+        current minute is part of the ETag while any flight is ongoing.
+        
+        Args:
+            name: Resource name
+            row: Aggregate values (the last one is the ongoing count)
+            now: Reference time (naive UTC)
+        
+        Returns:
+            str: ETag value
+        """
+        minute = now.strftime('%Y%m%d%H%M') if row[-1] else None
+        return make_etag(name, *row, minute)
+    
+    @staticmethod
+    def get_all_flights_etag(search_dto: FlightSearchDTO = None):
+        """
+        Get the ETag for the flight list with the given filters.
+        
+        Args:
+            search_dto: FlightSearchDTO with search parameters
+        
+        Returns:
+            str: ETag value
+        """
+        now = datetime.utcnow()
+        row = FlightService._filtered_flights_query(search_dto).with_entities(
+            *FlightService.version_columns(now)
+        ).one()
+        # The projection and order change the representation, not the version
+        name = f'flights:{search_dto.fields}:{search_dto.sort}' if search_dto else 'flights'
+        return FlightService.version_etag(name, tuple(row), now)
+    
+    @staticmethod
+    def get_flight_etag(flight_id):
+        """
+        Get the ETag for a single flight.
+        
+        Args:
+            flight_id: Flight ID
+        
+        Returns:
+            str: ETag value, or None if the flight does not exist
+        """
+        now = datetime.utcnow()
+        row = Flight.query.filter(Flight.id == flight_id).with_entities(
+            *FlightService.version_columns(now)
+        ).one()
+        if not row[0]:
+            return None
+        return FlightService.version_etag(f'flight-{flight_id}', tuple(row), now)
+    
     @staticmethod
     def get_all_flights(search_dto: FlightSearchDTO = None):
         """
         Get all flights with optional filters.
         
+        When a limit or cursor is provided, results are paged with keyset
+        pagination on (sort key, id) and a next_cursor is returned. The
+        sort key defaults to departure_time; fields= limits the returned
+        (and selected) fields.
+        
         Args:
             search_dto: FlightSearchDTO with search parameters
         
         Returns:
             tuple: (dict, int) - (response_data, status_code)
         """
+        if search_dto:
+            errors = search_dto.validate()
+            if errors:
+                return {'errors': errors}, 400
+        
         try:
-            query = Flight.query
+            query = FlightService._filtered_flights_query(search_dto)
+            projection = FlightService._flight_projection(search_dto)
             
-            # Apply filters if search_dto is provided
-            if search_dto:
-                if search_dto.name:
-                    query = query.filter(Flight.name.ilike(f"%{search_dto.name}%"))
-                
-                if search_dto.airline_id:
-                    query = query.filter_by(airline_id=search_dto.airline_id)
-                
-                if search_dto.status:
-                    query = query.filter_by(status=search_dto.status)
+            if search_dto and search_dto.is_paginated():
+                return FlightService._paginate_flights(
+                    query, search_dto.limit, search_dto.cursor, projection
+                )
             
-            flights = query.order_by(Flight.departure_time.asc()).all()
-            flights_data = [flight.to_dict() for flight in flights]
+            columns, serialize, sort_column, descending = projection
+            flights = query.with_entities(*columns).order_by(
+                *keyset_order(sort_column, Flight.id, descending)
+            ).all()
+            now = datetime.utcnow()
+            flights_data = [serialize(row, now) for row in flights]
             
             return {
                 'flights': flights_data,
@@ -175,71 +331,348 @@ class FlightService:
             return {'error': 'Failed to fetch flights'}, 500
     
     @staticmethod
-    def get_flights_by_tab():
+    def _name_filter(text):
         """
-        Get flights organized by tabs (upcoming, ongoing, completed/cancelled).
+        Build a name match clause, using the FULLTEXT (ngram) index on MySQL.
+        
+        On MySQL the text is searched as one quoted phrase, so boolean-mode
+        operators in user input (+ - ~ < > ( ) @ *) are matched literally
+        instead of changing the query or causing a syntax error.
+        
+        Args:
+            text: Free-text search string
+        
+        Returns:
+            SQL expression
+        """
+        phrase = ' '.join(text.replace('"', ' ').split())
+        if phrase and db.engine.dialect.name == 'mysql':
+            return match(Flight.name, against=f'"{phrase}"').in_boolean_mode()
+        return Flight.name.ilike(f"%{text}%")
+    
+    @staticmethod
+    def search_flights(search_dto: FlightSearchDTO):
+        """
+        Search flights by route, departure window, price range and airline.
+        
+        Only approved flights departing from now on are returned unless a
+        status or date_from is given. Results are keyset paginated on
+        (sort key, id), departure_time by default.
+        
+        Args:
+            search_dto: FlightSearchDTO with search parameters
         
         Returns:
             tuple: (dict, int) - (response_data, status_code)
         """
+        errors = search_dto.validate()
+        if errors:
+            return {'errors': errors}, 400
+        
         try:
-            now = datetime.utcnow()
+            query = Flight.query.filter(Flight.status == (search_dto.status or 'APPROVED'))
             
-            # Get all approved flights
-            all_flights = Flight.query.filter_by(status='APPROVED').all()
-            
-            upcoming = []
-            ongoing = []
-            completed_cancelled = []
-            completed_ids = set()
-            
-            for flight in all_flights:
-                if flight.is_upcoming():
-                    upcoming.append(flight.to_dict())
-                elif flight.is_ongoing():
-                    ongoing.append(flight.to_dict())
-                elif flight.is_completed():
-                    # Mark as completed if not already
-                    if flight.status == 'APPROVED':
-                        flight.complete()
-                    completed_cancelled.append(flight.to_dict())
-                    completed_ids.add(flight.id)
-            
-            # Get cancelled flights
-            cancelled_flights = Flight.query.filter_by(status='CANCELLED').all()
-            completed_cancelled.extend([f.to_dict() for f in cancelled_flights])
-            
-            # Get completed flights
-            completed_flights = Flight.query.filter_by(status='COMPLETED').all()
-            for flight in completed_flights:
-                if flight.id in completed_ids:
-                    continue
-                completed_cancelled.append(flight.to_dict())
+            if search_dto.departure_airport:
+                query = query.filter(Flight.departure_airport == search_dto.departure_airport)
             
-            db.session.commit()
+            if search_dto.arrival_airport:
+                query = query.filter(Flight.arrival_airport == search_dto.arrival_airport)
+            
+            if search_dto.date_from:
+                query = query.filter(Flight.departure_time >= search_dto.date_from)
+            elif not search_dto.status:
+                query = query.filter(Flight.departure_time > datetime.utcnow())
+            
+            if search_dto.date_to:
+                query = query.filter(Flight.departure_time <= search_dto.date_to)
+            
+            if search_dto.min_price is not None:
+                query = query.filter(Flight.ticket_price >= search_dto.min_price)
+            
+            if search_dto.max_price is not None:
+                query = query.filter(Flight.ticket_price <= search_dto.max_price)
+            
+            if search_dto.airline_id:
+                query = query.filter(Flight.airline_id == search_dto.airline_id)
+            
+            if search_dto.name:
+                query = query.filter(FlightService._name_filter(search_dto.name))
+            
+            return FlightService._paginate_flights(
+                query, search_dto.limit, search_dto.cursor,
+                FlightService._flight_projection(search_dto)
+            )
+        
+        except Exception as e:
+            current_app.logger.error(f"Error searching flights: {str(e)}")
+            return {'error': 'Failed to search flights'}, 500
+    
+    @staticmethod
+    def iter_flights(search_dto: FlightSearchDTO = None):
+        """
+        Iterate serialized flights matching the filters (for streaming).
+        
+        Args:
+            search_dto: Validated FlightSearchDTO with search parameters
+        
+        Yields:
+            dict: Serialized flight
+        """
+        now = datetime.utcnow()
+        columns, serialize, sort_column, descending = FlightService._flight_projection(search_dto)
+        query = FlightService._filtered_flights_query(search_dto).with_entities(
+            *columns
+        ).order_by(*keyset_order(sort_column, Flight.id, descending))
+        
+        for row in query.yield_per(current_app.config['STREAM_YIELD_PER']):
+            yield serialize(row, now)
+    
+    @staticmethod
+    def iter_pending_flights():
+        """
+        Iterate serialized pending flights (for streaming).
+        
+        Yields:
+            dict: Serialized flight
+        """
+        now = datetime.utcnow()
+        query = Flight.query.filter_by(status='PENDING').with_entities(
+            *Flight.SERIALIZED_COLUMNS
+        ).order_by(Flight.created_at.desc(), Flight.id.desc())
+        
+        for row in query.yield_per(current_app.config['STREAM_YIELD_PER']):
+            yield Flight.serialize(row, now)
+    
+    @staticmethod
+    def _paginate_flights(query, limit=None, cursor=None, projection=None):
+        """
+        Return one keyset page of flights ordered by (sort key, id).
+        
+        Args:
+            query: Filtered Flight query
+            limit: Requested page size
+            cursor: Cursor returned by the previous page
+            projection: Result of _flight_projection (default: all fields
+                ordered by departure_time)
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        columns, serialize, sort_column, descending = (
+            projection or FlightService._flight_projection()
+        )
+        page_size = clamp_limit(
+            limit,
+            current_app.config['PAGE_SIZE_DEFAULT'],
+            current_app.config['PAGE_SIZE_MAX']
+        )
+        
+        try:
+            flights, next_cursor = paginate_keyset(
+                query.with_entities(*columns),
+                sort_column, Flight.id, page_size, cursor, descending
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        
+        now = datetime.utcnow()
+        flights_data = [serialize(row, now) for row in flights]
+        
+        return {
+            'flights': flights_data,
+            'total': len(flights_data),
+            'limit': page_size,
+            'next_cursor': next_cursor
+        }, 200
+    
+    @staticmethod
+    def get_flight_changes(since=None, limit=None):
+        """
+        Get flights created, updated or deleted since a sync cursor.
+        
+        Flights are read in (updated_at, id) order and deletions from
+        tombstones in (deleted_at, id) order; the returned cursor records
+        the position in both streams.
+        
+        Args:
+            since: Cursor from a previous call (None for a full sync)
+            limit: Maximum number of rows per stream
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        page_size = clamp_limit(
+            limit,
+            current_app.config['PAGE_SIZE_DEFAULT'],
+            current_app.config['PAGE_SIZE_MAX']
+        )
+        
+        try:
+            positions = decode_sync_cursor(since) if since else {}
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        
+        try:
+            upper = datetime.utcnow() - timedelta(
+                seconds=current_app.config['FLIGHT_CHANGES_SAFETY_LAG_SECONDS']
+            )
+            
+            streams = {
+                'flights': (
+                    Flight.query.with_entities(*Flight.SERIALIZED_COLUMNS),
+                    Flight.updated_at, Flight.id
+                ),
+                'tombstones': (
+                    FlightTombstone.query,
+                    FlightTombstone.deleted_at, FlightTombstone.id
+                )
+            }
+            rows = {}
+            has_more = False
+            
+            for name, (query, sort_column, id_column) in streams.items():
+                query = query.filter(sort_column <= upper)
+                if positions.get(name):
+                    query = query.filter(after_position(sort_column, id_column, positions[name]))
+                
+                page = query.order_by(sort_column.asc(), id_column.asc()).limit(page_size + 1).all()
+                if len(page) > page_size:
+                    page = page[:page_size]
+                    has_more = True
+                
+                rows[name] = page
+                if page:
+                    positions[name] = (getattr(page[-1], sort_column.key), page[-1].id)
             
             return {
-                'upcoming': upcoming,
-                'ongoing': ongoing,
-                'completed_cancelled': completed_cancelled
+                'changed': Flight.serialize_many(rows['flights']),
+                'deleted': [tombstone.flight_id for tombstone in rows['tombstones']],
+                'next_cursor': encode_sync_cursor({name: positions.get(name) for name in streams}),
+                'has_more': has_more
             }, 200
         
         except Exception as e:
-            db.session.rollback()
+            current_app.logger.error(f"Error fetching flight changes: {str(e)}")
+            return {'error': 'Failed to fetch flight changes'}, 500
+    
+    @staticmethod
+    def _tab_queries(now):
+        """
+        Build one indexed query per flight tab.
+        
+        Args:
+            now: Reference time (naive UTC) shared by all tabs
+        
+        Returns:
+            dict: Tab name -> Flight query
+        """
+        return {
+            'upcoming': Flight.query.filter(
+                Flight.status == 'APPROVED',
+                Flight.departure_time > now
+            ).order_by(Flight.departure_time.asc(), Flight.id.asc()),
+            'ongoing': Flight.query.filter(
+                Flight.status.in_(['APPROVED', 'ONGOING']),
+                Flight.departure_time <= now,
+                Flight.arrival_time > now
+            ).order_by(Flight.departure_time.asc(), Flight.id.asc()),
+            'completed_cancelled': Flight.query.filter(or_(
+                Flight.status.in_(['COMPLETED', 'CANCELLED']),
+                and_(
+                    Flight.status.in_(['APPROVED', 'ONGOING']),
+                    Flight.arrival_time <= now
+                )
+            )).order_by(Flight.departure_time.desc(), Flight.id.desc())
+        }
+    
+    @staticmethod
+    def _build_tab_snapshot(now):
+        """
+        Load all tabs and compute how long the result stays valid.
+        
+        Args:
+            now: Reference time (naive UTC)
+        
+        Returns:
+            tuple: (dict, datetime, str) - (tab_data, valid_until, etag)
+        """
+        tabs = {
+            tab: query.with_entities(*Flight.SERIALIZED_COLUMNS).all()
+            for tab, query in FlightService._tab_queries(now).items()
+        }
+        
+        # Valid until the next departure or arrival, capped by the max age
+        boundaries = [now + timedelta(seconds=current_app.config['FLIGHT_TAB_CACHE_MAX_AGE_SECONDS'])]
+        if tabs['upcoming']:
+            boundaries.append(tabs['upcoming'][0].departure_time)
+        boundaries.extend(flight.arrival_time for flight in tabs['ongoing'])
+        
+        snapshot = {
+            tab: Flight.serialize_many(flights, now)
+            for tab, flights in tabs.items()
+        }
+        
+        # Every tab flight has one of these statuses
+        version = db.session.query(*FlightService.version_columns(now)).filter(
+            Flight.status.in_(['APPROVED', 'ONGOING', 'COMPLETED', 'CANCELLED'])
+        ).one()
+        etag = FlightService.version_etag('tabs', tuple(version), now)
+        return snapshot, min(boundaries), etag
+    
+    @staticmethod
+    def get_flights_by_tab_with_etag():
+        """
+        Get flights organized by tabs together with the snapshot's ETag.
+        
+        Read-only: status transitions are applied by the lifecycle scheduler.
+        Served from an in-memory snapshot invalidated by flight writes; the
+        data and ETag come from the same snapshot.
+        
+        Returns:
+            tuple: (dict, int, str) - (response_data, status_code, etag)
+                etag is None on error
+        """
+        try:
+            snapshot, etag = flight_tab_cache.get(FlightService._build_tab_snapshot)
+            return snapshot, 200, etag
+        
+        except Exception as e:
             current_app.logger.error(f"Error fetching flights by tab: {str(e)}")
-            return {'error': 'Failed to fetch flights'}, 500
+            return {'error': 'Failed to fetch flights'}, 500, None
     
     @staticmethod
-    def get_pending_flights():
+    def get_flights_by_tab():
+        """
+        Get flights organized by tabs (upcoming, ongoing, completed/cancelled).
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        response, status_code, _ = FlightService.get_flights_by_tab_with_etag()
+        return response, status_code
+    
+    @staticmethod
+    def get_pending_flights(limit=None, cursor=None):
         """
         Get all pending flights (for admin approval).
         
+        Args:
+            limit: Optional page size (enables keyset pagination)
+            cursor: Optional cursor returned by the previous page
+        
         Returns:
             tuple: (dict, int) - (response_data, status_code)
         """
         try:
-            pending_flights = Flight.query.filter_by(status='PENDING').order_by(Flight.created_at.desc()).all()
-            flights_data = [flight.to_dict() for flight in pending_flights]
+            if limit or cursor:
+                return FlightService._paginate_flights(
+                    Flight.query.filter_by(status='PENDING'), limit, cursor
+                )
+            
+            pending_flights = Flight.query.filter_by(status='PENDING').with_entities(
+                *Flight.SERIALIZED_COLUMNS
+            ).order_by(Flight.created_at.desc()).all()
+            flights_data = Flight.serialize_many(pending_flights)
             
             return {
                 'flights': flights_data,
@@ -284,6 +717,10 @@ class FlightService:
                 message = 'Flight rejected'
             
             db.session.commit()
+            flight_tab_cache.invalidate()
+            
+            if flight.status == 'APPROVED':
+                flight_scheduler.schedule_flight(flight)
             
             return {
                 'message': message,
@@ -343,11 +780,19 @@ class FlightService:
             if update_dto.ticket_price:
                 flight.ticket_price = update_dto.ticket_price
             
+            if update_dto.capacity:
+                if update_dto.capacity < flight.seats_sold:
+                    return {'error': 'Capacity cannot be lower than seats already sold'}, 400
+                flight.capacity = update_dto.capacity
+            
+            flight.refresh_arrival_time()
+            
             # Reset to pending after update
             flight.status = 'PENDING'
             flight.rejection_reason = None
             
             db.session.commit()
+            flight_tab_cache.invalidate()
             
             return {
                 'message': 'Flight updated and resubmitted for approval',
@@ -388,14 +833,26 @@ class FlightService:
             
             # Cancel flight
             flight.cancel()
+            flight_data = flight.to_dict()
+            
+            # Refund and notify users in the same transaction (sent by the outbox relay)
+            for booking in bookings:
+                booking.mark_refunded()
+                add_refund(booking.user_id, booking.ticket_price, f'refund:booking:{booking.id}',
+                           'Flight cancelled')
+                add_outbox_message('FLIGHT_CANCELLED_EMAIL', {
+                    'user_id': booking.user_id,
+                    'flight': flight_data
+                }, f'email:flight-cancelled:{flight_id}:{booking.user_id}')
+            
             db.session.commit()
+            flight_tab_cache.invalidate()
             
-            # Refund all users (this will be done via Server API in routes)
             user_ids = [booking.user_id for booking in bookings]
             
             return {
                 'message': 'Flight cancelled successfully',
-                'flight': flight.to_dict(),
+                'flight': flight_data,
                 'affected_users': user_ids
             }, 200
         
@@ -422,7 +879,9 @@ class FlightService:
         
         try:
             db.session.delete(flight)
+            db.session.add(FlightTombstone(flight_id))
             db.session.commit()
+            flight_tab_cache.invalidate()
             
             return {
                 'message': 'Flight deleted successfully'
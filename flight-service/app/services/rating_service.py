@@ -2,10 +2,15 @@
 Rating service for managing flight ratings.
 """
 from flask import current_app
-import requests
+import itertools
+from sqlalchemy import func
+from sqlalchemy.orm import Bundle
 from app import db
 from app.models import Flight, Booking, Rating
 from app.dto import RatingCreateDTO
+from app.utils import (
+    make_etag, keyset_order, parse_fields, parse_sort, columns_for, make_serializer, server_client
+)
 
 
 class RatingService:
@@ -126,46 +131,80 @@ class RatingService:
             return {'error': 'Failed to fetch ratings'}, 500
     
     @staticmethod
-    def get_all_ratings():
+    def get_flight_ratings_etag(flight_id):
+        """
+        Get the ETag for a flight's ratings.
+        
+        Args:
+            flight_id: Flight ID
+        
+        Returns:
+            str: ETag value
+        """
+        row = db.session.query(
+            func.count(Rating.id),
+            func.max(Rating.id),
+            func.max(Rating.created_at)
+        ).filter(Rating.flight_id == flight_id).one()
+        return make_etag(f'flight-ratings-{flight_id}', *row)
+    
+    @staticmethod
+    def _ratings_projection(fields=None, sort=None):
+        """
+        Resolve the fields= and sort= parameters of the ratings list.
+        
+        Besides the rating fields, 'flight' adds the flight summary (joined
+        in the same query) and 'user_email' adds the email from the Server.
+        
+        Args:
+            fields: Comma-separated fields (None for all)
+            sort: Sort key, '-' prefix for descending (default: -created_at)
+        
+        Returns:
+            tuple: (entities, serialize, with_flight, with_email, sort_column, descending)
+        
+        Raises:
+            ValueError: If a field or the sort key is unknown
+        """
+        requested = parse_fields(fields, set(Rating.FIELDS) | {'flight', 'user_email'})
+        sort_column, descending = parse_sort(sort, Rating.SORT_COLUMNS, '-created_at')
+        
+        if requested is None:
+            requested = tuple(Rating.FIELDS) + ('flight', 'user_email')
+        
+        rating_fields = tuple(name for name in requested if name in Rating.FIELDS)
+        with_flight = 'flight' in requested
+        with_email = 'user_email' in requested
+        
+        always = (Rating.id, sort_column) + ((Rating.user_id,) if with_email else ())
+        entities = [Bundle('rating', *columns_for(Rating.FIELDS, rating_fields, always=always))]
+        if with_flight:
+            entities.append(Bundle(
+                'flight', Flight.id, Flight.name, Flight.departure_airport, Flight.arrival_airport
+            ))
+        
+        return (entities, make_serializer(Rating.FIELDS, rating_fields),
+                with_flight, with_email, sort_column, descending)
+    
+    @staticmethod
+    def get_all_ratings(fields=None, sort=None):
         """
         Get all ratings (admin only).
         
+        Args:
+            fields: Optional comma-separated sparse fieldset
+            sort: Optional sort key, '-' prefix for descending (default: -created_at)
+        
         Returns:
             tuple: (dict, int) - (response_data, status_code)
         """
         try:
-            ratings = Rating.query.order_by(Rating.created_at.desc()).all()
-            
-            # Include flight details
-            ratings_data = []
-            for rating in ratings:
-                rating_dict = rating.to_dict()
-                rating_dict['user_email'] = None
-                
-                # Get flight details
-                flight = db.session.get(Flight, rating.flight_id)
-                if flight:
-                    rating_dict['flight'] = {
-                        'id': flight.id,
-                        'name': flight.name,
-                        'departure_airport': flight.departure_airport,
-                        'arrival_airport': flight.arrival_airport
-                    }
-
-                # Get user email from Server
-                try:
-                    server_url = current_app.config['SERVER_URL']
-                    user_response = requests.get(
-                        f"{server_url}/api/users/{rating.user_id}/internal",
-                        timeout=5
-                    )
-                    if user_response.status_code == 200:
-                        user_data = user_response.json().get('user', {})
-                        rating_dict['user_email'] = user_data.get('email')
-                except Exception:
-                    pass
-                
-                ratings_data.append(rating_dict)
+            ratings = RatingService.iter_all_ratings(fields, sort)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        
+        try:
+            ratings_data = list(ratings)
             
             return {
                 'ratings': ratings_data,
@@ -175,3 +214,97 @@ class RatingService:
         except Exception as e:
             current_app.logger.error(f"Error fetching all ratings: {str(e)}")
             return {'error': 'Failed to fetch ratings'}, 500
+    
+    @staticmethod
+    def iter_all_ratings(fields=None, sort=None):
+        """
+        Iterate ratings with flight details and user email (for streaming).
+        
+        The projection is resolved before iteration starts, so invalid
+        parameters raise here rather than mid-stream.
+        
+        Args:
+            fields: Optional comma-separated sparse fieldset
+            sort: Optional sort key, '-' prefix for descending (default: -created_at)
+        
+        Returns:
+            generator: Serialized ratings
+        
+        Raises:
+            ValueError: If a field or the sort key is unknown
+        """
+        entities, serialize, with_flight, with_email, sort_column, descending = (
+            RatingService._ratings_projection(fields, sort)
+        )
+        
+        query = db.session.query(*entities).select_from(Rating)
+        if with_flight:
+            query = query.outerjoin(Flight, Rating.flight_id == Flight.id)
+        query = query.order_by(*keyset_order(sort_column, Rating.id, descending))
+        
+        return RatingService._serialize_ratings(query, serialize, with_flight, with_email)
+    
+    # Maximum IDs per POST /api/users/internal/batch (Server limit)
+    USER_BATCH_MAX = 500
+    
+    @staticmethod
+    def _fetch_user_emails(user_ids):
+        """
+        Get the emails of several users from the Server in one batch call.
+        
+        Args:
+            user_ids: Distinct user IDs (at most USER_BATCH_MAX)
+        
+        Returns:
+            dict: User ID -> email (users that could not be fetched map to None)
+        """
+        emails = dict.fromkeys(user_ids)
+        
+        try:
+            users_response = server_client.post(
+                'users_internal_batch', '/api/users/internal/batch',
+                json={'ids': list(user_ids)}
+            )
+            if users_response.status_code == 200:
+                for user in users_response.json().get('users', []):
+                    emails[user.get('id')] = user.get('email')
+            else:
+                current_app.logger.error(f"User lookup failed: {users_response.status_code}")
+        except Exception as e:
+            current_app.logger.error(f"User lookup failed: {str(e)}")
+        
+        return emails
+    
+    @staticmethod
+    def _serialize_ratings(query, serialize, with_flight, with_email):
+        """Yield serialized ratings, fetching user emails in one call per chunk of rows."""
+        emails = {}
+        rows = iter(query.yield_per(current_app.config['STREAM_YIELD_PER']))
+        chunk_size = min(current_app.config['STREAM_YIELD_PER'], RatingService.USER_BATCH_MAX)
+        
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            
+            # Get emails of users not seen in earlier chunks from Server
+            if with_email:
+                unknown = {row.rating.user_id for row in chunk} - emails.keys()
+                if unknown:
+                    emails.update(RatingService._fetch_user_emails(sorted(unknown)))
+            
+            for row in chunk:
+                rating_dict = serialize(row.rating)
+                
+                if with_flight and row.flight.id is not None:
+                    rating_dict['flight'] = {
+                        'id': row.flight.id,
+                        'name': row.flight.name,
+                        'departure_airport': row.flight.departure_airport,
+                        'arrival_airport': row.flight.arrival_airport
+                    }
+                
+                if with_email:
+                    rating_dict['user_email'] = emails[row.rating.user_id]
+                
+                yield rating_dict
@@ -1,6 +1,105 @@
 """
 Utils module initialization.
 """
-from .async_tasks import start_booking_process, process_booking_async
+from .async_tasks import process_booking, process_bookings, run_booking_job
+from .booking_jobs import (
+    enqueue_booking_job, enqueue_booking_batch_job, booking_queue_full, claim_booking_job,
+    complete_booking_job, fail_booking_job, recover_booking_jobs, purge_booking_jobs, booking_job_counts
+)
+from .idempotency import (
+    request_fingerprint, claim_idempotency_key, save_idempotent_response, release_idempotency_key
+)
+from .outbox import (
+    add_outbox_message, add_refund, add_reservation_release, claim_outbox_batch, relay_outbox_batch,
+    outbox_counts, OutboxRelay, outbox_relay
+)
+from .booking_workers import BookingWorkerPool, booking_worker_pool, publish_booking_event
+from .booking_pipeline import (
+    BookingContext, BookingPipeline, PipelineMetrics, booking_pipeline, booking_metrics
+)
+from .timestamps import format_utc
+from .pagination import (
+    sort_key, encode_cursor, decode_cursor, clamp_limit, keyset_order, paginate_keyset,
+    encode_sync_cursor, decode_sync_cursor, after_position
+)
+from .server_client import ServerClient, CircuitOpenError, server_client, RETRY_STATUSES
+from .flight_scheduler import FlightLifecycleScheduler, flight_scheduler
+from .tab_cache import FlightTabCache, flight_tab_cache
+from .http_cache import make_etag, is_not_modified, not_modified, json_with_etag
+from .projection import parse_fields, parse_sort, columns_for, make_serializer
+from .streaming import wants_stream, wants_ndjson, stream_json_list
+from .flight_events import (
+    emit_flight_status_changed, emit_flight_cancelled, emit_flight_updated, current_seq,
+    user_room, authenticate_socket, emit_booking_event
+)
 
-__all__ = ['start_booking_process', 'process_booking_async']
\ No newline at end of file
+__all__ = [
+    'process_booking',
+    'process_bookings',
+    'run_booking_job',
+    'enqueue_booking_job',
+    'enqueue_booking_batch_job',
+    'booking_queue_full',
+    'claim_booking_job',
+    'complete_booking_job',
+    'fail_booking_job',
+    'recover_booking_jobs',
+    'purge_booking_jobs',
+    'booking_job_counts',
+    'request_fingerprint',
+    'claim_idempotency_key',
+    'save_idempotent_response',
+    'release_idempotency_key',
+    'add_outbox_message',
+    'add_refund',
+    'add_reservation_release',
+    'claim_outbox_batch',
+    'relay_outbox_batch',
+    'outbox_counts',
+    'OutboxRelay',
+    'outbox_relay',
+    'BookingWorkerPool',
+    'booking_worker_pool',
+    'publish_booking_event',
+    'BookingContext',
+    'BookingPipeline',
+    'PipelineMetrics',
+    'booking_pipeline',
+    'booking_metrics',
+    'format_utc',
+    'sort_key',
+    'encode_cursor',
+    'decode_cursor',
+    'clamp_limit',
+    'keyset_order',
+    'paginate_keyset',
+    'encode_sync_cursor',
+    'decode_sync_cursor',
+    'after_position',
+    'ServerClient',
+    'CircuitOpenError',
+    'server_client',
+    'RETRY_STATUSES',
+    'FlightLifecycleScheduler',
+    'flight_scheduler',
+    'FlightTabCache',
+    'flight_tab_cache',
+    'make_etag',
+    'is_not_modified',
+    'not_modified',
+    'json_with_etag',
+    'parse_fields',
+    'parse_sort',
+    'columns_for',
+    'make_serializer',
+    'wants_stream',
+    'wants_ndjson',
+    'stream_json_list',
+    'emit_flight_status_changed',
+    'emit_flight_cancelled',
+    'emit_flight_updated',
+    'current_seq',
+    'user_room',
+    'authenticate_socket',
+    'emit_booking_event'
+]
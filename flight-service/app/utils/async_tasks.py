@@ -1,115 +1,74 @@
 """
 Async tasks using multiprocessing for booking operations.
+
+Bookings are queued as durable jobs (see booking_jobs.py) and processed
+by a pre-warmed pool of worker processes (see booking_workers.py), which
+run each booking through the stages of booking_pipeline.py.
 """
 import time
-from multiprocessing import Process
-from flask import current_app
 
 
-def process_booking_async(flight_id, user_id, ticket_price, app_config):
+def process_booking(app, booking_id):
+    """
+    Process one booking.
+    
+    Args:
+        app: Flask application of the worker
+        booking_id: Booking ID
+    """
+    process_bookings(app, [booking_id])
+
+
+def process_bookings(app, booking_ids):
     """
-    Process booking asynchronously (simulates long-running operation).
+    Process the bookings of a job through the booking pipeline.
     
-    This function runs in a separate process.
+    Runs inside a booking worker process, within an app context. Safe to
+    run more than once: only bookings still in PROCESSING are changed.
+    Unexpected errors propagate so the job is retried.
     
     Args:
-        flight_id: Flight ID
-        user_id: User ID
-        ticket_price: Ticket price
-        app_config: Flask app configuration dict
+        app: Flask application of the worker
+        booking_ids: Booking IDs (one for a single booking, several for a batch)
     """
     # Import here to avoid circular imports in subprocess
-    from app import create_app, db
-    from app.models import Booking, Flight
-    import requests
+    from app.utils.booking_pipeline import booking_pipeline, booking_metrics, pipeline_timed_names
+    
+    # No-op in workers, which use the pool's shared metrics
+    booking_metrics.allocate(pipeline_timed_names())
     
-    # Create app context in subprocess
-    app = create_app()
+    # Simulated processing time, once per job (BOOKING_PROCESSING_DELAY_SECONDS, 0 disables)
+    delay = app.config['BOOKING_PROCESSING_DELAY_SECONDS']
+    if delay > 0:
+        started = time.perf_counter()
+        time.sleep(delay)
+        booking_metrics.observe('delay', time.perf_counter() - started)
     
-    with app.app_context():
-        try:
-            # Simulate long-running processing (sleep for testing)
-            time.sleep(5)  # Simulate 5 seconds of processing
-            
-            # Find the booking
-            booking = Booking.query.filter_by(
-                flight_id=flight_id,
-                user_id=user_id,
-                status='PROCESSING'
-            ).first()
-            
-            if not booking:
-                print(f"Booking not found for user {user_id} and flight {flight_id}")
-                return
-            
-            # Get flight details
-            flight = db.session.get(Flight, flight_id)
-            
-            if not flight:
-                booking.mark_cancelled()
-                db.session.commit()
-                print(f"Flight {flight_id} not found")
-                return
-            
-            # Check if flight is still available (approved and upcoming)
-            if not flight.is_upcoming():
-                booking.mark_cancelled()
-                db.session.commit()
-                
-                # Refund user (call Server API)
-                try:
-                    server_url = app.config['SERVER_URL']
-                    requests.post(
-                        f"{server_url}/api/users/{user_id}/refund",
-                        json={'amount': float(ticket_price)},
-                        timeout=5
-                    )
-                except Exception as e:
-                    print(f"Failed to refund user: {str(e)}")
-                
-                print(f"Flight {flight_id} is not available for booking")
-                return
-            
-            # Mark booking as completed
-            booking.mark_completed()
-            db.session.commit()
-            
-            print(f"Booking completed: User {user_id}, Flight {flight_id}")
-        
-        except Exception as e:
-            print(f"Error processing booking: {str(e)}")
-            
-            # Try to cancel booking on error
-            try:
-                booking = Booking.query.filter_by(
-                    flight_id=flight_id,
-                    user_id=user_id,
-                    status='PROCESSING'
-                ).first()
-                
-                if booking:
-                    booking.mark_cancelled()
-                    db.session.commit()
-            except:
-                pass
+    for booking_id in booking_ids:
+        booking_pipeline.run(booking_id, booking_metrics)
 
 
-def start_booking_process(flight_id, user_id, ticket_price, app_config):
+def run_booking_job(app, job):
     """
-    Start async booking process.
+    Run a claimed booking job and record its outcome.
     
     Args:
-        flight_id: Flight ID
-        user_id: User ID
-        ticket_price: Ticket price
-        app_config: Flask app configuration dict
+        app: Flask application of the worker
+        job: Job returned by claim_booking_job
     
     Returns:
-        Process: Started process
+        bool: True if the booking was processed, False if the job failed
     """
-    process = Process(
-        target=process_booking_async,
-        args=(flight_id, user_id, ticket_price, app_config)
-    )
-    process.start()
-    return process
\ No newline at end of file
+    from app import db
+    from app.utils.booking_jobs import complete_booking_job, fail_booking_job
+    
+    try:
+        process_bookings(app, job.booking_id_list())
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error processing booking {job.booking_id}: {str(e)}")
+        fail_booking_job(job, str(e))
+        return False
+    
+    complete_booking_job(job)
+    return True
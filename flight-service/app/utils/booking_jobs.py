@@ -0,0 +1,315 @@
+"""
+Durable booking job queue backed by the booking_jobs table.
+
+Delivery is at-least-once: a worker claims a job with a conditional
+UPDATE and holds it for a visibility timeout. If the worker dies, the job
+becomes claimable again when the timeout expires. Failed jobs are retried
+with exponential backoff; after the last attempt they are dead-lettered
+and the booking is cancelled and refunded through the outbox.
+Processing is idempotent because it only moves bookings out of
+PROCESSING. DONE jobs are purged after BOOKING_JOB_RETENTION_SECONDS.
+"""
+import random
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+
+
+def enqueue_booking_job(booking):
+    """
+    Add a queued job for a booking to the current session.
+    
+    The caller commits it together with the booking, so a booking in
+    PROCESSING always has a job.
+    
+    Args:
+        booking: Booking in PROCESSING (flushed, so it has an ID)
+    
+    Returns:
+        BookingJob: New job
+    """
+    from app import db
+    from app.models import BookingJob
+    
+    job = BookingJob(booking_id=booking.id)
+    db.session.add(job)
+    return job
+
+
+def enqueue_booking_batch_job(bookings):
+    """
+    Add one queued job processing several bookings to the current session.
+    
+    Args:
+        bookings: Bookings in PROCESSING (flushed, so they have IDs)
+    
+    Returns:
+        BookingJob: New job
+    """
+    from app import db
+    from app.models import BookingJob
+    
+    job = BookingJob(booking_id=bookings[0].id, booking_ids=[booking.id for booking in bookings])
+    db.session.add(job)
+    return job
+
+
+def booking_queue_full():
+    """Check if the number of queued jobs reached BOOKING_QUEUE_SIZE."""
+    from app.models import BookingJob
+    
+    queued = BookingJob.query.filter(BookingJob.status == 'QUEUED').count()
+    return queued >= current_app.config['BOOKING_QUEUE_SIZE']
+
+
+def claim_booking_job(worker_name, now=None):
+    """
+    Claim the next available job.
+    
+    Candidates are read first and then claimed one by one with an UPDATE
+    conditioned on the values just read, so concurrent workers never
+    claim the same delivery.
+    
+    Args:
+        worker_name: Identifier of the claiming worker
+        now: Reference time (naive UTC), defaults to utcnow
+    
+    Returns:
+        BookingJob: Claimed job (status RUNNING), or None if nothing is due
+    """
+    from app import db
+    from app.models import BookingJob
+    
+    now = now or datetime.utcnow()
+    visibility = timedelta(seconds=current_app.config['BOOKING_JOB_VISIBILITY_TIMEOUT'])
+    
+    candidates = BookingJob.query.filter(
+        BookingJob.status.in_(['QUEUED', 'RUNNING']),
+        BookingJob.available_at <= now
+    ).order_by(BookingJob.available_at.asc(), BookingJob.id.asc()).with_entities(
+        BookingJob.id, BookingJob.status, BookingJob.available_at
+    ).limit(10).all()
+    
+    for job_id, status, available_at in candidates:
+        claimed = BookingJob.query.filter(
+            BookingJob.id == job_id,
+            BookingJob.status == status,
+            BookingJob.available_at == available_at
+        ).update({
+            BookingJob.status: 'RUNNING',
+            BookingJob.attempts: BookingJob.attempts + 1,
+            BookingJob.available_at: now + visibility,
+            BookingJob.locked_by: worker_name,
+            BookingJob.updated_at: now
+        }, synchronize_session=False)
+        db.session.commit()
+        
+        if not claimed:
+            continue
+        
+        job = db.session.get(BookingJob, job_id)
+        
+        # Jobs whose workers kept dying are not retried forever
+        if job.attempts > current_app.config['BOOKING_JOB_MAX_ATTEMPTS']:
+            _dead_letter(job, job.last_error or 'Visibility timeout expired too many times')
+            continue
+        
+        return job
+    
+    return None
+
+
+def complete_booking_job(job):
+    """
+    Mark a claimed job as done (if this worker still holds it).
+    
+    Args:
+        job: Job returned by claim_booking_job
+    """
+    from app import db
+    from app.models import BookingJob
+    
+    BookingJob.query.filter(
+        BookingJob.id == job.id,
+        BookingJob.status == 'RUNNING',
+        BookingJob.locked_by == job.locked_by,
+        BookingJob.attempts == job.attempts
+    ).update({
+        BookingJob.status: 'DONE',
+        BookingJob.locked_by: None,
+        BookingJob.updated_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def fail_booking_job(job, error):
+    """
+    Schedule a retry with exponential backoff, or dead-letter the job.
+    
+    Args:
+        job: Job returned by claim_booking_job
+        error: Failure description
+    """
+    from app import db
+    from app.models import BookingJob
+    
+    config = current_app.config
+    
+    if job.attempts >= config['BOOKING_JOB_MAX_ATTEMPTS']:
+        _dead_letter(job, error)
+        return
+    
+    # Full jitter keeps retries of a failing burst from lining up
+    delay = min(
+        config['BOOKING_JOB_BACKOFF_MAX_SECONDS'],
+        config['BOOKING_JOB_BACKOFF_SECONDS'] * 2 ** (job.attempts - 1)
+    ) * random.uniform(0.5, 1.0)
+    now = datetime.utcnow()
+    
+    BookingJob.query.filter(
+        BookingJob.id == job.id,
+        BookingJob.status == 'RUNNING',
+        BookingJob.locked_by == job.locked_by,
+        BookingJob.attempts == job.attempts
+    ).update({
+        BookingJob.status: 'QUEUED',
+        BookingJob.available_at: now + timedelta(seconds=delay),
+        BookingJob.locked_by: None,
+        BookingJob.last_error: error,
+        BookingJob.updated_at: now
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def _dead_letter(job, error):
+    """Move a job to the dead-letter list and cancel/refund its bookings."""
+    from app import db
+    from app.models import Booking, BookingJob, Flight
+    from app.utils.outbox import add_refund
+    from app.utils.booking_workers import publish_booking_event
+    
+    now = datetime.utcnow()
+    BookingJob.query.filter(BookingJob.id == job.id).update({
+        BookingJob.status: 'DEAD',
+        BookingJob.locked_by: None,
+        BookingJob.last_error: error,
+        BookingJob.updated_at: now
+    }, synchronize_session=False)
+    
+    cancelled_bookings = []
+    for booking_id in job.booking_id_list():
+        # Compensate only if the booking is still waiting for this job
+        cancelled = Booking.query.filter(
+            Booking.id == booking_id,
+            Booking.status == 'PROCESSING'
+        ).update({
+            Booking.status: 'CANCELLED',
+            Booking.updated_at: now
+        }, synchronize_session=False)
+        
+        if cancelled:
+            booking = db.session.get(Booking, booking_id)
+            Flight.release_seat(booking.flight_id)
+            add_refund(booking.user_id, booking.ticket_price, f'refund:booking:{booking.id}',
+                       'Booking processing failed')
+            cancelled_bookings.append(booking)
+    db.session.commit()
+    
+    for booking in cancelled_bookings:
+        publish_booking_event('booking_cancelled', booking.to_dict())
+    
+    current_app.logger.error(f"Booking job {job.id} dead-lettered: {error}")
+
+
+def recover_booking_jobs():
+    """
+    Re-drive bookings stranded in PROCESSING without a live job.
+    
+    Runs at startup. RUNNING jobs of crashed workers need no action; they
+    are claimed again when their visibility timeout expires.
+    
+    Returns:
+        int: Number of jobs created
+    """
+    from app import db
+    from app.models import Booking, BookingJob
+    
+    # Batch jobs list their bookings in booking_ids, so collect covered IDs here
+    covered = set()
+    for job in BookingJob.query.filter(BookingJob.status.in_(['QUEUED', 'RUNNING'])).all():
+        covered.update(job.booking_id_list())
+    
+    stranded = [
+        booking_id for (booking_id,) in Booking.query.filter(
+            Booking.status == 'PROCESSING'
+        ).with_entities(Booking.id).all()
+        if booking_id not in covered
+    ]
+    
+    for booking_id in stranded:
+        db.session.add(BookingJob(booking_id=booking_id))
+    db.session.commit()
+    
+    if stranded:
+        current_app.logger.info(f"Recovered {len(stranded)} stranded bookings")
+    
+    return len(stranded)
+
+
+def purge_booking_jobs(now=None):
+    """
+    Delete DONE jobs older than BOOKING_JOB_RETENTION_SECONDS.
+    
+    Deletes in batches of BOOKING_JOB_PURGE_BATCH_SIZE so no transaction
+    holds many row locks. DEAD jobs are kept for the dead-letter list.
+    
+    Args:
+        now: Reference time (naive UTC), defaults to utcnow
+    
+    Returns:
+        int: Number of jobs deleted
+    """
+    from app import db
+    from app.models import BookingJob
+    
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config['BOOKING_JOB_RETENTION_SECONDS'])
+    batch_size = current_app.config['BOOKING_JOB_PURGE_BATCH_SIZE']
+    purged = 0
+    
+    while True:
+        ids = [row.id for row in BookingJob.query.with_entities(BookingJob.id).filter(
+            BookingJob.status == 'DONE',
+            BookingJob.updated_at < cutoff
+        ).limit(batch_size).all()]
+        if not ids:
+            break
+        
+        purged += BookingJob.query.filter(
+            BookingJob.id.in_(ids),
+            BookingJob.status == 'DONE'
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        
+        if len(ids) < batch_size:
+            break
+    
+    return purged
+
+
+def booking_job_counts():
+    """
+    Count jobs per status.
+    
+    Returns:
+        dict: Status -> number of jobs
+    """
+    from app.models import BookingJob
+    
+    rows = BookingJob.query.with_entities(
+        BookingJob.status, func.count(BookingJob.id)
+    ).group_by(BookingJob.status).all()
+    
+    counts = {'QUEUED': 0, 'RUNNING': 0, 'DONE': 0, 'DEAD': 0}
+    counts.update({status: count for status, count in rows})
+    return counts
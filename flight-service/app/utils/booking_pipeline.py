@@ -0,0 +1,307 @@
+"""
+Booking processing pipeline and its instrumentation.
+
+Each booking of a job runs through named stages (validate, confirm,
+notify by default). Stages share a BookingContext; a stage ends the run
+early by setting context.stop. Extra stages can be plugged in with
+booking_pipeline.add_stage() at import time, before the worker pool
+starts, so every worker runs the same stages.
+
+Every stage run is timed into a histogram, and each booking outcome
+(completed, cancelled, failed) is counted. The values live in shared
+memory created by the worker pool, so /metrics shows the totals of all
+worker processes.
+"""
+import time
+import multiprocessing
+from flask import current_app
+
+# Upper bounds (seconds) of the stage timing histogram buckets
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Counted booking outcomes
+OUTCOMES = ('completed', 'cancelled', 'failed')
+
+
+class BookingContext:
+    """State passed through the stages for one booking."""
+    
+    def __init__(self, booking_id):
+        self.booking_id = booking_id
+        self.booking = None
+        self.flight = None
+        # 'completed' or 'cancelled', decided by the validate stage
+        self.outcome = None
+        self.reason = None
+        # Set by a stage to skip the remaining stages
+        self.stop = False
+
+
+class PipelineMetrics:
+    """
+    Stage timing histograms and booking outcome counters.
+    
+    Values are kept in one multiprocessing.Array: per timed name the
+    bucket counts (plus +Inf), count, sum and max, then one counter per
+    outcome.
+    """
+    
+    def __init__(self):
+        self._names = []
+        self._values = None
+    
+    @property
+    def _width(self):
+        """Number of values per timed name."""
+        return len(HISTOGRAM_BUCKETS) + 4
+    
+    def allocate(self, names):
+        """
+        Create the shared values (once).
+        
+        Args:
+            names: Timed names (job delay and stage names)
+        """
+        if self._values is None:
+            self._names = list(names)
+            self._values = multiprocessing.Array(
+                'd', len(self._names) * self._width + len(OUTCOMES)
+            )
+    
+    def shared(self):
+        """Get (names, values) to hand to a worker process."""
+        return self._names, self._values
+    
+    def attach(self, names, values):
+        """
+        Use values allocated by another process (the worker pool).
+        
+        Args:
+            names: Timed names
+            values: Shared array returned by shared()
+        """
+        self._names = list(names)
+        self._values = values
+    
+    def observe(self, name, seconds):
+        """
+        Record a duration.
+        
+        Args:
+            name: Timed name (names unknown at allocation are ignored)
+            seconds: Duration in seconds
+        """
+        if self._values is None or name not in self._names:
+            return
+        
+        base = self._names.index(name) * self._width
+        bucket = next(
+            (i for i, bound in enumerate(HISTOGRAM_BUCKETS) if seconds <= bound),
+            len(HISTOGRAM_BUCKETS)
+        )
+        
+        with self._values.get_lock():
+            self._values[base + bucket] += 1
+            self._values[base + len(HISTOGRAM_BUCKETS) + 1] += 1
+            self._values[base + len(HISTOGRAM_BUCKETS) + 2] += seconds
+            self._values[base + len(HISTOGRAM_BUCKETS) + 3] = max(
+                self._values[base + len(HISTOGRAM_BUCKETS) + 3], seconds
+            )
+    
+    def count(self, outcome):
+        """
+        Count a booking outcome.
+        
+        Args:
+            outcome: 'completed', 'cancelled' or 'failed'
+        """
+        if self._values is None:
+            return
+        
+        with self._values.get_lock():
+            self._values[len(self._names) * self._width + OUTCOMES.index(outcome)] += 1
+    
+    def snapshot(self):
+        """
+        Get the metrics.
+        
+        Returns:
+            dict: Per timed name the count, average, maximum and cumulative
+                bucket counts (observations <= bound), and outcome counters
+        """
+        if self._values is None:
+            return {'stages': {}, 'bookings': {outcome: 0 for outcome in OUTCOMES}}
+        
+        with self._values.get_lock():
+            values = self._values[:]
+        
+        stages = {}
+        for index, name in enumerate(self._names):
+            row = values[index * self._width:(index + 1) * self._width]
+            count = int(row[len(HISTOGRAM_BUCKETS) + 1])
+            total = row[len(HISTOGRAM_BUCKETS) + 2]
+            
+            buckets = {}
+            cumulative = 0
+            for bound, bucket_count in zip(HISTOGRAM_BUCKETS + ('+Inf',), row):
+                cumulative += int(bucket_count)
+                buckets[str(bound)] = cumulative
+            
+            stages[name] = {
+                'count': count,
+                'avg_seconds': round(total / count, 6) if count else None,
+                'max_seconds': round(row[len(HISTOGRAM_BUCKETS) + 3], 6) if count else None,
+                'buckets': buckets
+            }
+        
+        outcomes = values[len(self._names) * self._width:]
+        return {
+            'stages': stages,
+            'bookings': {outcome: int(value) for outcome, value in zip(OUTCOMES, outcomes)}
+        }
+
+
+class BookingPipeline:
+    """Ordered, named booking processing stages."""
+    
+    def __init__(self, stages=None):
+        self._stages = list(stages or [])
+    
+    @property
+    def stage_names(self):
+        """Names of the stages, in order."""
+        return [name for name, _ in self._stages]
+    
+    def add_stage(self, name, stage, before=None):
+        """
+        Plug in a stage.
+        
+        Args:
+            name: Stage name (used in the metrics)
+            stage: Callable taking a BookingContext
+            before: Optional name of the stage to insert before (default: last)
+        
+        Raises:
+            ValueError: If the name is taken or before is unknown
+        """
+        if name in self.stage_names:
+            raise ValueError(f'Stage already exists: {name}')
+        
+        if before is None:
+            self._stages.append((name, stage))
+            return
+        
+        if before not in self.stage_names:
+            raise ValueError(f'Unknown stage: {before}')
+        self._stages.insert(self.stage_names.index(before), (name, stage))
+    
+    def run(self, booking_id, metrics):
+        """
+        Run the stages for one booking.
+        
+        Exceptions are counted as failed and propagate (the job is retried).
+        
+        Args:
+            booking_id: Booking ID
+            metrics: PipelineMetrics receiving timings and outcomes
+        
+        Returns:
+            BookingContext: Context after the last stage run
+        """
+        context = BookingContext(booking_id)
+        
+        for name, stage in self._stages:
+            started = time.perf_counter()
+            try:
+                stage(context)
+            except Exception:
+                metrics.count('failed')
+                raise
+            finally:
+                metrics.observe(name, time.perf_counter() - started)
+            
+            if context.stop:
+                break
+        
+        if context.outcome and not context.stop:
+            metrics.count(context.outcome)
+        
+        return context
+
+
+def validate_booking(context):
+    """Load the booking and its flight, and decide whether it can complete."""
+    from app import db
+    from app.models import Booking, Flight
+    
+    context.booking = Booking.query.filter_by(id=context.booking_id, status='PROCESSING').first()
+    
+    if not context.booking:
+        current_app.logger.info(f"Booking {context.booking_id} is no longer processing")
+        context.stop = True
+        return
+    
+    context.flight = db.session.get(Flight, context.booking.flight_id)
+    
+    if not context.flight:
+        context.outcome = 'cancelled'
+        context.reason = f"Flight {context.booking.flight_id} not found"
+    elif not context.flight.is_upcoming():
+        # Flight is no longer approved and upcoming
+        context.outcome = 'cancelled'
+        context.reason = f"Flight {context.flight.id} is not available for booking"
+    else:
+        context.outcome = 'completed'
+
+
+def confirm_booking(context):
+    """Complete or cancel the booking (cancelling releases the seat and refunds)."""
+    from app import db
+    from app.models import Flight
+    from app.utils.outbox import add_refund
+    
+    booking = context.booking
+    
+    if context.outcome == 'completed':
+        booking.mark_completed()
+    else:
+        booking.mark_cancelled()
+        
+        if context.flight:
+            Flight.release_seat(context.flight.id)
+            
+            # Refund user (delivered by the outbox relay)
+            add_refund(booking.user_id, booking.ticket_price, f'refund:booking:{booking.id}',
+                       'Flight no longer available')
+    
+    db.session.commit()
+
+
+def notify_booking(context):
+    """Publish the outcome to the booking user (after commit)."""
+    from app.utils.booking_workers import publish_booking_event
+    
+    publish_booking_event(f'booking_{context.outcome}', context.booking.to_dict())
+    
+    if context.outcome == 'completed':
+        current_app.logger.info(
+            f"Booking completed: User {context.booking.user_id}, Flight {context.flight.id}"
+        )
+    else:
+        current_app.logger.info(f"Booking {context.booking.id} cancelled: {context.reason}")
+
+
+# Default stages, shared by every worker
+booking_pipeline = BookingPipeline([
+    ('validate', validate_booking),
+    ('confirm', confirm_booking),
+    ('notify', notify_booking)
+])
+
+# Stage timings and outcome counters (shared with the worker processes)
+booking_metrics = PipelineMetrics()
+
+
+def pipeline_timed_names():
+    """Names timed by the metrics: the simulated job delay, then the stages."""
+    return ['delay'] + booking_pipeline.stage_names
@@ -0,0 +1,306 @@
+"""
+Pre-warmed pool of booking worker processes.
+
+Each worker creates the Flask app once at startup and then claims jobs
+from the durable booking_jobs table (see booking_jobs.py). The web
+process wakes workers through a small multiprocessing queue when a job
+is added; idle workers also poll, so retries whose backoff expired and
+jobs left by other instances are picked up.
+
+Workers report booking outcomes through an events queue; the web process
+forwards them to the booking user's Socket.IO room. A cancelled booking
+gave its seat back, so the web process also drops its tab snapshot.
+"""
+import os
+import time
+import queue
+import socket
+import logging
+import threading
+import multiprocessing
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Events queue of the pool, set inside worker processes
+_events = None
+
+
+def publish_booking_event(event, booking):
+    """
+    Publish a booking outcome to the booking user (after commit).
+    
+    In a worker process the event is handed to the web process through the
+    pool's events queue; elsewhere it is emitted directly.
+    
+    Args:
+        event: 'booking_completed' or 'booking_cancelled'
+        booking: Serialized booking (dict with user_id)
+    """
+    if _events is None:
+        _deliver_booking_event(event, booking)
+        return
+    
+    try:
+        _events.put_nowait((event, booking))
+    except queue.Full:
+        logger.error(f"Booking events queue is full, dropped {event} for booking {booking.get('id')}")
+
+
+def _deliver_booking_event(event, booking):
+    """Handle a booking outcome in the web process (tab cache and Socket.IO)."""
+    from app.utils.flight_events import emit_booking_event
+    from app.utils.tab_cache import flight_tab_cache
+    
+    # Cancellation released the seat; tab snapshots include seats_sold
+    if event == 'booking_cancelled':
+        flight_tab_cache.invalidate()
+    
+    emit_booking_event(event, booking)
+
+
+def _worker_main(config_name, wakeups, events, busy, stats, metrics):
+    """
+    Worker process loop.
+    
+    Args:
+        config_name: Configuration used to create the app
+        wakeups: Queue of wake-up signals (None stops the worker)
+        events: Queue of (event, booking) outcomes for the web process
+        busy: Shared counter of workers currently processing a job
+        stats: Shared counters (completed, failed, wait_total, latency_total, latency_max)
+        metrics: (names, values) of the shared booking pipeline metrics
+    """
+    global _events
+    
+    # Import here to avoid circular imports in subprocess
+    from app import create_app
+    from app.utils.booking_jobs import claim_booking_job, purge_booking_jobs
+    from app.utils.async_tasks import run_booking_job
+    from app.utils.booking_pipeline import booking_metrics
+    
+    _events = events
+    booking_metrics.attach(*metrics)
+    app = create_app(config_name)
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    poll_seconds = app.config['BOOKING_JOB_POLL_SECONDS']
+    purge_interval = app.config['BOOKING_JOB_PURGE_INTERVAL_SECONDS']
+    next_purge = time.monotonic() + purge_interval
+    
+    while True:
+        try:
+            if wakeups.get(timeout=poll_seconds) is None:
+                break
+        except queue.Empty:
+            pass
+        
+        # Retention of finished jobs, checked while idle
+        if time.monotonic() >= next_purge:
+            next_purge = time.monotonic() + purge_interval
+            with app.app_context():
+                try:
+                    purged = purge_booking_jobs()
+                    if purged:
+                        app.logger.info(f"Booking worker {worker_name} purged {purged} finished jobs")
+                except Exception as e:
+                    app.logger.error(f"Booking worker {worker_name} failed to purge jobs: {str(e)}")
+        
+        # Drain every due job before waiting again
+        while True:
+            with app.app_context():
+                try:
+                    job = claim_booking_job(worker_name)
+                except Exception as e:
+                    app.logger.error(f"Booking worker {worker_name} failed to claim a job: {str(e)}")
+                    break
+                
+                if job is None:
+                    break
+                
+                enqueued_at = job.created_at
+                started_at = datetime.utcnow()
+                with busy.get_lock():
+                    busy.value += 1
+                
+                try:
+                    processed = run_booking_job(app, job)
+                except Exception as e:
+                    processed = False
+                    app.logger.error(f"Booking worker {worker_name} failed: {str(e)}")
+                finally:
+                    finished_at = datetime.utcnow()
+                    wait = (started_at - enqueued_at).total_seconds()
+                    latency = (finished_at - enqueued_at).total_seconds()
+                    
+                    with busy.get_lock():
+                        busy.value -= 1
+                    
+                    with stats.get_lock():
+                        stats[0 if processed else 1] += 1
+                        stats[2] += wait
+                        stats[3] += latency
+                        stats[4] = max(stats[4], latency)
+
+
+class BookingWorkerPool:
+    """Fixed-size pool of booking worker processes."""
+    
+    def __init__(self):
+        self._config_name = None
+        self._size = 0
+        self._wakeups = None
+        self._events = None
+        self._busy = None
+        self._stats = None
+        self._workers = []
+        self._notified = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def running(self):
+        """Check if the pool has been started."""
+        return self._wakeups is not None
+    
+    def start(self, app):
+        """
+        Recover stranded bookings and start the worker processes.
+        
+        Args:
+            app: Flask application instance
+        """
+        from app.utils.booking_jobs import recover_booking_jobs
+        from app.utils.booking_pipeline import booking_metrics, pipeline_timed_names
+        
+        with self._lock:
+            if self.running:
+                return
+            
+            with app.app_context():
+                recover_booking_jobs()
+            
+            self._config_name = app.config.get('CONFIG_NAME', 'default')
+            self._size = app.config['BOOKING_WORKERS']
+            self._wakeups = multiprocessing.Queue(maxsize=self._size * 2)
+            self._events = multiprocessing.Queue(maxsize=app.config['BOOKING_EVENTS_QUEUE_SIZE'])
+            self._busy = multiprocessing.Value('i', 0)
+            self._stats = multiprocessing.Array('d', 5)
+            booking_metrics.allocate(pipeline_timed_names())
+            
+            for _ in range(self._size):
+                self._spawn()
+                # Start on recovered jobs right away instead of at the first poll
+                self._wakeups.put_nowait(True)
+        
+        from app import socketio
+        socketio.start_background_task(self._forward_events, app, self._events)
+        
+        app.logger.info(f"Booking worker pool started with {self._size} workers")
+    
+    def _spawn(self):
+        """Start one worker process."""
+        from app.utils.booking_pipeline import booking_metrics
+        
+        worker = multiprocessing.Process(
+            target=_worker_main,
+            args=(self._config_name, self._wakeups, self._events, self._busy, self._stats,
+                  booking_metrics.shared()),
+            daemon=True
+        )
+        worker.start()
+        self._workers.append(worker)
+    
+    def _forward_events(self, app, events):
+        """Emit booking events published by the workers (web process loop)."""
+        from app import socketio
+        
+        poll_seconds = app.config['BOOKING_EVENTS_POLL_SECONDS']
+        
+        while self._events is events:
+            # Non-blocking reads, so the loop also works under eventlet
+            while True:
+                try:
+                    event, booking = events.get_nowait()
+                except queue.Empty:
+                    break
+                
+                try:
+                    _deliver_booking_event(event, booking)
+                except Exception as e:
+                    app.logger.error(f"Failed to emit {event}: {str(e)}")
+            
+            socketio.sleep(poll_seconds)
+    
+    def _replace_dead_workers(self):
+        """Respawn workers that exited unexpectedly."""
+        with self._lock:
+            alive = [worker for worker in self._workers if worker.is_alive()]
+            missing = self._size - len(alive)
+            self._workers = alive
+            for _ in range(missing):
+                self._spawn()
+    
+    def stop(self):
+        """Ask every worker to exit after its current job."""
+        with self._lock:
+            if not self.running:
+                return
+            for _ in self._workers:
+                self._wakeups.put(None)
+            self._workers = []
+            self._wakeups = None
+            self._events = None
+    
+    def notify(self, app):
+        """
+        Wake a worker after a job was committed (starting the pool if needed).
+        
+        Args:
+            app: Flask application instance
+        """
+        if not self.running:
+            self.start(app)
+        
+        self._replace_dead_workers()
+        
+        # A full wake-up queue means workers are already draining the table
+        try:
+            self._wakeups.put_nowait(True)
+        except queue.Full:
+            pass
+        
+        with self._lock:
+            self._notified += 1
+    
+    def stats(self):
+        """
+        Get pool metrics.
+        
+        Returns:
+            dict: Worker utilisation and job latency
+        """
+        if not self.running:
+            return {'running': False}
+        
+        with self._stats.get_lock():
+            completed, failed, wait_total, latency_total, latency_max = self._stats[:]
+        
+        finished = completed + failed
+        busy = self._busy.value
+        
+        return {
+            'running': True,
+            'workers': self._size,
+            'workers_alive': sum(1 for worker in self._workers if worker.is_alive()),
+            'workers_busy': busy,
+            'utilisation': round(busy / self._size, 3) if self._size else 0.0,
+            'jobs_notified': self._notified,
+            'jobs_processed': int(completed),
+            'jobs_failed': int(failed),
+            'avg_queue_wait_seconds': round(wait_total / finished, 3) if finished else None,
+            'avg_latency_seconds': round(latency_total / finished, 3) if finished else None,
+            'max_latency_seconds': round(latency_max, 3) if finished else None
+        }
+
+
+# Shared pool used by the booking service
+booking_worker_pool = BookingWorkerPool()
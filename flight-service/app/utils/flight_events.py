@@ -0,0 +1,126 @@
+"""
+Socket.IO events for flight state changes and booking outcomes.
+
+Every flight event carries a monotonically increasing 'seq'. A client that
+sees a gap (or reconnects) should resync with the 'resync' socket event or
+GET /api/flights/changes.
+
+Booking events go only to the booking user's room, which a client joins by
+connecting with its access token (auth={"token": ...}).
+"""
+import itertools
+import threading
+import requests
+
+_seq_lock = threading.Lock()
+_seq_counter = itertools.count(1)
+_last_seq = 0
+
+
+def _next_seq():
+    """Allocate the next event sequence number."""
+    global _last_seq
+    with _seq_lock:
+        _last_seq = next(_seq_counter)
+        return _last_seq
+
+
+def current_seq():
+    """Get the sequence number of the last emitted event."""
+    return _last_seq
+
+
+def _emit(event, payload):
+    """Emit an event to all connected clients."""
+    from app import socketio
+    
+    payload['seq'] = _next_seq()
+    socketio.emit(event, payload, namespace='/')
+
+
+def emit_flight_status_changed(status, flight_ids):
+    """
+    Notify clients that flights moved to a new status.
+    
+    Args:
+        status: New status (APPROVED, REJECTED, ONGOING, COMPLETED)
+        flight_ids: IDs of the flights that changed
+    """
+    if flight_ids:
+        _emit('flight_status_changed', {'status': status, 'ids': list(flight_ids)})
+
+
+def emit_flight_cancelled(flight_id):
+    """
+    Notify clients that a flight was cancelled.
+    
+    Args:
+        flight_id: Flight ID
+    """
+    _emit('flight_cancelled', {'id': flight_id, 'status': 'CANCELLED'})
+
+
+def emit_flight_updated(flight_id, status=None, deleted=False):
+    """
+    Notify clients that a flight was edited or deleted.
+    
+    Args:
+        flight_id: Flight ID
+        status: Current status (None if deleted)
+        deleted: True if the flight was deleted
+    """
+    _emit('flight_updated', {'id': flight_id, 'status': status, 'deleted': deleted})
+
+
+def user_room(user_id):
+    """Get the Socket.IO room of a user."""
+    return f'user:{user_id}'
+
+
+def authenticate_socket(auth):
+    """
+    Resolve the user of a Socket.IO connection from its access token.
+    
+    The token is checked by the Server (GET /api/auth/me), so expiry and
+    logout are honoured without sharing the JWT secret.
+    
+    Args:
+        auth: Connection auth payload ({"token": "<access token>"})
+    
+    Returns:
+        int: User ID, or None if the token is missing or invalid
+    """
+    from flask import current_app
+    
+    token = (auth or {}).get('token') if isinstance(auth, dict) else None
+    if not token:
+        return None
+    
+    from app.utils.server_client import server_client
+    
+    try:
+        response = server_client.get(
+            'auth_me', '/api/auth/me',
+            headers={'Authorization': f'Bearer {token}'}
+        )
+    except requests.RequestException as e:
+        current_app.logger.error(f"Failed to authenticate socket: {str(e)}")
+        return None
+    
+    if response.status_code != 200:
+        return None
+    
+    return response.json().get('user', {}).get('id')
+
+
+def emit_booking_event(event, booking):
+    """
+    Notify the booking user that their booking was completed or cancelled.
+    
+    Args:
+        event: 'booking_completed' or 'booking_cancelled'
+        booking: Serialized booking (dict with user_id)
+    """
+    from app import socketio
+    
+    socketio.emit(event, {'booking': booking}, to=user_room(booking['user_id']), namespace='/')
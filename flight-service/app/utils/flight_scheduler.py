@@ -0,0 +1,193 @@
+"""
+Background scheduler for flight lifecycle transitions.
+
+Keeps a min-heap of upcoming departure and arrival instants and, when one
+is due, moves flights APPROVED -> ONGOING -> COMPLETED with set-based
+UPDATE statements. Read endpoints never write flight status.
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import and_
+
+
+class FlightLifecycleScheduler:
+    """Priority-queue driven flight status scheduler."""
+    
+    def __init__(self):
+        self._app = None
+        self._heap = []
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._running = False
+        self._last_reload = None
+    
+    @property
+    def running(self):
+        """Check if the scheduler loop has been started."""
+        return self._running
+    
+    def start(self, app):
+        """
+        Start the scheduler loop as a SocketIO background task.
+        
+        Args:
+            app: Flask application instance
+        """
+        if self._running or not app.config.get('FLIGHT_SCHEDULER_ENABLED', True):
+            return
+        
+        from app import socketio
+        
+        self._app = app
+        self._running = True
+        socketio.start_background_task(self._run)
+        app.logger.info("Flight lifecycle scheduler started")
+    
+    def stop(self):
+        """Stop the scheduler loop after its current tick."""
+        self._running = False
+    
+    def schedule_flight(self, flight):
+        """
+        Register departure and arrival instants of a flight.
+        
+        Args:
+            flight: Flight that was approved or rescheduled
+        """
+        if not self._running:
+            return
+        
+        now = datetime.utcnow()
+        with self._lock:
+            for instant in (flight.departure_time, flight.arrival_time):
+                if instant and instant > now:
+                    self._push(instant)
+    
+    def _push(self, instant):
+        """Add an instant to the heap once (lock must be held)."""
+        if instant not in self._queued:
+            self._queued.add(instant)
+            heapq.heappush(self._heap, instant)
+    
+    def _pop_due(self, now):
+        """Pop all instants that are due, returning True if any were."""
+        due = False
+        with self._lock:
+            while self._heap and self._heap[0] <= now:
+                self._queued.discard(heapq.heappop(self._heap))
+                due = True
+        return due
+    
+    def _seconds_until_next(self, now):
+        """Seconds until the next queued instant, or None if the heap is empty."""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, (self._heap[0] - now).total_seconds())
+    
+    def _reload(self, now):
+        """Reload upcoming instants within the horizon from the database."""
+        from app.models import Flight
+        
+        horizon = now + timedelta(minutes=self._app.config['FLIGHT_SCHEDULER_HORIZON_MINUTES'])
+        rows = Flight.query.with_entities(Flight.departure_time, Flight.arrival_time).filter(
+            Flight.status.in_(['APPROVED', 'ONGOING']),
+            Flight.arrival_time > now,
+            Flight.departure_time <= horizon
+        ).all()
+        
+        with self._lock:
+            for departure_time, arrival_time in rows:
+                if departure_time > now:
+                    self._push(departure_time)
+                self._push(arrival_time)
+        
+        self._last_reload = now
+    
+    @staticmethod
+    def advance(now):
+        """
+        Apply all lifecycle transitions that are due at the given time.
+        
+        Args:
+            now: Reference time (naive UTC)
+        
+        Returns:
+            tuple: (list, list) - (started_ids, completed_ids)
+        """
+        from app import db
+        from app.models import Flight
+        
+        transitions = [
+            ('COMPLETED', and_(
+                Flight.status.in_(['APPROVED', 'ONGOING']),
+                Flight.arrival_time <= now
+            )),
+            ('ONGOING', and_(
+                Flight.status == 'APPROVED',
+                Flight.departure_time <= now,
+                Flight.arrival_time > now
+            ))
+        ]
+        
+        changed = {}
+        for status, condition in transitions:
+            ids = [row.id for row in Flight.query.with_entities(Flight.id).filter(condition).all()]
+            if ids:
+                # Re-check the condition so concurrent writes (e.g. cancel) win
+                Flight.query.filter(Flight.id.in_(ids), condition).update(
+                    {'status': status}, synchronize_session=False
+                )
+            changed[status] = ids
+        
+        db.session.commit()
+        return changed['ONGOING'], changed['COMPLETED']
+    
+    def _tick(self, force=False):
+        """Run one scheduler iteration inside an app context."""
+        from app import db
+        
+        now = datetime.utcnow()
+        reload_every = timedelta(seconds=self._app.config['FLIGHT_SCHEDULER_RELOAD_SECONDS'])
+        needs_reload = self._last_reload is None or now - self._last_reload >= reload_every
+        
+        due = self._pop_due(now)
+        
+        if not (force or needs_reload or due):
+            return
+        
+        with self._app.app_context():
+            try:
+                started, completed = self.advance(now)
+                if started or completed:
+                    from app.utils.tab_cache import flight_tab_cache
+                    from app.utils.flight_events import emit_flight_status_changed
+                    flight_tab_cache.invalidate()
+                    emit_flight_status_changed('ONGOING', started)
+                    emit_flight_status_changed('COMPLETED', completed)
+                    self._app.logger.info(
+                        f"Flight lifecycle: {len(started)} started, {len(completed)} completed"
+                    )
+                if needs_reload:
+                    self._reload(now)
+            except Exception as e:
+                db.session.rollback()
+                self._app.logger.error(f"Flight lifecycle tick failed: {str(e)}")
+    
+    def _run(self):
+        """Scheduler loop."""
+        from app import socketio
+        
+        max_sleep = self._app.config['FLIGHT_SCHEDULER_MAX_SLEEP_SECONDS']
+        
+        # Catch up on transitions missed while the service was down
+        self._tick(force=True)
+        
+        while self._running:
+            wait = self._seconds_until_next(datetime.utcnow())
+            socketio.sleep(max_sleep if wait is None else min(wait, max_sleep))
+            self._tick()
+
+
+flight_scheduler = FlightLifecycleScheduler()
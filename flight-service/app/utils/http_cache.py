@@ -0,0 +1,81 @@
+"""
+Conditional GET helpers (strong ETags and 304 Not Modified).
+
+ETags are derived from a cheap data version (row counts, max timestamps,
+change counters) rather than from hashing the serialized body.
+"""
+import hashlib
+from flask import request, current_app, jsonify, make_response
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag value from version components.
+    
+    Args:
+        *parts: Values identifying the data version
+    
+    Returns:
+        str: ETag value (unquoted)
+    """
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def _matching_etag(etag):
+    """
+    Find the variant of the ETag sent in If-None-Match.
+    
+    Response compression appends ':<algorithm>' to the ETag of compressed
+    bodies, so clients may send back either the plain or suffixed value.
+    """
+    if etag is None:
+        return None
+    
+    variants = [etag] + [
+        f'{etag}:{algorithm}' for algorithm in current_app.config.get('COMPRESS_ALGORITHM', ())
+    ]
+    for variant in variants:
+        if request.if_none_match.contains(variant):
+            return variant
+    return None
+
+
+def is_not_modified(etag):
+    """Check if the request's If-None-Match matches the ETag."""
+    return _matching_etag(etag) is not None
+
+
+def not_modified(etag):
+    """
+    Build an empty 304 response carrying the ETag.
+    
+    Args:
+        etag: ETag value
+    
+    Returns:
+        Response: 304 response
+    """
+    response = make_response('', 304)
+    response.set_etag(_matching_etag(etag) or etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def json_with_etag(payload, status_code, etag):
+    """
+    Build a JSON response with an ETag for successful reads.
+    
+    Args:
+        payload: Response data
+        status_code: HTTP status code
+        etag: ETag value (ignored if None or status is not 200)
+    
+    Returns:
+        tuple: (Response, int)
+    """
+    response = jsonify(payload)
+    if etag is not None and status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response, status_code
@@ -0,0 +1,145 @@
+"""
+Idempotency keys for POST /api/bookings.
+
+The first request with a key inserts an IN_PROGRESS row; the unique
+(user_id, key) index makes concurrent retries fail that insert instead
+of charging the user again. The claim is a lease
+(IDEMPOTENCY_KEY_LEASE_SECONDS): if the request dies before finishing, a
+retry takes the key over once the lease has run out. When the request
+finishes, its response is stored and replayed to later requests with the
+same key for IDEMPOTENCY_KEY_TTL_SECONDS.
+"""
+import json
+import hashlib
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+
+def request_fingerprint(payload):
+    """
+    Hash a request payload, so a key reused for another request is detected.
+    
+    Args:
+        payload: JSON-serializable request data
+    
+    Returns:
+        str: SHA-256 hex digest
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def claim_idempotency_key(user_id, key, fingerprint):
+    """
+    Claim an idempotency key, or find the request that already used it.
+    
+    Args:
+        user_id: User sending the request (keys are scoped per user)
+        key: Idempotency-Key header value
+        fingerprint: request_fingerprint of the request
+    
+    Returns:
+        tuple: (state, IdempotencyKey or None), where state is
+            'NEW' (claimed, run the request), 'DONE' (replay the stored
+            response), 'IN_PROGRESS' (first request still running) or
+            'MISMATCH' (key used with a different request). A key whose
+            lease ran out is taken over and returned as 'NEW'.
+    """
+    from app import db
+    from app.models import IdempotencyKey
+    
+    now = datetime.utcnow()
+    ttl = timedelta(seconds=current_app.config['IDEMPOTENCY_KEY_TTL_SECONDS'])
+    lease = timedelta(seconds=current_app.config['IDEMPOTENCY_KEY_LEASE_SECONDS'])
+    
+    # Expired keys of this user can be reused
+    IdempotencyKey.query.filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.expires_at <= now
+    ).delete(synchronize_session=False)
+    
+    record = IdempotencyKey(user_id, key, fingerprint, now + ttl, now + lease)
+    db.session.add(record)
+    
+    try:
+        db.session.commit()
+        return 'NEW', record
+    except IntegrityError:
+        db.session.rollback()
+    
+    existing = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+    
+    # Released by the first request in the meantime; it did not charge the user
+    if existing is None:
+        return 'IN_PROGRESS', None
+    
+    if existing.fingerprint != fingerprint:
+        return 'MISMATCH', existing
+    
+    if existing.status == 'IN_PROGRESS' and existing.locked_until and existing.locked_until <= now:
+        # The first request died before finishing; re-check the lease so
+        # only one retry takes the key over
+        taken = IdempotencyKey.query.filter(
+            IdempotencyKey.id == existing.id,
+            IdempotencyKey.status == 'IN_PROGRESS',
+            IdempotencyKey.locked_until <= now
+        ).update({
+            IdempotencyKey.locked_until: now + lease,
+            IdempotencyKey.expires_at: now + ttl
+        }, synchronize_session=False)
+        db.session.commit()
+        
+        if taken:
+            return 'NEW', existing
+        return 'IN_PROGRESS', existing
+    
+    return existing.status, existing
+
+
+def save_idempotent_response(record, response, status_code):
+    """
+    Store the response of a claimed key for replay.
+    
+    The replay window (IDEMPOTENCY_KEY_TTL_SECONDS) starts now.
+    
+    Args:
+        record: IdempotencyKey returned by claim_idempotency_key
+        response: Response data
+        status_code: HTTP status code
+    """
+    from app import db
+    from app.models import IdempotencyKey
+    
+    now = datetime.utcnow()
+    IdempotencyKey.query.filter(
+        IdempotencyKey.id == record.id,
+        IdempotencyKey.status == 'IN_PROGRESS'
+    ).update({
+        IdempotencyKey.status: 'DONE',
+        IdempotencyKey.response_code: status_code,
+        IdempotencyKey.response_body: json.dumps(response, default=str),
+        IdempotencyKey.locked_until: None,
+        IdempotencyKey.expires_at: now + timedelta(seconds=current_app.config['IDEMPOTENCY_KEY_TTL_SECONDS'])
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def release_idempotency_key(record):
+    """
+    Delete a claimed key, so a retry with it runs the request again.
+    
+    Only for outcomes where nothing was charged or queued.
+    
+    Args:
+        record: IdempotencyKey returned by claim_idempotency_key
+    """
+    from app import db
+    from app.models import IdempotencyKey
+    
+    db.session.rollback()
+    IdempotencyKey.query.filter(
+        IdempotencyKey.id == record.id,
+        IdempotencyKey.status == 'IN_PROGRESS'
+    ).delete(synchronize_session=False)
+    db.session.commit()
@@ -0,0 +1,348 @@
+"""
+Transactional outbox for refunds and other commands sent to the Server.
+
+Commands are added to the session of the status change that causes them
+(booking cancelled, flight cancelled), so both commit or roll back
+together. The OutboxRelay delivers due messages in batches: refunds go
+to the Server in one call, which applies each refund once per dedup key,
+so redelivery after a crash cannot refund twice. Failed deliveries are
+retried with exponential backoff; after OUTBOX_MAX_ATTEMPTS a message is
+marked DEAD and logged.
+"""
+import os
+import uuid
+import random
+import socket
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+import requests
+
+
+def add_outbox_message(kind, payload, dedup_key):
+    """
+    Add a message to the current session (the caller commits).
+    
+    Args:
+        kind: Message kind (REFUND, FLIGHT_CANCELLED_EMAIL)
+        payload: JSON-serializable payload
+        dedup_key: Unique key of the command
+    
+    Returns:
+        OutboxMessage: New message, or None if the key was already queued
+    """
+    from app import db
+    from app.models import OutboxMessage
+    
+    if OutboxMessage.query.filter_by(dedup_key=dedup_key).first():
+        return None
+    
+    message = OutboxMessage(kind, payload, dedup_key)
+    db.session.add(message)
+    return message
+
+
+def add_refund(user_id, amount, dedup_key, reason, reservation_key=None):
+    """
+    Queue a refund to a user's account balance (the caller commits).
+    
+    Args:
+        user_id: User ID
+        amount: Amount to refund
+        dedup_key: Unique key, e.g. 'refund:booking:<id>'
+        reason: Why the user is refunded (for logs)
+        reservation_key: Release this funds reservation instead; the Server
+            credits it only if the reservation was made
+    
+    Returns:
+        OutboxMessage: New message, or None if the key was already queued
+    """
+    payload = {
+        'user_id': user_id,
+        'amount': float(amount),
+        'reason': reason
+    }
+    if reservation_key:
+        payload['reservation_key'] = reservation_key
+    return add_outbox_message('REFUND', payload, dedup_key)
+
+
+def add_reservation_release(user_id, amount, reservation_key, reason):
+    """
+    Queue the release of a funds reservation whose outcome is unknown (the caller commits).
+    
+    Args:
+        user_id: User ID
+        amount: Reserved amount
+        reservation_key: Key the reservation was sent with
+        reason: Why the reservation is released (for logs)
+    
+    Returns:
+        OutboxMessage: New message, or None if the key was already queued
+    """
+    return add_refund(user_id, amount, f'refund:{reservation_key}', reason, reservation_key)
+
+
+def claim_outbox_batch(limit, now=None):
+    """
+    Claim a batch of due messages for delivery.
+    
+    The claim extends available_at by OUTBOX_LEASE_SECONDS, so if the
+    relay dies the messages are delivered again after the lease.
+    
+    Args:
+        limit: Maximum number of messages
+        now: Reference time (naive UTC), defaults to utcnow
+    
+    Returns:
+        list: Claimed OutboxMessage objects
+    """
+    from app import db
+    from app.models import OutboxMessage
+    
+    now = now or datetime.utcnow()
+    lease = timedelta(seconds=current_app.config['OUTBOX_LEASE_SECONDS'])
+    token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+    
+    due = OutboxMessage.query.with_entities(OutboxMessage.id).filter(
+        OutboxMessage.status == 'PENDING',
+        OutboxMessage.available_at <= now
+    ).order_by(OutboxMessage.available_at.asc(), OutboxMessage.id.asc()).limit(limit).all()
+    
+    if not due:
+        return []
+    
+    # Re-check the condition so concurrent relays never claim the same message
+    OutboxMessage.query.filter(
+        OutboxMessage.id.in_([row.id for row in due]),
+        OutboxMessage.status == 'PENDING',
+        OutboxMessage.available_at <= now
+    ).update({
+        OutboxMessage.attempts: OutboxMessage.attempts + 1,
+        OutboxMessage.available_at: now + lease,
+        OutboxMessage.locked_by: token
+    }, synchronize_session=False)
+    db.session.commit()
+    
+    return OutboxMessage.query.filter_by(locked_by=token, status='PENDING').order_by(
+        OutboxMessage.id.asc()
+    ).all()
+
+
+def _deliver_refunds(messages):
+    """
+    Send refunds to the Server in one call.
+    
+    Returns:
+        dict: Message ID -> error (None if applied)
+    """
+    from app.utils.server_client import server_client
+    
+    try:
+        # The relay retries with its own backoff
+        response = server_client.post(
+            'refunds', '/api/users/internal/refunds',
+            json={'refunds': [
+                {'key': message.dedup_key, **message.data()} for message in messages
+            ]},
+            timeout=current_app.config['OUTBOX_TIMEOUT_SECONDS'],
+            retries=0
+        )
+    except requests.RequestException as e:
+        return {message.id: str(e) for message in messages}
+    
+    if response.status_code != 200:
+        return {message.id: f'Server returned {response.status_code}' for message in messages}
+    
+    results = {result.get('key'): result for result in response.json().get('results', [])}
+    outcome = {}
+    for message in messages:
+        result = results.get(message.dedup_key, {})
+        # 'duplicate' means an earlier delivery was already applied,
+        # 'void' that a released reservation had never been made
+        if result.get('status') in ('applied', 'duplicate', 'void'):
+            outcome[message.id] = None
+        else:
+            outcome[message.id] = result.get('error', 'No result for refund')
+    return outcome
+
+
+def _deliver_email(message):
+    """
+    Ask the Server to send a flight cancellation email.
+    
+    Returns:
+        str: Error, or None if sent
+    """
+    from app.utils.server_client import server_client
+    
+    try:
+        response = server_client.post(
+            'flight_cancelled_email', '/api/notifications/flight-cancelled',
+            json=message.data(),
+            timeout=current_app.config['OUTBOX_TIMEOUT_SECONDS'],
+            retries=0
+        )
+    except requests.RequestException as e:
+        return str(e)
+    
+    if response.status_code != 200:
+        return f'Server returned {response.status_code}'
+    return None
+
+
+def _record_outcome(message, error, now):
+    """Mark a delivered message SENT, or schedule a retry / mark it DEAD."""
+    from app.models import OutboxMessage
+    
+    config = current_app.config
+    claimed = OutboxMessage.query.filter(
+        OutboxMessage.id == message.id,
+        OutboxMessage.status == 'PENDING',
+        OutboxMessage.locked_by == message.locked_by
+    )
+    
+    if error is None:
+        claimed.update({
+            OutboxMessage.status: 'SENT',
+            OutboxMessage.sent_at: now,
+            OutboxMessage.locked_by: None
+        }, synchronize_session=False)
+        return
+    
+    if message.attempts >= config['OUTBOX_MAX_ATTEMPTS']:
+        claimed.update({
+            OutboxMessage.status: 'DEAD',
+            OutboxMessage.last_error: error,
+            OutboxMessage.locked_by: None
+        }, synchronize_session=False)
+        current_app.logger.error(
+            f"Outbox message {message.dedup_key} gave up after {message.attempts} attempts: {error}"
+        )
+        return
+    
+    # Full jitter keeps retries of a failed batch from lining up
+    delay = min(
+        config['OUTBOX_BACKOFF_MAX_SECONDS'],
+        config['OUTBOX_BACKOFF_SECONDS'] * 2 ** (message.attempts - 1)
+    ) * random.uniform(0.5, 1.0)
+    claimed.update({
+        OutboxMessage.available_at: now + timedelta(seconds=delay),
+        OutboxMessage.last_error: error,
+        OutboxMessage.locked_by: None
+    }, synchronize_session=False)
+
+
+def relay_outbox_batch():
+    """
+    Deliver one batch of due messages.
+    
+    Returns:
+        int: Number of messages claimed
+    """
+    from app import db
+    
+    messages = claim_outbox_batch(current_app.config['OUTBOX_BATCH_SIZE'])
+    if not messages:
+        return 0
+    
+    refunds = [message for message in messages if message.kind == 'REFUND']
+    outcome = _deliver_refunds(refunds) if refunds else {}
+    
+    for message in messages:
+        if message.kind == 'FLIGHT_CANCELLED_EMAIL':
+            outcome[message.id] = _deliver_email(message)
+        elif message.kind != 'REFUND':
+            outcome[message.id] = f'Unknown message kind {message.kind}'
+    
+    now = datetime.utcnow()
+    for message in messages:
+        _record_outcome(message, outcome[message.id], now)
+    db.session.commit()
+    
+    return len(messages)
+
+
+def outbox_counts():
+    """
+    Count outbox messages per status.
+    
+    Returns:
+        dict: Status -> number of messages
+    """
+    from app.models import OutboxMessage
+    
+    rows = OutboxMessage.query.with_entities(
+        OutboxMessage.status, func.count(OutboxMessage.id)
+    ).group_by(OutboxMessage.status).all()
+    
+    counts = {'PENDING': 0, 'SENT': 0, 'DEAD': 0}
+    counts.update({status: count for status, count in rows})
+    return counts
+
+
+class OutboxRelay:
+    """Background loop delivering outbox messages."""
+    
+    def __init__(self):
+        self._app = None
+        self._running = False
+    
+    @property
+    def running(self):
+        """Check if the relay loop has been started."""
+        return self._running
+    
+    def start(self, app):
+        """
+        Start the relay loop as a SocketIO background task.
+        
+        Args:
+            app: Flask application instance
+        """
+        if self._running or not app.config.get('OUTBOX_RELAY_ENABLED', True):
+            return
+        
+        from app import socketio
+        
+        self._app = app
+        self._running = True
+        socketio.start_background_task(self._run)
+        app.logger.info("Outbox relay started")
+    
+    def stop(self):
+        """Stop the relay loop after its current batch."""
+        self._running = False
+    
+    def notify(self, app):
+        """
+        Make sure the relay runs after messages were committed.
+        
+        Args:
+            app: Flask application instance
+        """
+        if not self._running:
+            self.start(app)
+    
+    def _run(self):
+        """Relay loop."""
+        from app import db, socketio
+        
+        poll_seconds = self._app.config['OUTBOX_POLL_SECONDS']
+        batch_size = self._app.config['OUTBOX_BATCH_SIZE']
+        
+        while self._running:
+            with self._app.app_context():
+                try:
+                    # Keep going while batches come back full
+                    while self._running and relay_outbox_batch() >= batch_size:
+                        pass
+                except Exception as e:
+                    db.session.rollback()
+                    self._app.logger.error(f"Outbox relay failed: {str(e)}")
+            
+            socketio.sleep(poll_seconds)
+
+
+# Shared relay started with the service
+outbox_relay = OutboxRelay()
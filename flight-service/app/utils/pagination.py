@@ -0,0 +1,214 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque, URL-safe tokens that encode the sort key of the last
+row returned, so the next page is a single indexed range scan instead of
+an OFFSET that grows with the table. A cursor also records the sort it
+was issued for and is rejected under any other sort.
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import and_, or_
+
+
+def sort_key(sort_column, descending=False):
+    """
+    Name a sort the way the sort parameter does ('departure_time', '-created_at').
+    
+    Args:
+        sort_column: Column the rows are ordered by
+        descending: The rows are ordered descending
+    
+    Returns:
+        str: Sort key recorded in cursors
+    """
+    return f"{'-' if descending else ''}{sort_column.key}"
+
+
+def encode_cursor(sort_value, row_id, sort):
+    """
+    Encode the sort key of the last row into an opaque cursor.
+    
+    Args:
+        sort_value: Value of the sort column (datetime, number or string)
+        row_id: Primary key of the row
+        sort: Sort the page was ordered by (see sort_key)
+    
+    Returns:
+        str: URL-safe cursor token
+    """
+    if isinstance(sort_value, datetime):
+        position = [sort, sort_value.isoformat(), row_id, 'd']
+    else:
+        # Non-datetime keys are tagged so they are not parsed as dates
+        if isinstance(sort_value, Decimal):
+            sort_value = str(sort_value)
+        position = [sort, sort_value, row_id, 'v']
+    payload = json.dumps(position, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Cursor token
+        sort: Sort of the requested page (see sort_key)
+    
+    Returns:
+        tuple: (sort_value, int) - (sort_value, row_id)
+    
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, sort_value, row_id, kind = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if kind == 'd':
+            sort_value = datetime.fromisoformat(sort_value)
+        position = (sort_value, int(row_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    
+    # A position only means something in the order it was taken from
+    if cursor_sort != sort:
+        raise ValueError('Invalid cursor')
+    return position
+
+
+def clamp_limit(limit, default, maximum):
+    """
+    Normalize a requested page size.
+    
+    Args:
+        limit: Requested page size (may be None)
+        default: Page size used when none is requested
+        maximum: Upper bound for the page size
+    
+    Returns:
+        int: Page size between 1 and maximum
+    """
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+
+def keyset_order(sort_column, id_column, descending=False):
+    """
+    Build the ORDER BY clauses for a (sort_column, id_column) keyset.
+    
+    Args:
+        sort_column: Column the rows are ordered by
+        id_column: Primary key column used as tie-breaker
+        descending: Order both columns descending instead of ascending
+    
+    Returns:
+        tuple: ORDER BY clauses
+    """
+    if descending:
+        return sort_column.desc(), id_column.desc()
+    return sort_column.asc(), id_column.asc()
+
+
+def paginate_keyset(query, sort_column, id_column, limit, cursor=None, descending=False):
+    """
+    Apply keyset pagination on (sort_column, id_column).
+    
+    Args:
+        query: SQLAlchemy query to paginate
+        sort_column: Column the page is ordered by (must not be nullable)
+        id_column: Primary key column used as tie-breaker
+        limit: Page size
+        cursor: Optional cursor returned by the previous page
+        descending: Order both columns descending instead of ascending
+    
+    Returns:
+        tuple: (list, str|None) - (rows, next_cursor)
+    
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    sort = sort_key(sort_column, descending)
+    if cursor:
+        query = query.filter(
+            after_position(sort_column, id_column, decode_cursor(cursor, sort), descending)
+        )
+    
+    rows = query.order_by(*keyset_order(sort_column, id_column, descending)).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key), sort)
+    
+    return rows, next_cursor
+
+
+def encode_sync_cursor(positions):
+    """
+    Encode several (datetime, id) stream positions into one cursor.
+    
+    Args:
+        positions: dict of stream name -> (datetime, int) or None
+    
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps({
+        name: [position[0].isoformat(), position[1]] if position else None
+        for name, position in positions.items()
+    }, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_sync_cursor(cursor):
+    """
+    Decode a cursor produced by encode_sync_cursor.
+    
+    Args:
+        cursor: Cursor token
+    
+    Returns:
+        dict: Stream name -> (datetime, int) or None
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return {
+            name: (datetime.fromisoformat(position[0]), int(position[1])) if position else None
+            for name, position in data.items()
+        }
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def after_position(sort_column, id_column, position, descending=False):
+    """
+    Build the keyset predicate for rows after a (sort_value, id) position.
+    
+    Args:
+        sort_column: Column the stream is ordered by
+        id_column: Primary key column used as tie-breaker
+        position: (sort_value, row_id) tuple
+        descending: The stream is ordered descending
+    
+    Returns:
+        SQL expression
+    """
+    last_value, last_id = position
+    if descending:
+        return or_(
+            sort_column < last_value,
+            and_(sort_column == last_value, id_column < last_id)
+        )
+    return or_(
+        sort_column > last_value,
+        and_(sort_column == last_value, id_column > last_id)
+    )
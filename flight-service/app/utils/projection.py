@@ -0,0 +1,100 @@
+"""
+Sparse fieldset (fields=) and sort (sort=) helpers for list endpoints.
+
+Models describe their fields as name -> (columns, getter) so a projection
+selects only the columns it needs and serializes only the requested keys.
+"""
+
+
+def parse_fields(raw, allowed):
+    """
+    Parse a comma-separated fields parameter.
+    
+    Args:
+        raw: Value of the fields query parameter (may be None)
+        allowed: Iterable of allowed field names
+    
+    Returns:
+        tuple: Requested field names in request order, or None for all fields
+    
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not raw:
+        return None
+    
+    fields = []
+    for name in raw.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+    
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    
+    return tuple(fields) or None
+
+
+def parse_sort(raw, allowed, default):
+    """
+    Parse a sort parameter such as 'departure_time' or '-ticket_price'.
+    
+    Args:
+        raw: Value of the sort query parameter (may be None)
+        allowed: dict of sortable field name -> column
+        default: Sort used when none is given (same syntax)
+    
+    Returns:
+        tuple: (column, bool) - (sort_column, descending)
+    
+    Raises:
+        ValueError: If the field is not sortable
+    """
+    raw = (raw or default).strip()
+    descending = raw.startswith('-')
+    name = raw.lstrip('-+')
+    
+    if name not in allowed:
+        raise ValueError(f"Cannot sort by '{name}'. Allowed: {', '.join(sorted(allowed))}")
+    
+    return allowed[name], descending
+
+
+def columns_for(field_map, fields, always=()):
+    """
+    Collect the columns needed to serialize the given fields.
+    
+    Args:
+        field_map: dict of field name -> (columns, getter)
+        fields: Requested field names
+        always: Columns selected regardless of the projection
+    
+    Returns:
+        tuple: Columns without duplicates, in a stable order
+    """
+    columns = list(always)
+    for name in fields:
+        for column in field_map[name][0]:
+            if not any(column is existing for existing in columns):
+                columns.append(column)
+    return tuple(columns)
+
+
+def make_serializer(field_map, fields):
+    """
+    Build a serializer producing only the given fields.
+    
+    Args:
+        field_map: dict of field name -> (columns, getter); getters take (row, now)
+        fields: Requested field names
+    
+    Returns:
+        callable: serialize(row, now) -> dict
+    """
+    getters = [(name, field_map[name][1]) for name in fields]
+    
+    def serialize(row, now=None):
+        return {name: getter(row, now) for name, getter in getters}
+    
+    return serialize
@@ -0,0 +1,231 @@
+"""
+Shared HTTP client for calls to the Server.
+
+One pooled requests.Session per process keeps connections to the Server
+alive, so calls do not pay for a new TCP connection each time. Every call
+names its upstream route, which selects the metrics bucket. Calls have a
+(connect, read) timeout and bounded retries with jitter. Only idempotent
+calls are retried after the request may have reached the Server; others
+are retried only when the connection could not be opened.
+
+A circuit breaker shared by all routes fails calls fast with
+CircuitOpenError (a requests.RequestException) after
+SERVER_CIRCUIT_FAILURE_THRESHOLD consecutive failures. After
+SERVER_CIRCUIT_RESET_SECONDS one trial call is let through; its outcome
+closes or reopens the circuit.
+
+State and metrics are per process (web process and each booking worker).
+"""
+import os
+import time
+import random
+import threading
+from flask import current_app
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Responses retried for idempotent calls and counted as Server failures
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling the Server while the circuit is open."""
+
+
+def _not_sent(error):
+    """Check if a request failed before it could reach the Server."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+class ServerClient:
+    """Pooled, instrumented client for the Server API."""
+    
+    def __init__(self):
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        
+        # Circuit breaker: CLOSED, OPEN or HALF_OPEN
+        self._state = 'CLOSED'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        
+        self._routes = {}
+    
+    def _get_session(self):
+        """Get the session of this process (worker processes get their own)."""
+        if self._session is None or self._pid != os.getpid():
+            config = current_app.config
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=config['SERVER_HTTP_POOL_SIZE'],
+                max_retries=0
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+            self._pid = os.getpid()
+        return self._session
+    
+    def _allow(self):
+        """Check the circuit before a call (False to fail fast)."""
+        config = current_app.config
+        
+        with self._lock:
+            if self._state == 'CLOSED':
+                return True
+            
+            if self._state == 'OPEN':
+                if time.monotonic() - self._opened_at < config['SERVER_CIRCUIT_RESET_SECONDS']:
+                    return False
+                self._state = 'HALF_OPEN'
+            
+            # Half-open: a single trial call at a time
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+    
+    def _record(self, success):
+        """Update the circuit with the outcome of a call."""
+        threshold = current_app.config['SERVER_CIRCUIT_FAILURE_THRESHOLD']
+        
+        with self._lock:
+            self._trial_running = False
+            
+            if success:
+                self._state = 'CLOSED'
+                self._failures = 0
+                return
+            
+            self._failures += 1
+            if self._state == 'HALF_OPEN' or self._failures >= threshold:
+                if self._state != 'OPEN':
+                    current_app.logger.error(
+                        f"Server circuit opened after {self._failures} consecutive failures"
+                    )
+                self._state = 'OPEN'
+                self._opened_at = time.monotonic()
+    
+    def _observe(self, route, outcome, seconds=None, retried=False):
+        """Count a call outcome of a route ('2xx'... , 'error' or 'short_circuited')."""
+        with self._lock:
+            stats = self._routes.setdefault(route, {
+                'requests': 0, 'retries': 0, 'outcomes': {},
+                'latency_total': 0.0, 'latency_max': 0.0
+            })
+            if retried:
+                stats['retries'] += 1
+                return
+            
+            stats['requests'] += 1
+            stats['outcomes'][outcome] = stats['outcomes'].get(outcome, 0) + 1
+            if seconds is not None:
+                stats['latency_total'] += seconds
+                stats['latency_max'] = max(stats['latency_max'], seconds)
+    
+    def request(self, method, route, path, timeout=None, retries=None, idempotent=True, **kwargs):
+        """
+        Call the Server.
+        
+        Args:
+            method: HTTP method
+            route: Upstream route name (metrics key), e.g. 'reserve_funds'
+            path: Path under SERVER_URL
+            timeout: Read timeout in seconds (default: SERVER_HTTP_TIMEOUT_SECONDS)
+            retries: Retries after the first attempt (default: SERVER_HTTP_RETRIES)
+            idempotent: The call is safe to repeat once it may have reached the Server
+            **kwargs: Passed to requests (json, data, files, headers, ...)
+        
+        Returns:
+            requests.Response: Final response
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+            requests.RequestException: If the last attempt failed
+        """
+        config = current_app.config
+        url = f"{config['SERVER_URL']}{path}"
+        timeout = (
+            config['SERVER_HTTP_CONNECT_TIMEOUT_SECONDS'],
+            timeout if timeout is not None else config['SERVER_HTTP_TIMEOUT_SECONDS']
+        )
+        retries = config['SERVER_HTTP_RETRIES'] if retries is None else retries
+        
+        attempt = 0
+        while True:
+            if not self._allow():
+                self._observe(route, 'short_circuited')
+                raise CircuitOpenError(f"Server circuit is open ({route})")
+            
+            started = time.perf_counter()
+            try:
+                response = self._get_session().request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self._observe(route, 'error', time.perf_counter() - started)
+                self._record(False)
+                if attempt >= retries or not (idempotent or _not_sent(e)):
+                    raise
+            else:
+                self._observe(route, f'{response.status_code // 100}xx', time.perf_counter() - started)
+                failed = response.status_code in RETRY_STATUSES
+                self._record(not failed)
+                if not failed or not idempotent or attempt >= retries:
+                    return response
+            
+            attempt += 1
+            self._observe(route, None, retried=True)
+            
+            # Full jitter keeps callers from retrying in lockstep
+            delay = min(
+                config['SERVER_HTTP_BACKOFF_MAX_SECONDS'],
+                config['SERVER_HTTP_BACKOFF_SECONDS'] * 2 ** (attempt - 1)
+            ) * random.uniform(0.5, 1.0)
+            time.sleep(delay)
+    
+    def get(self, route, path, **kwargs):
+        """GET from the Server (see request)."""
+        return self.request('GET', route, path, **kwargs)
+    
+    def post(self, route, path, **kwargs):
+        """POST to the Server (see request)."""
+        return self.request('POST', route, path, **kwargs)
+    
+    def stats(self):
+        """
+        Get client metrics of this process.
+        
+        Returns:
+            dict: Circuit state and per-route calls, outcomes and latency
+        """
+        with self._lock:
+            routes = {}
+            for route, stats in self._routes.items():
+                timed = sum(
+                    count for outcome, count in stats['outcomes'].items()
+                    if outcome != 'short_circuited'
+                )
+                routes[route] = {
+                    'requests': stats['requests'],
+                    'retries': stats['retries'],
+                    'outcomes': dict(stats['outcomes']),
+                    'avg_latency_seconds': round(stats['latency_total'] / timed, 4) if timed else None,
+                    'max_latency_seconds': round(stats['latency_max'], 4) if timed else None
+                }
+            
+            return {
+                'circuit': self._state,
+                'consecutive_failures': self._failures,
+                'routes': routes
+            }
+
+
+# Shared client for every call to the Server
+server_client = ServerClient()
@@ -0,0 +1,65 @@
+"""
+Streaming JSON / NDJSON responses for large list endpoints.
+
+Rows are pulled from a generator (backed by yield_per / server-side
+cursors) and written incrementally, so memory does not grow with the
+number of rows returned.
+"""
+from flask import Response, request, current_app, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    """Check if the client asked for newline-delimited JSON."""
+    return request.accept_mimetypes.best_match(
+        ['application/json', NDJSON_MIMETYPE]
+    ) == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    """Check if the client asked for a streamed response (?stream=true or NDJSON)."""
+    return request.args.get('stream', '').lower() in ('1', 'true') or wants_ndjson()
+
+
+def stream_json_list(key, items):
+    """
+    Stream a list of dicts as JSON ({"<key>": [...], "total": n}) or NDJSON.
+    
+    Args:
+        key: Name of the list field in the JSON object
+        items: Iterable of dicts (consumed lazily)
+    
+    Returns:
+        Response: Streaming response
+    """
+    dumps = current_app.json.dumps
+    chunk_size = current_app.config['STREAM_CHUNK_ROWS']
+    ndjson = wants_ndjson()
+    
+    def generate():
+        buffer = []
+        total = 0
+        
+        if not ndjson:
+            yield f'{{"{key}":['
+        
+        for item in items:
+            if ndjson:
+                buffer.append(dumps(item) + '\n')
+            else:
+                buffer.append((',' if total else '') + dumps(item))
+            total += 1
+            
+            if len(buffer) >= chunk_size:
+                yield ''.join(buffer)
+                buffer = []
+        
+        if buffer:
+            yield ''.join(buffer)
+        
+        if not ndjson:
+            yield f'],"total":{total}}}'
+    
+    mimetype = NDJSON_MIMETYPE if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
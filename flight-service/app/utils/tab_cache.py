@@ -0,0 +1,87 @@
+"""
+In-memory materialized snapshot of the flight tabs.
+
+The snapshot is rebuilt on the first request after it was invalidated by a
+flight write, after the next departure/arrival boundary has passed, or
+after a maximum age (so remaining_time stays fresh).
+"""
+import threading
+from datetime import datetime
+
+
+class FlightTabCache:
+    """Process-local snapshot of upcoming/ongoing/completed_cancelled tabs."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._valid_until = None
+        self._etag = None
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, builder, now=None):
+        """
+        Return the current snapshot, rebuilding it if stale.
+        
+        Args:
+            builder: Callable(now) -> (dict, datetime, str) returning tab data,
+                the instant until which it stays valid and its ETag
+            now: Reference time (naive UTC), defaults to utcnow
+        
+        Returns:
+            tuple: (dict, str) - (tab_data, etag)
+        """
+        now = now or datetime.utcnow()
+        
+        with self._lock:
+            if self._snapshot is not None and now < self._valid_until:
+                self._hits += 1
+                return self._snapshot, self._etag
+            self._misses += 1
+            version = self._version
+        
+        snapshot, valid_until, etag = builder(now)
+        
+        with self._lock:
+            # Do not publish a snapshot that was invalidated while building
+            if version == self._version:
+                self._snapshot = snapshot
+                self._valid_until = valid_until
+                self._etag = etag
+        
+        return snapshot, etag
+    
+    def invalidate(self):
+        """Drop the snapshot after a flight write."""
+        with self._lock:
+            self._snapshot = None
+            self._valid_until = None
+            self._etag = None
+            self._version += 1
+    
+    @property
+    def version(self):
+        """Monotonic counter bumped on every invalidation."""
+        return self._version
+    
+    def stats(self):
+        """
+        Get cache hit/miss counters.
+        
+        Returns:
+            dict: hits, misses, hit_ratio and snapshot validity
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 4) if total else 0.0,
+                'version': self._version,
+                'valid_until': self._valid_until.isoformat() + 'Z' if self._valid_until else None
+            }
+
+
+flight_tab_cache = FlightTabCache()
@@ -0,0 +1,19 @@
+"""
+Timestamp formatting shared by model serializers.
+"""
+from datetime import timezone
+
+
+def format_utc(value):
+    """
+    Format a naive UTC datetime as ISO 8601 with a Z suffix.
+    
+    Args:
+        value: Naive UTC datetime or None
+    
+    Returns:
+        str: Formatted timestamp, or None
+    """
+    if not value:
+        return None
+    return value.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
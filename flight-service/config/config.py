@@ -27,12 +27,94 @@ class Config:
     # Server URL
     SERVER_URL = os.getenv('SERVER_URL', 'http://localhost:5000')
     
+    # Shared Server client (pooled keep-alive connections, retries, circuit breaker)
+    SERVER_HTTP_POOL_SIZE = int(os.getenv('SERVER_HTTP_POOL_SIZE', 20))
+    SERVER_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv('SERVER_HTTP_CONNECT_TIMEOUT_SECONDS', 2))
+    SERVER_HTTP_TIMEOUT_SECONDS = float(os.getenv('SERVER_HTTP_TIMEOUT_SECONDS', 5))  # read timeout
+    SERVER_HTTP_RETRIES = int(os.getenv('SERVER_HTTP_RETRIES', 2))
+    SERVER_HTTP_BACKOFF_SECONDS = float(os.getenv('SERVER_HTTP_BACKOFF_SECONDS', 0.1))
+    SERVER_HTTP_BACKOFF_MAX_SECONDS = float(os.getenv('SERVER_HTTP_BACKOFF_MAX_SECONDS', 1))
+    SERVER_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('SERVER_CIRCUIT_FAILURE_THRESHOLD', 5))
+    SERVER_CIRCUIT_RESET_SECONDS = float(os.getenv('SERVER_CIRCUIT_RESET_SECONDS', 30))
+    
     # Server
     HOST = os.getenv('HOST', '0.0.0.0')
     PORT = int(os.getenv('PORT', 5001))
     
     # PDF Generation
     PDF_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports')
+    
+    # Response compression (Flask-Compress, negotiated on Accept-Encoding)
+    COMPRESS_ALGORITHM = os.getenv('COMPRESS_ALGORITHM', 'br,gzip').split(',')
+    # Streamed responses are compressed chunk by chunk (gzip is not supported there)
+    COMPRESS_ALGORITHM_STREAMING = os.getenv('COMPRESS_ALGORITHM_STREAMING', 'br,deflate').split(',')
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', 4))
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))  # bytes
+    COMPRESS_STREAMS = os.getenv('COMPRESS_STREAMS', 'True') == 'True'
+    COMPRESS_MIMETYPES = ['application/json', 'application/x-ndjson', 'text/html', 'text/plain']
+    
+    # Pagination
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+    
+    # Streaming list responses (rows per DB fetch / per written chunk)
+    STREAM_YIELD_PER = int(os.getenv('STREAM_YIELD_PER', 500))
+    STREAM_CHUNK_ROWS = int(os.getenv('STREAM_CHUNK_ROWS', 100))
+    
+    # Seats per flight when the manager does not set a capacity
+    FLIGHT_DEFAULT_CAPACITY = int(os.getenv('FLIGHT_DEFAULT_CAPACITY', 180))
+    
+    # Booking worker pool (pre-warmed processes consuming booking jobs)
+    BOOKING_WORKERS = int(os.getenv('BOOKING_WORKERS', 4))
+    BOOKING_QUEUE_SIZE = int(os.getenv('BOOKING_QUEUE_SIZE', 1000))  # max queued jobs
+    BOOKING_BATCH_MAX_ITEMS = int(os.getenv('BOOKING_BATCH_MAX_ITEMS', 20))  # items per batch request
+    
+    # Simulated processing time per booking job (0 disables, e.g. for benchmarks)
+    BOOKING_PROCESSING_DELAY_SECONDS = float(os.getenv('BOOKING_PROCESSING_DELAY_SECONDS', 5))
+    
+    # Booking outcome events (workers -> web process -> user's Socket.IO room)
+    BOOKING_EVENTS_QUEUE_SIZE = int(os.getenv('BOOKING_EVENTS_QUEUE_SIZE', 10000))
+    BOOKING_EVENTS_POLL_SECONDS = float(os.getenv('BOOKING_EVENTS_POLL_SECONDS', 0.2))
+    
+    # Durable booking job queue (booking_jobs table)
+    BOOKING_JOB_POLL_SECONDS = float(os.getenv('BOOKING_JOB_POLL_SECONDS', 5))
+    BOOKING_JOB_VISIBILITY_TIMEOUT = int(os.getenv('BOOKING_JOB_VISIBILITY_TIMEOUT', 60))
+    BOOKING_JOB_MAX_ATTEMPTS = int(os.getenv('BOOKING_JOB_MAX_ATTEMPTS', 5))
+    BOOKING_JOB_BACKOFF_SECONDS = float(os.getenv('BOOKING_JOB_BACKOFF_SECONDS', 2))
+    BOOKING_JOB_BACKOFF_MAX_SECONDS = float(os.getenv('BOOKING_JOB_BACKOFF_MAX_SECONDS', 300))
+    BOOKING_JOB_RETENTION_SECONDS = int(os.getenv('BOOKING_JOB_RETENTION_SECONDS', 7 * 86400))  # DONE jobs
+    BOOKING_JOB_PURGE_INTERVAL_SECONDS = float(os.getenv('BOOKING_JOB_PURGE_INTERVAL_SECONDS', 3600))
+    BOOKING_JOB_PURGE_BATCH_SIZE = int(os.getenv('BOOKING_JOB_PURGE_BATCH_SIZE', 1000))
+    
+    # Outbox relay (refunds and cancellation emails sent to the Server)
+    OUTBOX_RELAY_ENABLED = os.getenv('OUTBOX_RELAY_ENABLED', 'True') == 'True'
+    OUTBOX_POLL_SECONDS = float(os.getenv('OUTBOX_POLL_SECONDS', 1))
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+    OUTBOX_LEASE_SECONDS = int(os.getenv('OUTBOX_LEASE_SECONDS', 30))
+    OUTBOX_TIMEOUT_SECONDS = float(os.getenv('OUTBOX_TIMEOUT_SECONDS', 10))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 10))
+    OUTBOX_BACKOFF_SECONDS = float(os.getenv('OUTBOX_BACKOFF_SECONDS', 2))
+    OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv('OUTBOX_BACKOFF_MAX_SECONDS', 600))
+    
+    # Idempotency-Key on POST /api/bookings: how long a finished response is
+    # replayed, and how long a running request holds its key before a retry
+    # may take it over (must exceed the longest request)
+    IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_KEY_LEASE_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_LEASE_SECONDS', 60))
+    
+    # Flight lifecycle scheduler
+    FLIGHT_SCHEDULER_ENABLED = os.getenv('FLIGHT_SCHEDULER_ENABLED', 'True') == 'True'
+    FLIGHT_SCHEDULER_MAX_SLEEP_SECONDS = float(os.getenv('FLIGHT_SCHEDULER_MAX_SLEEP_SECONDS', 1))
+    FLIGHT_SCHEDULER_RELOAD_SECONDS = int(os.getenv('FLIGHT_SCHEDULER_RELOAD_SECONDS', 60))
+    FLIGHT_SCHEDULER_HORIZON_MINUTES = int(os.getenv('FLIGHT_SCHEDULER_HORIZON_MINUTES', 1440))
+    
+    # Flight tabs snapshot
+    FLIGHT_TAB_CACHE_MAX_AGE_SECONDS = int(os.getenv('FLIGHT_TAB_CACHE_MAX_AGE_SECONDS', 30))
+    
+    # Flight changes feed: only rows older than this are returned, so
+    # transactions that commit late are not skipped by the cursor
+    FLIGHT_CHANGES_SAFETY_LAG_SECONDS = int(os.getenv('FLIGHT_CHANGES_SAFETY_LAG_SECONDS', 2))
 
 
 class DevelopmentConfig(Config):
@@ -51,6 +133,9 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    FLIGHT_SCHEDULER_ENABLED = False
+    OUTBOX_RELAY_ENABLED = False
+    BOOKING_PROCESSING_DELAY_SECONDS = 0
 
 
 # Configuration dictionary
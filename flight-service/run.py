@@ -3,6 +3,7 @@ Application entry point for Flight Service.
 """
 import os
 from app import create_app, socketio
+from app.utils import flight_scheduler, booking_worker_pool, outbox_relay
 
 # Get configuration from environment
 config_name = os.getenv('FLASK_ENV', 'development')
@@ -11,6 +12,18 @@ config_name = os.getenv('FLASK_ENV', 'development')
 app = create_app(config_name)
 
 if __name__ == '__main__':
+    # Werkzeug's reloader runs the app in a child process; only start the
+    # background services there so the watcher parent never claims jobs
+    if not app.config['DEBUG'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Drive APPROVED -> ONGOING -> COMPLETED transitions in the background
+        flight_scheduler.start(app)
+    
+        # Pre-warm the booking worker processes
+        booking_worker_pool.start(app)
+    
+        # Deliver queued refunds and cancellation emails to the Server
+        outbox_relay.start(app)
+    
     # Run with SocketIO support
     socketio.run(
         app,
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark for the batch Flight serializer.
+
+Compares, in microseconds per row:
+  - serialize only: Flight.to_dict() per instance (one clock reading
+    each) against Flight.serialize_many() with one clock reading
+  - load and serialize: Flight.query.all() + to_dict() against a query
+    of Flight.SERIALIZED_COLUMNS + serialize_many(), as the list
+    endpoints do
+
+Runs against TestingConfig (in-memory SQLite):
+
+    cd flight-service
+    python scripts/bench_flight_serializer.py --flights 5000 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import Flight  # noqa: E402
+
+
+def seed(count):
+    """Insert `count` approved flights spread around the current time."""
+    now = datetime.utcnow()
+    for index in range(count):
+        flight = Flight(
+            name=f'Bench {index}', airline_id=1 + index % 10, distance_km=1000, duration_minutes=90,
+            departure_time=now + timedelta(minutes=index - count // 2),
+            departure_airport='BEG', arrival_airport='CDG',
+            ticket_price=100 + index % 50, created_by=1
+        )
+        flight.approve()
+        db.session.add(flight)
+    db.session.commit()
+
+
+def best_of(repeat, function):
+    """Best wall time of `repeat` runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--flights', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+
+    with app.app_context():
+        seed(args.flights)
+
+        flights = Flight.query.all()
+        rows = Flight.query.with_entities(*Flight.SERIALIZED_COLUMNS).all()
+        cases = [
+            ('serialize only, to_dict', lambda: [flight.to_dict() for flight in flights]),
+            ('serialize only, serialize_many', lambda: Flight.serialize_many(rows)),
+            ('load and serialize, to_dict', lambda: [flight.to_dict() for flight in Flight.query.all()]),
+            ('load and serialize, serialize_many', lambda: Flight.serialize_many(
+                Flight.query.with_entities(*Flight.SERIALIZED_COLUMNS).all()
+            )),
+        ]
+
+        print(f"{args.flights} flights, best of {args.repeat}, microseconds per row")
+        for label, function in cases:
+            seconds = best_of(args.repeat, function)
+            print(f"  {label:<36} {seconds / args.flights * 1e6:7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Concurrency benchmark for seat reservation.
+
+Many threads try to book one flight at the same time. The conditional
+UPDATE of Flight.reserve_seat must grant exactly `capacity` seats, and
+seats_sold must match the number granted. A naive read-check-write
+version runs alongside for comparison; it grants more seats than exist
+and loses updates.
+
+Runs against TestingConfig with a file-backed SQLite database (an
+in-memory database is not shared between threads):
+
+    cd flight-service
+    python scripts/bench_seat_reservation.py --attempts 4000 --capacity 1000 --threads 1,8,32
+
+Exits with status 1 if the conditional UPDATE oversells.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config, TestingConfig  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models import Flight  # noqa: E402
+
+
+def reserve_conditional(flight_id):
+    """Take a seat with the service's single conditional UPDATE."""
+    granted = Flight.reserve_seat(flight_id)
+    db.session.commit()
+    return granted
+
+
+def reserve_naive(flight_id):
+    """Take a seat by reading, checking and writing back (what the UPDATE replaces)."""
+    flight = db.session.get(Flight, flight_id)
+    if flight.seats_sold >= flight.capacity:
+        db.session.rollback()
+        return False
+    flight.seats_sold = flight.seats_sold + 1
+    db.session.commit()
+    return True
+
+
+def run(app, reserve, attempts, capacity, threads):
+    """
+    Run `attempts` reservations on a fresh flight from `threads` threads.
+
+    Returns:
+        dict: granted, seats_sold, errors, seconds
+    """
+    with app.app_context():
+        flight = Flight(
+            name='Bench', airline_id=1, distance_km=1000, duration_minutes=60,
+            departure_time=datetime.utcnow() + timedelta(days=1),
+            departure_airport='BEG', arrival_airport='CDG',
+            ticket_price=100, created_by=1, capacity=capacity
+        )
+        flight.approve()
+        db.session.add(flight)
+        db.session.commit()
+        flight_id = flight.id
+
+    lock = threading.Lock()
+    counts = {'granted': 0, 'errors': 0}
+    per_thread = [attempts // threads + (1 if i < attempts % threads else 0) for i in range(threads)]
+    start = threading.Barrier(threads)
+
+    def worker(count):
+        with app.app_context():
+            start.wait()
+            for _ in range(count):
+                try:
+                    granted = reserve(flight_id)
+                except Exception:
+                    db.session.rollback()
+                    with lock:
+                        counts['errors'] += 1
+                    continue
+                if granted:
+                    with lock:
+                        counts['granted'] += 1
+            db.session.remove()
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    with app.app_context():
+        seats_sold = db.session.query(Flight.seats_sold).filter(Flight.id == flight_id).scalar()
+
+    return {'granted': counts['granted'], 'seats_sold': seats_sold, 'errors': counts['errors'], 'seconds': seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--attempts', type=int, default=4000)
+    parser.add_argument('--capacity', type=int, default=1000)
+    parser.add_argument('--threads', default='1,8,32', help='Comma-separated thread counts')
+    parser.add_argument('--skip-naive', action='store_true', help='Only run the conditional UPDATE')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            # Wait for SQLite's write lock instead of failing at once
+            SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30, 'check_same_thread': False}}
+
+        config['bench'] = BenchConfig
+        app = create_app('bench')
+
+        oversold = False
+        modes = [('conditional UPDATE', reserve_conditional)]
+        if not args.skip_naive:
+            modes.append(('naive read-check-write', reserve_naive))
+
+        print(f"{args.attempts} attempts on one flight of capacity {args.capacity}")
+        for label, reserve in modes:
+            for threads in (int(value) for value in args.threads.split(',')):
+                result = run(app, reserve, args.attempts, args.capacity, threads)
+                print(
+                    f"  {label:<24} {threads:>3} threads: granted {result['granted']:>5}, "
+                    f"seats_sold {result['seats_sold']:>5}, errors {result['errors']:>4}, "
+                    f"{args.attempts / result['seconds']:.0f} attempts/s"
+                )
+                if reserve is reserve_conditional and (
+                    result['granted'] != min(args.attempts, args.capacity)
+                    or result['seats_sold'] != result['granted']
+                ):
+                    oversold = True
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    if oversold:
+        print("FAIL: conditional UPDATE did not grant exactly the available seats")
+        sys.exit(1)
+    print("OK: conditional UPDATE granted exactly the available seats")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Upgrade an existing Flight Service database to the current schema.
+
+create_app() only runs db.create_all(), which creates missing tables but
+never changes tables that already exist. This script adds the columns,
+indexes and constraints introduced since then to existing tables and
+backfills their data with set-based UPDATEs. Every step checks the live
+schema first, so the script can be run again safely.
+
+Runs with the configuration named by FLASK_ENV (MySQL in docker-compose;
+SQLite is supported for local testing):
+
+    cd flight-service
+    python scripts/migrate.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text  # noqa: E402
+from app import create_app, db  # noqa: E402
+
+# Set-based backfills per dialect
+BACKFILL_ARRIVAL_TIME = {
+    'mysql': (
+        "UPDATE flights SET arrival_time = DATE_ADD(departure_time, INTERVAL duration_minutes MINUTE) "
+        "WHERE arrival_time IS NULL"
+    ),
+    'sqlite': (
+        "UPDATE flights SET arrival_time = datetime(departure_time, '+' || duration_minutes || ' minutes') "
+        "WHERE arrival_time IS NULL"
+    ),
+}
+
+# Seats already taken by active bookings; capacity is raised where they exceed it
+BACKFILL_SEATS_SOLD = (
+    "UPDATE flights SET seats_sold = ("
+    "SELECT COUNT(*) FROM bookings WHERE bookings.flight_id = flights.id "
+    "AND bookings.status IN ('PENDING', 'PROCESSING', 'COMPLETED'))"
+)
+RAISE_CAPACITY = {
+    'mysql': "UPDATE flights SET capacity = GREATEST(capacity, seats_sold)",
+    'sqlite': "UPDATE flights SET capacity = MAX(capacity, seats_sold)",
+}
+
+# Indexes declared in Flight.__table_args__ and on columns (name -> columns)
+FLIGHT_INDEXES = {
+    'ix_flights_arrival_time': 'arrival_time',
+    'ix_flights_status_departure_time': 'status, departure_time',
+    'ix_flights_status_arrival_time': 'status, arrival_time',
+    'ix_flights_route_departure_time': 'departure_airport, arrival_airport, departure_time',
+    'ix_flights_airline_departure_time': 'airline_id, departure_time',
+    'ix_flights_ticket_price': 'ticket_price',
+    'ix_flights_updated_at_id': 'updated_at, id',
+}
+
+
+class Migration:
+    """Applies missing schema changes and reports each step."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.dialect = connection.dialect.name
+        self.applied = []
+
+    def inspector(self):
+        """Fresh inspector (the schema changes while migrating)."""
+        return inspect(self.connection)
+
+    def columns(self, table):
+        return {column['name'] for column in self.inspector().get_columns(table)}
+
+    def indexes(self, table):
+        return {index['name'] for index in self.inspector().get_indexes(table)}
+
+    def execute(self, description, sql):
+        self.connection.execute(text(sql))
+        self.applied.append(description)
+        print(f"  {description}")
+
+    def add_column(self, table, column, definition, backfill=()):
+        """Add a column and run its backfill statements, if it is missing."""
+        if column in self.columns(table):
+            return
+        self.execute(f"add {table}.{column}", f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        for sql in backfill:
+            self.execute(f"backfill {table}.{column}", sql)
+
+    def add_index(self, table, name, columns):
+        """Create an index if it is missing."""
+        if name in self.indexes(table):
+            return
+        self.execute(f"add index {name}", f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def migrate_flights(migration, default_capacity):
+    """Arrival time, seat inventory and the tab, search and changes-feed indexes."""
+    dialect = migration.dialect
+
+    migration.add_column('flights', 'arrival_time', 'DATETIME NULL',
+                         backfill=[BACKFILL_ARRIVAL_TIME[dialect]])
+    migration.add_column('flights', 'capacity', f'INTEGER NOT NULL DEFAULT {int(default_capacity)}')
+    migration.add_column('flights', 'seats_sold', 'INTEGER NOT NULL DEFAULT 0',
+                         backfill=[BACKFILL_SEATS_SOLD, RAISE_CAPACITY[dialect]])
+
+    for name, columns in FLIGHT_INDEXES.items():
+        migration.add_index('flights', name, columns)
+
+    if dialect == 'mysql':
+        if 'ft_flights_name' not in migration.indexes('flights'):
+            migration.execute(
+                "add index ft_flights_name",
+                "CREATE FULLTEXT INDEX ft_flights_name ON flights (name) WITH PARSER ngram"
+            )
+
+        checks = {check['name'] for check in migration.inspector().get_check_constraints('flights')}
+        if 'ck_flights_seats_sold' not in checks:
+            migration.execute(
+                "add check ck_flights_seats_sold",
+                "ALTER TABLE flights ADD CONSTRAINT ck_flights_seats_sold "
+                "CHECK (seats_sold >= 0 AND seats_sold <= capacity)"
+            )
+
+
+def migrate_booking_jobs(migration):
+    """Delete booking jobs together with their booking (ON DELETE CASCADE)."""
+    if migration.dialect != 'mysql':
+        return
+
+    for foreign_key in migration.inspector().get_foreign_keys('booking_jobs'):
+        if foreign_key['referred_table'] != 'bookings':
+            continue
+        if (foreign_key.get('options') or {}).get('ondelete', '').upper() == 'CASCADE':
+            continue
+
+        name = foreign_key['name']
+        migration.execute(f"drop foreign key {name}", f"ALTER TABLE booking_jobs DROP FOREIGN KEY {name}")
+        migration.execute(
+            f"add foreign key {name} ON DELETE CASCADE",
+            f"ALTER TABLE booking_jobs ADD CONSTRAINT {name} "
+            "FOREIGN KEY (booking_id) REFERENCES bookings (id) ON DELETE CASCADE"
+        )
+
+
+def migrate_idempotency_keys(migration):
+    """Lease of in-progress idempotency keys."""
+    if 'idempotency_keys' not in migration.inspector().get_table_names():
+        return
+
+    migration.add_column('idempotency_keys', 'locked_until', 'DATETIME NULL')
+
+
+def main():
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+
+    with app.app_context():
+        with db.engine.begin() as connection:
+            migration = Migration(connection)
+            print(f"Migrating {connection.dialect.name} database")
+            migrate_flights(migration, app.config['FLIGHT_DEFAULT_CAPACITY'])
+            migrate_booking_jobs(migration)
+            migrate_idempotency_keys(migration)
+
+        print(f"Done, {len(migration.applied)} changes applied" if migration.applied else "Schema is up to date")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_mail import Mail
 from flask_socketio import SocketIO
+from flask_compress import Compress
 from redis import Redis
 import os
 
@@ -15,6 +16,7 @@ db = SQLAlchemy()
 jwt = JWTManager()
 mail = Mail()
 socketio = SocketIO()
+compress = Compress()
 redis_client = None
 
 
@@ -38,6 +40,7 @@ def create_app(config_name='default'):
     db.init_app(app)
     jwt.init_app(app)
     mail.init_app(app)
+    compress.init_app(app)
     
     # CORS configuration
     CORS(app, resources={
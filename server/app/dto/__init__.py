@@ -1,7 +1,7 @@
 """
 DTO module initialization.
 """
-from .user_dto import UserRegistrationDTO, UserUpdateDTO, PasswordChangeDTO, BalanceUpdateDTO
+from .user_dto import UserRegistrationDTO, UserUpdateDTO, PasswordChangeDTO, BalanceUpdateDTO, RefundDTO, FundsReservationDTO
 from .auth_dto import LoginDTO, RoleUpdateDTO
 from .airline_dto import AirlineCreateDTO, AirlineUpdateDTO
 
@@ -10,6 +10,8 @@ __all__ = [
     'UserUpdateDTO',
     'PasswordChangeDTO',
     'BalanceUpdateDTO',
+    'RefundDTO',
+    'FundsReservationDTO',
     'LoginDTO',
     'RoleUpdateDTO',
     'AirlineCreateDTO',
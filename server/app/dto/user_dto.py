@@ -169,4 +169,85 @@ class BalanceUpdateDTO:
         if self.amount <= 0:
             errors.append("Amount must be greater than 0")
         
-        return errors
\ No newline at end of file
+        return errors
+
+
+class RefundDTO:
+    """DTO for one internal refund sent by the Flight Service outbox."""
+    
+    def __init__(self, key, user_id, amount, reservation_key=None):
+        self.key = key
+        self.user_id = user_id
+        self.amount = amount
+        self.reservation_key = reservation_key
+    
+    @staticmethod
+    def from_dict(data):
+        """Create DTO from dictionary."""
+        try:
+            amount = float(data.get('amount', 0))
+        except (TypeError, ValueError):
+            amount = 0
+        return RefundDTO(
+            key=data.get('key'),
+            user_id=data.get('user_id'),
+            amount=amount,
+            reservation_key=data.get('reservation_key')
+        )
+    
+    def validate(self):
+        """Validate DTO data."""
+        errors = []
+        
+        if not self.key or not isinstance(self.key, str) or len(self.key) > 255:
+            errors.append("Refund key is required (max 255 characters)")
+        
+        if self.reservation_key is not None and (
+            not isinstance(self.reservation_key, str) or len(self.reservation_key) > 255
+        ):
+            errors.append("Reservation key must be a string (max 255 characters)")
+        
+        if not isinstance(self.user_id, int) or isinstance(self.user_id, bool):
+            errors.append("User ID must be an integer")
+        
+        if self.amount <= 0:
+            errors.append("Amount must be greater than 0")
+        
+        return errors
+
+
+class FundsReservationDTO:
+    """DTO for one item of a batch funds reservation (internal use)."""
+    
+    def __init__(self, key, user_id, amount):
+        self.key = key
+        self.user_id = user_id
+        self.amount = amount
+    
+    @staticmethod
+    def from_dict(data):
+        """Create DTO from dictionary."""
+        try:
+            amount = float(data.get('amount', 0))
+        except (TypeError, ValueError):
+            amount = 0
+        return FundsReservationDTO(
+            key=data.get('key'),
+            user_id=data.get('user_id'),
+            amount=amount
+        )
+    
+    def validate(self):
+        """Validate DTO data."""
+        errors = []
+        
+        if not self.key or not isinstance(self.key, str) or len(self.key) > 255:
+            errors.append("Reservation key is required (max 255 characters)")
+        
+        if not isinstance(self.user_id, int) or isinstance(self.user_id, bool):
+            errors.append("User ID must be an integer")
+        
+        if self.amount <= 0:
+            errors.append("Amount must be greater than 0")
+        
+        return errors
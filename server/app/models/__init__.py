@@ -4,5 +4,7 @@ Models module initialization.
 from .user import User
 from .airline import Airline
 from .login_attempt import LoginAttempt
+from .processed_refund import ProcessedRefund
+from .processed_reservation import ProcessedReservation
 
-__all__ = ['User', 'Airline', 'LoginAttempt']
\ No newline at end of file
+__all__ = ['User', 'Airline', 'LoginAttempt', 'ProcessedRefund', 'ProcessedReservation']
\ No newline at end of file
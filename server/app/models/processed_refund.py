@@ -0,0 +1,36 @@
+"""
+ProcessedRefund model for applying internal refunds exactly once.
+"""
+from datetime import datetime
+from app import db
+
+
+class ProcessedRefund(db.Model):
+    """Refund already applied, recorded by the key the Flight Service sent."""
+    
+    __tablename__ = 'processed_refunds'
+    
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Dedup key from the Flight Service outbox (e.g. 'refund:booking:42')
+    refund_key = db.Column(db.String(255), nullable=False, unique=True)
+    
+    # User Reference
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    # Refunded amount
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    
+    # Timestamp
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __init__(self, refund_key, user_id, amount):
+        """Initialize a new processed refund record."""
+        self.refund_key = refund_key
+        self.user_id = user_id
+        self.amount = amount
+    
+    def __repr__(self):
+        """String representation of ProcessedRefund."""
+        return f'<ProcessedRefund {self.refund_key} - User:{self.user_id}>'
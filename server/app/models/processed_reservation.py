@@ -0,0 +1,41 @@
+"""
+ProcessedReservation model for reserving funds at most once per key.
+"""
+from datetime import datetime
+from app import db
+
+
+class ProcessedReservation(db.Model):
+    """Funds reservation recorded by the key the Flight Service sent."""
+    
+    __tablename__ = 'processed_reservations'
+    
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Reservation key from the Flight Service (e.g. 'reserve:<uuid>')
+    reservation_key = db.Column(db.String(255), nullable=False, unique=True)
+    
+    # User Reference
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    # Reserved amount
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    
+    # Status: RESERVED (debited), RELEASED (refunded, or voided before any debit)
+    status = db.Column(db.String(20), default='RESERVED', nullable=False)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __init__(self, reservation_key, user_id, amount, status='RESERVED'):
+        """Initialize a new processed reservation record."""
+        self.reservation_key = reservation_key
+        self.user_id = user_id
+        self.amount = amount
+        self.status = status
+    
+    def __repr__(self):
+        """String representation of ProcessedReservation."""
+        return f'<ProcessedReservation {self.reservation_key} - User:{self.user_id} {self.status}>'
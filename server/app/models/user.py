@@ -126,6 +126,54 @@ class User(db.Model):
             return True
         return False
     
+    @staticmethod
+    def debit_balance(user_id, amount):
+        """
+        Deduct money only if the balance covers it, in one conditional UPDATE.
+        
+        Concurrent debits cannot overdraw the account or lose an update.
+        The caller commits.
+        
+        Args:
+            user_id: User ID
+            amount: Amount to deduct
+        
+        Returns:
+            bool: True if the balance was debited
+        """
+        amount = Decimal(str(amount))
+        if amount <= 0:
+            return False
+        
+        updated = User.query.filter(
+            User.id == user_id,
+            User.account_balance >= amount
+        ).update({
+            User.account_balance: User.account_balance - amount
+        }, synchronize_session=False)
+        return updated == 1
+    
+    @staticmethod
+    def credit_balance(user_id, amount):
+        """
+        Add money to the balance in one UPDATE (caller commits).
+        
+        Args:
+            user_id: User ID
+            amount: Amount to add
+        
+        Returns:
+            bool: True if the balance was credited
+        """
+        amount = Decimal(str(amount))
+        if amount <= 0:
+            return False
+        
+        updated = User.query.filter(User.id == user_id).update({
+            User.account_balance: User.account_balance + amount
+        }, synchronize_session=False)
+        return updated == 1
+    
     def to_dict(self, include_sensitive=False):
         """Convert user object to dictionary."""
         data = {
@@ -152,6 +200,16 @@ class User(db.Model):
         
         return data
     
+    def to_internal_dict(self):
+        """Convert user object to the basic info shared with internal services."""
+        return {
+            'id': self.id,
+            'email': self.email,
+            'account_balance': float(self.account_balance),
+            'first_name': self.first_name,
+            'last_name': self.last_name
+        }
+    
     def __repr__(self):
         """String representation of User."""
         return f'<User {self.email} - {self.role}>'
\ No newline at end of file
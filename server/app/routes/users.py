@@ -5,7 +5,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.utils.jwt_helpers import get_current_user_id
 from app.services import UserService
-from app.dto import UserUpdateDTO, PasswordChangeDTO, BalanceUpdateDTO, RoleUpdateDTO
+from app.dto import UserUpdateDTO, PasswordChangeDTO, BalanceUpdateDTO, RefundDTO, FundsReservationDTO, RoleUpdateDTO
 from app.utils import admin_required, account_active_required
 from app import db
 from app.models import User
@@ -72,20 +72,42 @@ def get_user_internal(user_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'account_balance': float(user.account_balance),
-                'first_name': user.first_name,
-                'last_name': user.last_name
-            }
-        }), 200
+        return jsonify({'user': user.to_internal_dict()}), 200
     
     except Exception as e:
         return jsonify({'error': f'Failed to fetch user: {str(e)}'}), 500
 
 
+@users_bp.route('/internal/batch', methods=['POST'])
+def get_users_internal():
+    """
+    Get basic info of several users in one call (internal use, no auth).
+    
+    POST /api/users/internal/batch
+    Body: {
+        "ids": [3, 7, 12]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('ids'), list):
+            return jsonify({'error': 'ids list is required'}), 400
+        
+        if len(data['ids']) > 500:
+            return jsonify({'error': 'At most 500 ids per request'}), 400
+        
+        if not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in data['ids']):
+            return jsonify({'error': 'ids must be integers'}), 400
+        
+        response, status_code = UserService.get_users_internal(data['ids'])
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch users: {str(e)}'}), 500
+
+
 @users_bp.route('/<int:user_id>', methods=['PUT'])
 @jwt_required()
 @account_active_required()
@@ -293,6 +315,104 @@ def deduct_balance(user_id):
         return jsonify({'error': f'Failed to deduct balance: {str(e)}'}), 500
 
 
+@users_bp.route('/<int:user_id>/reserve-funds', methods=['POST'])
+def reserve_funds(user_id):
+    """
+    Atomically deduct money if the balance covers it (internal use).
+    
+    POST /api/users/{user_id}/reserve-funds
+    Body: {
+        "amount": 100.00,
+        "reservation_key": "reserve:3f2a..."  (optional, debits at most once per key)
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        balance_dto = BalanceUpdateDTO.from_dict(data)
+        response, status_code = UserService.reserve_funds(
+            user_id, balance_dto, data.get('reservation_key')
+        )
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to reserve funds: {str(e)}'}), 500
+
+
+@users_bp.route('/internal/reserve-funds', methods=['POST'])
+def reserve_funds_batch():
+    """
+    Reserve funds for several items in one call (internal use).
+    
+    Each item debits at most once per key, so the call can be retried.
+    
+    POST /api/users/internal/reserve-funds
+    Body: {
+        "reservations": [
+            {"key": "reserve:3f2a...:0", "user_id": 3, "amount": 100.00}
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('reservations'), list):
+            return jsonify({'error': 'reservations list is required'}), 400
+        
+        if len(data['reservations']) > 500:
+            return jsonify({'error': 'At most 500 reservations per request'}), 400
+        
+        reservation_dtos = [
+            FundsReservationDTO.from_dict(item if isinstance(item, dict) else {})
+            for item in data['reservations']
+        ]
+        response, status_code = UserService.reserve_funds_batch(reservation_dtos)
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to reserve funds: {str(e)}'}), 500
+
+
+@users_bp.route('/internal/refunds', methods=['POST'])
+def apply_refunds():
+    """
+    Apply a batch of refunds, each at most once per key (internal use).
+    
+    A refund with a reservation_key releases that funds reservation
+    instead of crediting the amount given.
+    
+    POST /api/users/internal/refunds
+    Body: {
+        "refunds": [
+            {"key": "refund:booking:42", "user_id": 3, "amount": 100.00},
+            {"key": "refund:reserve:3f2a...", "user_id": 3, "amount": 100.00,
+             "reservation_key": "reserve:3f2a..."}
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('refunds'), list):
+            return jsonify({'error': 'refunds list is required'}), 400
+        
+        if len(data['refunds']) > 500:
+            return jsonify({'error': 'At most 500 refunds per request'}), 400
+        
+        refund_dtos = [RefundDTO.from_dict(item if isinstance(item, dict) else {}) for item in data['refunds']]
+        response, status_code = UserService.apply_refunds(refund_dtos)
+        
+        return jsonify(response), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to apply refunds: {str(e)}'}), 500
+
+
 @users_bp.route('/<int:user_id>/refund', methods=['POST'])
 def refund_balance(user_id):
     """
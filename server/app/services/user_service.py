@@ -3,9 +3,10 @@ User service for managing user operations.
 """
 from flask import current_app
 from werkzeug.utils import secure_filename
+from sqlalchemy.exc import IntegrityError
 import os
 from app import db
-from app.models import User
+from app.models import User, ProcessedRefund, ProcessedReservation
 from app.dto import UserRegistrationDTO, UserUpdateDTO, PasswordChangeDTO, BalanceUpdateDTO
 from app.utils import validate_email, validate_password_strength, validate_date_of_birth
 
@@ -339,44 +340,172 @@ class UserService:
             return {'error': 'Failed to add balance'}, 500
 
     @staticmethod
-    def deduct_balance(user_id, balance_dto: BalanceUpdateDTO):
+    def _reserve_once(user_id, amount, reservation_key):
         """
-        Deduct money from user's account balance (internal use).
+        Debit the balance at most once per reservation key (the caller commits).
+        
+        The debit and its ProcessedReservation record share a savepoint, so
+        if a concurrent call recorded the key first, only this debit is
+        rolled back.
         
         Args:
             user_id: User ID
-            balance_dto: BalanceUpdateDTO with amount
+            amount: Amount to deduct
+            reservation_key: Key sent by the Flight Service
         
         Returns:
-            tuple: (dict, int) - (response_data, status_code)
+            str: 'reserved', 'duplicate' (already reserved with this key),
+                'released' (the key was released, nothing is debited) or
+                'failed' (missing user or insufficient balance)
         """
-        user = db.session.get(User, user_id)
+        existing = ProcessedReservation.query.filter_by(reservation_key=reservation_key).first()
+        if existing:
+            return 'duplicate' if existing.status == 'RESERVED' else 'released'
         
-        if not user:
-            return {'error': 'User not found'}, 404
+        try:
+            with db.session.begin_nested():
+                if not User.debit_balance(user_id, amount):
+                    return 'failed'
+                db.session.add(ProcessedReservation(reservation_key, user_id, amount))
+        except IntegrityError:
+            # Locking read sees the row the other transaction committed
+            existing = ProcessedReservation.query.filter_by(
+                reservation_key=reservation_key
+            ).with_for_update().first()
+            return 'duplicate' if existing and existing.status == 'RESERVED' else 'released'
+        
+        return 'reserved'
+
+    @staticmethod
+    def reserve_funds(user_id, balance_dto: BalanceUpdateDTO, reservation_key=None):
+        """
+        Atomically deduct money if the balance covers it (internal use).
+        
+        Replaces reading the balance and then deducting: the check and the
+        debit are one conditional UPDATE. With a reservation key the debit
+        happens at most once, so the caller can retry after a timeout; a
+        repeated key returns the original success with replayed set.
+        
+        Args:
+            user_id: User ID
+            balance_dto: BalanceUpdateDTO with amount
+            reservation_key: Optional key identifying the reservation
         
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
         errors = balance_dto.validate()
+        if reservation_key is not None and (
+            not isinstance(reservation_key, str) or not reservation_key or len(reservation_key) > 255
+        ):
+            errors.append("Reservation key must be a string (max 255 characters)")
         if errors:
             return {'errors': errors}, 400
         
         try:
-            if user.deduct_balance(balance_dto.amount):
-                db.session.commit()
-                return {
-                    'message': 'Balance deducted successfully',
-                    'new_balance': float(user.account_balance)
-                }, 200
-            return {'error': 'Insufficient balance'}, 400
+            if reservation_key is None:
+                outcome = 'reserved' if User.debit_balance(user_id, balance_dto.amount) else 'failed'
+            else:
+                outcome = UserService._reserve_once(user_id, balance_dto.amount, reservation_key)
+            
+            if outcome == 'released':
+                db.session.rollback()
+                return {'error': 'Reservation was released'}, 409
+            
+            if outcome == 'failed':
+                db.session.rollback()
+                
+                if not db.session.query(User.id).filter(User.id == user_id).first():
+                    return {'error': 'User not found'}, 404
+                return {'error': 'Insufficient balance'}, 400
+            
+            # Read in the same transaction, so this is the balance after our debit
+            new_balance = db.session.query(User.account_balance).filter(User.id == user_id).scalar()
+            db.session.commit()
+            
+            response = {
+                'message': 'Funds reserved successfully',
+                'amount': balance_dto.amount,
+                'new_balance': float(new_balance)
+            }
+            if outcome == 'duplicate':
+                response['replayed'] = True
+            
+            return response, 200
         
         except Exception as e:
             db.session.rollback()
-            current_app.logger.error(f"Error deducting balance: {str(e)}")
-            return {'error': 'Failed to deduct balance'}, 500
+            current_app.logger.error(f"Error reserving funds: {str(e)}")
+            return {'error': 'Failed to reserve funds'}, 500
 
     @staticmethod
-    def refund_balance(user_id, balance_dto: BalanceUpdateDTO):
+    def reserve_funds_batch(reservation_dtos):
         """
-        Refund money to user's account balance (internal use).
+        Reserve funds for several items in one call (internal use).
+        
+        Every item is an atomic conditional debit, applied in order at most
+        once per reservation key, so each user is charged only for the items
+        their balance covers and a retried batch charges nobody twice.
+        All successful debits commit together.
+        
+        Args:
+            reservation_dtos: List of FundsReservationDTO
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        results = []
+        
+        try:
+            for reservation_dto in reservation_dtos:
+                errors = reservation_dto.validate()
+                if errors:
+                    results.append({'key': reservation_dto.key, 'status': 'error', 'error': '; '.join(errors)})
+                    continue
+                
+                outcome = UserService._reserve_once(
+                    reservation_dto.user_id, reservation_dto.amount, reservation_dto.key
+                )
+                if outcome == 'reserved':
+                    results.append({'key': reservation_dto.key, 'status': 'reserved'})
+                elif outcome == 'duplicate':
+                    results.append({'key': reservation_dto.key, 'status': 'reserved', 'replayed': True})
+                elif outcome == 'released':
+                    results.append({'key': reservation_dto.key, 'status': 'error', 'error': 'Reservation was released'})
+                else:
+                    results.append({'key': reservation_dto.key, 'status': 'error', 'error': None})
+            
+            # Tell missing users apart from insufficient balance
+            failed_user_ids = {
+                reservation_dto.user_id for reservation_dto, result in zip(reservation_dtos, results)
+                if result['status'] == 'error' and result['error'] is None
+            }
+            existing = {
+                row.id for row in db.session.query(User.id).filter(User.id.in_(failed_user_ids)).all()
+            } if failed_user_ids else set()
+            
+            for reservation_dto, result in zip(reservation_dtos, results):
+                if result['status'] == 'error' and result['error'] is None:
+                    result['error'] = 'Insufficient balance' if reservation_dto.user_id in existing else 'User not found'
+            
+            db.session.commit()
+            
+            return {
+                'results': results,
+                'total': len(results)
+            }, 200
+        
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error reserving funds: {str(e)}")
+            return {'error': 'Failed to reserve funds'}, 500
+
+    @staticmethod
+    def deduct_balance(user_id, balance_dto: BalanceUpdateDTO):
+        """
+        Deduct money from user's account balance (internal use).
+        
+        Same atomic debit as reserve_funds.
         
         Args:
             user_id: User ID
@@ -385,29 +514,159 @@ class UserService:
         Returns:
             tuple: (dict, int) - (response_data, status_code)
         """
-        user = db.session.get(User, user_id)
+        response, status_code = UserService.reserve_funds(user_id, balance_dto)
         
-        if not user:
-            return {'error': 'User not found'}, 404
+        if status_code == 200:
+            response = {
+                'message': 'Balance deducted successfully',
+                'new_balance': response['new_balance']
+            }
+        elif status_code == 500:
+            response = {'error': 'Failed to deduct balance'}
         
+        return response, status_code
+
+    @staticmethod
+    def refund_balance(user_id, balance_dto: BalanceUpdateDTO):
+        """
+        Refund money to user's account balance (internal use).
+        
+        Args:
+            user_id: User ID
+            balance_dto: BalanceUpdateDTO with amount
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
         errors = balance_dto.validate()
         if errors:
             return {'errors': errors}, 400
         
         try:
-            if user.add_balance(balance_dto.amount):
-                db.session.commit()
-                return {
-                    'message': 'Balance refunded successfully',
-                    'new_balance': float(user.account_balance)
-                }, 200
-            return {'error': 'Invalid amount'}, 400
+            # Single UPDATE, so concurrent refunds are not lost
+            if not User.credit_balance(user_id, balance_dto.amount):
+                db.session.rollback()
+                return {'error': 'User not found'}, 404
+            
+            new_balance = db.session.query(User.account_balance).filter(User.id == user_id).scalar()
+            db.session.commit()
+            
+            return {
+                'message': 'Balance refunded successfully',
+                'new_balance': float(new_balance)
+            }, 200
         
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Error refunding balance: {str(e)}")
             return {'error': 'Failed to refund balance'}, 500
     
+    @staticmethod
+    def _release_reservation(refund_dto):
+        """
+        Refund a funds reservation by its key (the caller commits).
+        
+        The reserved amount is credited back once. A reservation that was
+        never made is recorded as RELEASED, so a late reserve-funds call
+        with that key is refused instead of debiting.
+        
+        Args:
+            refund_dto: RefundDTO with a reservation_key
+        
+        Returns:
+            str: 'applied', 'void' (nothing was debited), 'duplicate', or
+                None if the user no longer exists
+        
+        Raises:
+            IntegrityError: If the key was recorded concurrently
+        """
+        reservation = ProcessedReservation.query.filter_by(
+            reservation_key=refund_dto.reservation_key
+        ).with_for_update().first()
+        
+        if reservation is None:
+            db.session.add(ProcessedReservation(
+                refund_dto.reservation_key, refund_dto.user_id, refund_dto.amount, status='RELEASED'
+            ))
+            db.session.flush()
+            return 'void'
+        
+        if reservation.status == 'RELEASED':
+            return 'duplicate'
+        
+        if not User.credit_balance(reservation.user_id, reservation.amount):
+            return None
+        
+        reservation.status = 'RELEASED'
+        db.session.add(ProcessedRefund(refund_dto.key, reservation.user_id, reservation.amount))
+        return 'applied'
+    
+    @staticmethod
+    def apply_refunds(refund_dtos):
+        """
+        Apply a batch of refunds from the Flight Service outbox (internal use).
+        
+        Each refund commits on its own together with a ProcessedRefund
+        record, so a key is applied once even if the batch is delivered
+        again; repeated keys are reported as 'duplicate'. Refunds with a
+        reservation_key release that reservation ('void' if it was never
+        made).
+        
+        Args:
+            refund_dtos: List of RefundDTO
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        results = []
+        
+        for refund_dto in refund_dtos:
+            errors = refund_dto.validate()
+            if errors:
+                results.append({'key': refund_dto.key, 'status': 'error', 'error': '; '.join(errors)})
+                continue
+            
+            try:
+                if refund_dto.reservation_key:
+                    status = UserService._release_reservation(refund_dto)
+                    if status is None:
+                        db.session.rollback()
+                        results.append({'key': refund_dto.key, 'status': 'error', 'error': 'User not found'})
+                        continue
+                    
+                    db.session.commit()
+                    results.append({'key': refund_dto.key, 'status': status})
+                    continue
+                
+                if not User.credit_balance(refund_dto.user_id, refund_dto.amount):
+                    db.session.rollback()
+                    results.append({'key': refund_dto.key, 'status': 'error', 'error': 'User not found'})
+                    continue
+                
+                # Unique refund_key: rolls the credit back if the key was applied before
+                db.session.add(ProcessedRefund(refund_dto.key, refund_dto.user_id, refund_dto.amount))
+                db.session.commit()
+                results.append({'key': refund_dto.key, 'status': 'applied'})
+            
+            except IntegrityError:
+                db.session.rollback()
+                if refund_dto.reservation_key:
+                    # The reservation was recorded meanwhile; the next delivery releases it
+                    results.append({'key': refund_dto.key, 'status': 'error',
+                                    'error': 'Reservation was recorded concurrently'})
+                else:
+                    results.append({'key': refund_dto.key, 'status': 'duplicate'})
+            
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Error applying refund {refund_dto.key}: {str(e)}")
+                results.append({'key': refund_dto.key, 'status': 'error', 'error': 'Failed to apply refund'})
+        
+        return {
+            'results': results,
+            'total': len(results)
+        }, 200
+    
     @staticmethod
     def upload_profile_picture(user_id, file):
         """
@@ -459,3 +718,29 @@ class UserService:
             db.session.rollback()
             current_app.logger.error(f"Error uploading profile picture: {str(e)}")
             return {'error': 'Failed to upload profile picture'}, 500
+    
+    @staticmethod
+    def get_users_internal(user_ids):
+        """
+        Get basic info of several users with one IN query (internal use).
+        
+        Args:
+            user_ids: List of user IDs (duplicates are ignored)
+        
+        Returns:
+            tuple: (dict, int) - (response_data, status_code)
+        """
+        try:
+            wanted = set(user_ids)
+            users = User.query.filter(User.id.in_(wanted)).all() if wanted else []
+            found = {user.id for user in users}
+            
+            return {
+                'users': [user.to_internal_dict() for user in users],
+                'missing': sorted(wanted - found),
+                'total': len(users)
+            }, 200
+        
+        except Exception as e:
+            current_app.logger.error(f"Error fetching users: {str(e)}")
+            return {'error': 'Failed to fetch users'}, 500
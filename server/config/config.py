@@ -62,6 +62,16 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    
+    # Response compression (Flask-Compress, negotiated on Accept-Encoding)
+    COMPRESS_ALGORITHM = os.getenv('COMPRESS_ALGORITHM', 'br,gzip').split(',')
+    # Streamed responses are compressed chunk by chunk (gzip is not supported there)
+    COMPRESS_ALGORITHM_STREAMING = os.getenv('COMPRESS_ALGORITHM_STREAMING', 'br,deflate').split(',')
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', 4))
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))  # bytes
+    COMPRESS_STREAMS = os.getenv('COMPRESS_STREAMS', 'True') == 'True'
+    COMPRESS_MIMETYPES = ['application/json', 'text/html', 'text/plain']
 
 
 class DevelopmentConfig(Config):